@@ -4,10 +4,49 @@
 from .engine import BacktestEngine
 from .securities import Security
 from .portfolio import Portfolio
+from .sources import (
+    EventSource,
+    ColumnarSource,
+    DataFrameSource,
+    CSVSource
+)
+from .ticks import TickData
+from .tickstore import (
+    write_tick_store,
+    csv_to_tick_store,
+    read_tick_store,
+    TickStoreSource
+)
 from .orders import (
     MarketOrder,
     LimitOrder
 )
+from .shared import (
+    SharedTickData,
+    SharedMemorySource
+)
+from .indicators import (
+    SimpleMovingAverage,
+    ExponentialMovingAverage,
+    RollingVariance,
+    RollingStandardDeviation,
+    VolumeWeightedAveragePrice,
+    RollingMax,
+    RollingMin,
+    BidAskImbalance
+)
+from .bars import (
+    BarSource,
+    TimeBarBuilder,
+    TickBarBuilder,
+    VolumeBarBuilder,
+    DollarBarBuilder
+)
+from .vectorized import VectorizedBacktest
+from .sweep import (
+    parameter_grid,
+    run_sweep
+)
 from .utils import (
     log_returns        
 )
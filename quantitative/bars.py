@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import abc
+import numpy as np
+import pandas as pd
+from .events import BarEvent, TRADE_EVENT, QUOTE_EVENT
+from .sources import EventSource
+
+
+class BarBuilder(metaclass=abc.ABCMeta):
+    '''
+    Aggregates the trade and quote events of each ticker into bars as the
+    events stream through. Bars hold the OHLC, volume and VWAP of the
+    trades, and the last and mean spread of the quotes in the bar.
+
+    Bars are only built for tickers with events in the bar. Incomplete bars
+    are emitted at the end of the data.
+
+    Parameters:
+    ----------
+    tickers: list
+        Tickers to build bars for, defaults to all tickers.
+    '''
+
+    def __init__(self, tickers=None):
+        self.tickers = set(tickers) if tickers is not None else None
+
+        # Bars in progress by ticker
+        self._bars = {}
+
+    def events(self, events):
+        '''
+        Insert the bars into a stream of market data events.
+
+        Parameters:
+        ----------
+        events: iterator
+            Market data events in time order, e.g. EventSource.events().
+
+        Returns:
+        -------
+        events: generator
+            The events, with BarEvents after the event that completes them.
+        '''
+        last_time = None
+
+        for event in events:
+            last_time = event.time_ns
+
+            yield from self._close_before(last_time)
+
+            yield event
+
+            if (event.kind > QUOTE_EVENT or
+                    (self.tickers is not None and
+                     event.ticker not in self.tickers)):
+                continue
+
+            bar = self._bars.get(event.ticker)
+
+            if bar is None:
+                bar = self._bars[event.ticker] = _Bar(self._bar_start(
+                    last_time), event.ticker_id)
+
+            if event.kind == TRADE_EVENT:
+                bar.add_trade(event.sale_price, event.sale_size)
+
+                if self._complete(bar):
+                    del self._bars[event.ticker]
+                    yield bar.to_event(last_time, event.ticker)
+
+            else:
+                bar.add_quote(event.bid, event.ask)
+
+        if last_time is not None:
+            yield from self._close_all(self._end_time(last_time))
+
+    def _close_all(self, time):
+        for ticker, bar in self._bars.items():
+            yield bar.to_event(time, ticker)
+
+        self._bars = {}
+
+    def reset(self):
+        '''
+        Drop the bars in progress, e.g. before the events are replayed.
+        '''
+        self._bars = {}
+
+    def _bar_start(self, time):
+        return time
+
+    def _close_before(self, time):
+        return ()
+
+    def _end_time(self, time):
+        return time
+
+    @abc.abstractmethod
+    def _complete(self, bar):
+        pass
+
+
+class TimeBarBuilder(BarBuilder):
+    '''
+    Bars over fixed intervals of time, aligned to midnight. A bar is
+    emitted at its end time, before the first event after it.
+
+    Parameters:
+    ----------
+    interval: str or pd.Timedelta
+        Length of the bars, e.g. '1min'.
+
+    tickers: list
+        Tickers to build bars for, defaults to all tickers.
+    '''
+
+    def __init__(self, interval, tickers=None):
+        super().__init__(tickers)
+        self.interval = pd.Timedelta(interval).value
+
+        if self.interval <= 0:
+            raise ValueError('Bar interval must be positive.')
+
+        self._end = None
+
+    def reset(self):
+        super().reset()
+        self._end = None
+
+    def _bar_start(self, time):
+        return time - time % self.interval
+
+    def _close_before(self, time):
+        if self._end is not None and time >= self._end:
+            yield from self._close_all(self._end)
+
+        self._end = self._end_time(time)
+
+    def _end_time(self, time):
+        return self._bar_start(time) + self.interval
+
+    def _complete(self, bar):
+        return False
+
+
+class TickBarBuilder(BarBuilder):
+    '''
+    Bars of a fixed number of trades.
+
+    Parameters:
+    ----------
+    trades: int
+        Number of trades in each bar.
+
+    tickers: list
+        Tickers to build bars for, defaults to all tickers.
+    '''
+
+    def __init__(self, trades, tickers=None):
+        super().__init__(tickers)
+        self.trades = trades
+
+    def _complete(self, bar):
+        return bar.trades >= self.trades
+
+
+class VolumeBarBuilder(BarBuilder):
+    '''
+    Bars closed when the traded volume reaches a threshold.
+
+    Parameters:
+    ----------
+    volume: float
+        Number of shares traded in each bar.
+
+    tickers: list
+        Tickers to build bars for, defaults to all tickers.
+    '''
+
+    def __init__(self, volume, tickers=None):
+        super().__init__(tickers)
+        self.volume = volume
+
+    def _complete(self, bar):
+        return bar.volume >= self.volume
+
+
+class DollarBarBuilder(BarBuilder):
+    '''
+    Bars closed when the traded dollar value reaches a threshold.
+
+    Parameters:
+    ----------
+    dollars: float
+        Dollar value traded in each bar.
+
+    tickers: list
+        Tickers to build bars for, defaults to all tickers.
+    '''
+
+    def __init__(self, dollars, tickers=None):
+        super().__init__(tickers)
+        self.dollars = dollars
+
+    def _complete(self, bar):
+        return bar.dollar_volume >= self.dollars
+
+
+BAR_BUILDERS = {'time': TimeBarBuilder,
+                'tick': TickBarBuilder,
+                'volume': VolumeBarBuilder,
+                'dollar': DollarBarBuilder}
+
+
+class _Bar(object):
+    '''
+    Running aggregates of a bar in progress.
+    '''
+
+    __slots__ = ['start_time', 'open', 'high', 'low', 'close', 'volume',
+                 'dollar_volume', 'trades', 'bid', 'ask', 'spread_total',
+                 'quotes', 'ticker_id']
+
+    def __init__(self, start_time, ticker_id=None):
+        self.start_time = start_time
+        self.ticker_id = ticker_id
+        self.open = np.nan
+        self.high = np.nan
+        self.low = np.nan
+        self.close = np.nan
+        self.volume = 0.
+        self.dollar_volume = 0.
+        self.trades = 0
+        self.bid = np.nan
+        self.ask = np.nan
+        self.spread_total = 0.
+        self.quotes = 0
+
+    def add_trade(self, price, size):
+        if self.trades == 0:
+            self.open = self.high = self.low = price
+        elif price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+
+        self.close = price
+        self.volume += size
+        self.dollar_volume += price * size
+        self.trades += 1
+
+    def add_quote(self, bid, ask):
+        self.bid = bid
+        self.ask = ask
+        self.spread_total += ask - bid
+        self.quotes += 1
+
+    def to_event(self, time, ticker):
+        vwap = self.dollar_volume / self.volume if self.volume else np.nan
+        spread = self.spread_total / self.quotes if self.quotes else np.nan
+
+        return BarEvent(time, ticker, pd.Timestamp(self.start_time),
+                        self.open, self.high, self.low, self.close,
+                        self.volume, vwap, self.trades, self.bid, self.ask,
+                        spread, self.quotes, self.ticker_id)
+
+
+class BarSource(EventSource):
+    '''
+    Event source over pre-aggregated OHLCV bars, for the bar backtest mode
+    of BacktestEngine. Bars are timestamped at their end, e.g. at the close
+    time for daily bars, and yielded as BarEvents.
+
+    Parameters:
+    ----------
+    data: pandas.DataFrame
+        The Pandas DataFrame with the bars.
+
+        Format:
+        ------
+        DATE_TIME,SEC,OPEN,HIGH,LOW,CLOSE,VOLUME
+        2017-11-10 16:00:00,AAPL,103.5,104.2,103.1,103.8,21000000
+        2017-11-10 16:00:00,MSFT,83.6,84.9,83.5,84.8,17000000
+        2017-11-13 16:00:00,AAPL,103.8,104.0,102.9,103.2,19000000
+
+    chunksize: int
+        Number of bars converted into events at a time.
+    '''
+
+    COLUMNS = ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
+
+    def __init__(self, data, chunksize=65536):
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index(kind='mergesort')
+
+        self.chunksize = chunksize
+        self.time = data.index.values.astype('datetime64[ns]').view(np.int64)
+        self.ticker = data['SEC'].to_numpy(dtype=object)
+        self.columns = [data[name].to_numpy(dtype=np.float64)
+                        for name in self.COLUMNS]
+
+    def start_time(self):
+        return pd.Timestamp(int(self.time[0]))
+
+    def market_data(self):
+        number_of_bars = len(self.time)
+
+        for start in range(0, number_of_bars, self.chunksize):
+            stop = min(start + self.chunksize, number_of_bars)
+
+            times = self.time[start:stop].tolist()
+            tickers = self.ticker[start:stop].tolist()
+
+            if self.ticker_ids is None:
+                ids = [None] * len(tickers)
+            else:
+                ids = [self.ticker_ids.get(ticker) for ticker in tickers]
+
+            rows = zip(times, tickers, ids, *[column[start:stop].tolist()
+                                              for column in self.columns])
+
+            for time, ticker, ticker_id, open, high, low, close, volume in rows:
+                yield BarEvent(time, ticker, pd.NaT, open, high, low, close,
+                               volume, np.nan, 0, np.nan, np.nan, np.nan, 0,
+                               ticker_id)
+
+
+def bar_fill_price(order, bar, limit_fill='touch', slippage=0.,
+                   market_fill='open'):
+    '''
+    Price an order placed before a bar is filled at in the bar backtest
+    mode, or NaN if the bar does not fill it.
+
+    Market orders fill at the open. Limit orders fill at the open if the
+    bar opens through the limit price, or at the limit price if the bar
+    trades to it.
+
+    Parameters:
+    ----------
+    order: orders.MarketOrder or orders.LimitOrder
+
+    bar: events.BarEvent
+
+    limit_fill: str
+        options: 'touch' (the limit price is filled when the bar low/high
+        reaches it), 'through' (the bar must trade past the limit price)
+
+    slippage: float
+        Fraction of the price paid on buys and given up on sells. Limit
+        orders never fill past their limit price.
+
+    market_fill: str
+        Bar price market orders fill at, 'open' or 'close'.
+
+    Returns:
+    -------
+    price: float
+    '''
+    if order.order_type == 'MarketOrder':
+        return _slipped(getattr(bar, market_fill), order.direction,
+                        slippage)
+
+    if order.direction == 'BUY':
+        if bar.open <= order.price:
+            price = bar.open
+        elif bar.low < order.price or (limit_fill == 'touch' and
+                                       bar.low == order.price):
+            price = order.price
+        else:
+            return np.nan
+
+        return min(_slipped(price, order.direction, slippage), order.price)
+
+    else:
+        if bar.open >= order.price:
+            price = bar.open
+        elif bar.high > order.price or (limit_fill == 'touch' and
+                                        bar.high == order.price):
+            price = order.price
+        else:
+            return np.nan
+
+        return max(_slipped(price, order.direction, slippage), order.price)
+
+
+def _slipped(price, direction, slippage):
+    if direction == 'BUY':
+        return price * (1 + slippage)
+    return price * (1 - slippage)
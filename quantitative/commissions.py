@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+INTERACTIVE_BROKERS = ['interactive brokers', 'interactive', 'ib']
+
+
+def calculate_commission(broker, price, shares):
+    """
+    Interactive brokers (CA) commission schedule.
+
+    0.01 CAD per share
+    Minimum per order is 1.00 CAD
+    Maximum per order is 0.5% of trade value.
+
+    Parameters:
+    ----------
+    broker: str
+        The broker of the backtest.
+    price: float or np.ndarray
+        The price of the security.
+    shares: float/int or np.ndarray
+        The amount of shares in order.
+
+    Returns:
+    --------
+    Commission: float or np.ndarray
+        The commission of the order, or of each order for arrays.
+    """
+    COST_PER_SHARE = 0.01
+    MIN_PER_ORDER_COST = 1.
+    MAX_PER_ORDER_PERCENTAGE = 0.005
+
+    if broker.lower() in INTERACTIVE_BROKERS:
+        contract_cost = np.multiply(price, shares)
+        commission = contract_cost * COST_PER_SHARE
+
+        commission = np.where(
+            commission <= MIN_PER_ORDER_COST, MIN_PER_ORDER_COST,
+            np.where(commission >= contract_cost * MAX_PER_ORDER_PERCENTAGE,
+                     contract_cost * MAX_PER_ORDER_PERCENTAGE, commission))
+
+        if commission.ndim == 0:
+            return float(commission)
+
+        return commission
+
+    else:
+        raise Exception('The broker \'{}\' is unavailable.'.format(broker))
@@ -1,20 +1,39 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import queue
+import os
 import abc
+import pickle
+import itertools
 import numpy as np
 import pandas as pd
-import itertools
 import datetime
 from .portfolio import Portfolio
-from .securities import Security
-from .events import TradeEvent, QuoteEvent, MarketStatusEvent, OrderEvent
+from .events import (OrderEvent, TimerEvent, TRADE_EVENT, QUOTE_EVENT,
+                     MARKET_STATUS_EVENT, BAR_EVENT, ORDER_EVENT, TIMER_EVENT,
+                     NUMBER_OF_EVENT_KINDS)
 from .orders import MarketOrder, LimitOrder
+from .sources import EventSource, DataFrameSource
+from .scheduler import EventScheduler
+from .orderbook import UnfilledOrderBook
+from .bars import BAR_BUILDERS, BarSource, bar_fill_price
+from .commissions import calculate_commission
+from .ticks import time_of_day, to_nanoseconds
+from .log import BacktestLog
 
 
 class BacktestEngine(metaclass=abc.ABCMeta):
 
+    # Market data events applied in batches, see coalesce_window
+    COALESCED_EVENTS = (TRADE_EVENT, QUOTE_EVENT)
+
+    # Validation levels, see validation
+    VALIDATION_LEVELS = ('strict', 'fast')
+
+    # Events callbacks can subscribe to, see subscribe()
+    SUBSCRIPTION_EVENTS = ('quote', 'trade', 'bar', 'fill', 'market_open',
+                           'market_close')
+
     def __init__(self, data=None, securities=None, record_history=False):
         '''User Settings'''
         self.inital_cash = 0
@@ -23,51 +42,224 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         self.market_open_time = '09:30:00.000000000'
         self.market_close_time = '16:00:00.000000000'
         self.verbose = True
+
+        # Checks of the orders and fills. 'strict' validates the arguments
+        # of every order and the fill invariants, for strategy development.
+        # 'fast' skips the per-call checks, e.g. for parameter sweeps.
+        self.validation = 'strict'
+        self._strict = True
+
+        # Keep the last Security.history_length quotes and trades of each
+        # security, see Security.history()
         self.record_history = record_history
 
+        # Snapshot frequency of the account values returned by run()
+        # options: 'event', 'change', 'close', N events, or an interval
+        # such as '1min', see recorder.AccountValueRecorder
+        self.snapshot_frequency = 'event'
+
+        # Fill assumptions of the bar backtest mode, used when the data is
+        # a bars.BarSource. Market orders fill at the 'open' of the next
+        # bar or at the 'close' of the bar they are placed on. Limit orders
+        # fill when the next bars 'touch' or trade 'through' the limit
+        # price, see bars.bar_fill_price. Slippage is a fraction of the
+        # fill price, and the volume limit the largest fraction of the
+        # volume of a bar filled, None for no limit.
+        self.bar_market_fill = 'open'
+        self.bar_limit_fill = 'touch'
+        self.bar_slippage = 0.
+        self.bar_volume_limit = None
+
+        # Apply the quotes and trades within coalesce_window of the first
+        # one, up to the next queued order or timer, as one batch, with
+        # unfilled orders checked and the strategy called once per batch,
+        # and the subscribed callbacks once per ticker of the batch. e.g. 0
+        # for events with the same time, or '1ms'. None processes every
+        # event separately.
+        self.coalesce_window = None
+
+        # Save the state of the backtest to checkpoint_path after every
+        # checkpoint_frequency market closes, None for no checkpoints. See
+        # load_checkpoint() to resume a backtest from its checkpoint.
+        self.checkpoint_path = None
+        self.checkpoint_frequency = 1
+
         '''Backtest Attributes'''
         self._market_status = None
 
-        # Events queue
-        self._events_queue = queue.PriorityQueue()
-
-        # Priority Queue priorities
+        # Verbose messages, formatted lazily, see log.BacktestLog
+        self._log = BacktestLog()
+
+        # Market data events are pulled lazily from the event source, the
+        # events queue only holds order events
+        self._event_source = None
+        self._events_queue = EventScheduler()
+
+        # Whether the event source has market data left, repeating timers
+        # stop after the last market data event
+        self._more_market_data = False
+
+        # Number of market data events processed when the backtest was
+        # checkpointed, set while a checkpoint is written or resumed
+        self._resume_position = None
+        self._sessions_closed = 0
+
+        # Bar builders between the event source and the strategy, see
+        # subscribe_bars()
+        self._bar_builders = []
+
+        # Callbacks by subscribed event and ticker, None for all tickers,
+        # see subscribe()
+        self._subscriptions = {event: {} for event in self.SUBSCRIPTION_EVENTS}
+        self._number_of_subscriptions = 0
+
+        # Bar backtest mode, the market data is pre-aggregated bars. FOK
+        # and IOC orders wait for the next bar of their ticker, the last bar
+        # of each ticker is kept for fills at the close
+        self._bar_mode = False
+        self._immediate_bar_orders = {}
+        self._last_bars = {}
+
+        # Orders placed in the bar backtest mode, with their time, wait for
+        # the bars of later times. Bars with the same time as the order are
+        # not known when it is placed.
+        self._placed_bar_orders = []
+
+        # Event priorities, lower values are processed first among events
+        # with the same time
         self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY = 3
         self.ORDER_EVENT_QUEUE_PRIORITY = 2
         self.MARGIN_CALL_EVENT_QUEUE_PRIORITY = 1
 
+        # Timers run after the market data and orders of their time
+        self.TIMER_EVENT_QUEUE_PRIORITY = 4
+
+        # Timers scheduled on each session, armed at market open, see
+        # schedule_at() and schedule_every(). Holds (callback, time of day,
+        # interval) with times in nanoseconds.
+        self._session_timers = []
+        self._session_open = None
+        self._session_close = None
+
         self._portfolio = Portfolio()
 
         # Store orders than cannot be filled at time of creation
-        self.unfilled_orders = {'AON': [], 'GTC': [], 'DAY': []}
+        self.unfilled_orders = UnfilledOrderBook()
 
-        # Global backtest time
-        self.simulation_time = None
+        # Global backtest time in epoch nanoseconds, see simulation_time
+        self._clock = None
 
-        # Load security objects into securities_in_universe
+        # Load security objects into securities_in_universe. Tickers are
+        # given dense integer ids, events tagged with the id of their
+        # ticker look up their security by index, see
+        # EventSource.set_ticker_ids()
         if securities is not None:
             self.securities_in_universe = {}
+            self._securities = []
+            self._ticker_ids = {}
 
             for security in securities:
                 security_name = security.ticker
+
+                if security_name not in self._ticker_ids:
+                    self._ticker_ids[security_name] = len(self._securities)
+                    self._securities.append(security)
+                else:
+                    self._securities[self._ticker_ids[security_name]] = security
+
                 self.securities_in_universe[security_name] = security
                 self._portfolio.securities_in_universe.append(security_name)
 
         else:
             raise RuntimeError('No securities in universe')
 
-        # Load data into events queue
+        # Load data into event source
         if data is not None:
-            first_time = '{} 09:30:00'
-            # self.simulation_time = data.index[0]
-            self.simulation_time = pd.Timestamp(
-                first_time.format(data.index[0].date()))
+            self._load_data(data)
 
-            self._queue_data(data)
+            # The backtest starts at the first market open, or at the
+            # first pre-market tick
+            first_time = '{} 09:30:00'
+            start_time = self._event_source.start_time()
+            self._clock = min(
+                pd.Timestamp(first_time.format(start_time.date())).value,
+                start_time.value)
 
         else:
             raise RuntimeError('No data in backtest')
 
+    def __getstate__(self):
+        # The market data is given again when a checkpoint is loaded, and
+        # the log holds an output stream
+        state = self.__dict__.copy()
+        del state['_event_source'], state['_log']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._event_source = None
+        self._log = BacktestLog()
+
+    @classmethod
+    def load_checkpoint(cls, path, data):
+        '''
+        Load a backtest saved to checkpoint_path. run() resumes the
+        backtest after the market close it was saved at, and returns the
+        same results as the uninterrupted backtest.
+
+        The backtest is pickled, with its portfolio, securities, unfilled
+        and queued orders, timers and the attributes of the strategy, which
+        must all be picklable, e.g. subscribed callbacks must be methods of
+        the backtest or module level functions.
+
+        Parameters:
+        ----------
+        path: str
+            The checkpoint file.
+
+        data: pandas.DataFrame or sources.EventSource
+            The market data of the backtest, the same data it was started
+            with.
+
+        Returns:
+        -------
+        backtest: BacktestEngine
+            The backtest, ready to resume with run().
+        '''
+        with open(path, 'rb') as checkpoint:
+            backtest = pickle.load(checkpoint)
+
+        if not isinstance(backtest, cls):
+            raise TypeError('Checkpoint is a {}, not a {}.'.format(
+                type(backtest).__name__, cls.__name__))
+
+        backtest._load_data(data)
+
+        return backtest
+
+    def _write_checkpoint(self, position):
+        '''
+        Save the backtest to checkpoint_path, after position market data
+        events. The file is replaced atomically so an interrupted write
+        keeps the previous checkpoint.
+        '''
+        temporary_path = '{}.tmp'.format(self.checkpoint_path)
+
+        self._resume_position = position
+
+        try:
+            with open(temporary_path, 'wb') as checkpoint:
+                pickle.dump(self, checkpoint, pickle.HIGHEST_PROTOCOL)
+
+        finally:
+            self._resume_position = None
+
+        os.replace(temporary_path, self.checkpoint_path)
+
+        if self.verbose:
+            self._log.log(self._clock, '[UPDATE] Checkpoint saved at {time}.')
+
     ''' User Methods '''
 
     ''' Order Methods'''
@@ -106,13 +298,9 @@ class BacktestEngine(metaclass=abc.ABCMeta):
             this does not place the order.
         '''
 
-        assert(type(direction) == str)
-        assert(type(shares) == int or float)
-        assert(type(price) == int or float)
-        assert(type(security) == Security)
-
         lmt_order = LimitOrder(self.simulation_time, direction, security,
-                               price, shares, time_condition, order_condition)
+                               price, shares, time_condition, order_condition,
+                               validate=self._strict)
 
         return lmt_order
 
@@ -146,12 +334,9 @@ class BacktestEngine(metaclass=abc.ABCMeta):
             Returns a limit order with specified parameters.
         '''
 
-        assert(type(direction) == str)
-        assert(type(shares) == int or float)
-        assert(type(security) == Security)
-
         mkt_order = MarketOrder(self.simulation_time, direction, security,
-                                shares, time_condition, order_condition)
+                                shares, time_condition, order_condition,
+                                validate=self._strict)
 
         return mkt_order
 
@@ -175,29 +360,29 @@ class BacktestEngine(metaclass=abc.ABCMeta):
 
             if self.verbose:
                 message = '[ERROR] Not enough shares to fill {} for {}'
-                print(message.format(order, order.security.ticker))
+                self._log.log(self._clock, message, order,
+                              order.security.ticker)
 
         else:
 
             # Update time of order
-            contract = OrderEvent(self.simulation_time, order)
+            contract = OrderEvent(self._clock, order)
 
-            self._events_queue.put(
-                (self.ORDER_EVENT_QUEUE_PRIORITY, contract))
+            self._events_queue.put(self._clock,
+                                   self.ORDER_EVENT_QUEUE_PRIORITY, contract)
 
         if self.verbose:
             if order.order_type == 'MarketOrder':
-                message = '[ALERT]  {} {}-{} placed on {} for {} @ {} share(s).'
-                print(message.format(order.direction, order.order_type,
-                                     order.time_condition, self.simulation_time,
-                                     order.security.ticker, order.shares))
+                message = '[ALERT]  {} {}-{} placed on {time} for {} @ {} share(s).'
+                self._log.log(self._clock, message, order.direction,
+                              order.order_type, order.time_condition,
+                              order.security.ticker, order.shares)
 
             elif order.order_type == 'LimitOrder':
-                message = '[ALERT]  {} {}-{} placed on {} for {} @ ${:.2f} x {} share(s).'
-                print(message.format(order.direction, order.order_type,
-                                     order.time_condition, self.simulation_time,
-                                     order.security.ticker, order.price,
-                                     order.shares))
+                message = '[ALERT]  {} {}-{} placed on {time} for {} @ ${:.2f} x {} share(s).'
+                self._log.log(self._clock, message, order.direction,
+                              order.order_type, order.time_condition,
+                              order.security.ticker, order.price, order.shares)
 
     ''' User Portfolio Methods '''
 
@@ -222,8 +407,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         old_cash_val = self.get_cash()
 
         self._portfolio.modify_cash(
-            self.simulation_time, old_cash_val + amount)
-        self._portfolio.add_transaction(self.simulation_time, cash=amount)
+            self._clock, old_cash_val + amount)
+        self._portfolio.add_transaction(self._clock, cash=amount)
 
     def remove_cash(self, amount):
         '''
@@ -243,8 +428,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         old_cash_val = self.get_cash()
 
         self._portfolio.modify_cash(
-            self.simulation_time, old_cash_val - abs(amount))
-        self._portfolio.add_transaction(self.simulation_time,
+            self._clock, old_cash_val - abs(amount))
+        self._portfolio.add_transaction(self._clock,
                                         cash=-abs(amount))
 
     def get_cash(self):
@@ -261,7 +446,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
             Current cash at global simulation time.
         '''
 
-        return self._portfolio.get_cash(self.simulation_time)
+        return self._portfolio.get_cash(self._clock)
 
     def get_portfolio_value(self):
         '''
@@ -278,7 +463,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
             Portfolio value at global simulation time.
         '''
 
-        return self._portfolio.get_porfolio_value(self.simulation_time)
+        return self._portfolio.get_porfolio_value(self._clock)
 
     def get_total_investment_value(self):
         '''
@@ -295,7 +480,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
             Investment total at global simulation time.
         '''
 
-        return self._portfolio.calculate_investment_total(self.simulation_time)
+        return self._portfolio.calculate_investment_total(self._clock)
 
     def get_open_positions(self, ticker=None):
         '''
@@ -310,13 +495,24 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         Returns:
         -------
         self._portfolio.open_positions: collections.namedtuple
-            The open positions of the portfolio.
+            The open positions of the portfolio, by ticker if ticker is
+            None. Times are pd.Timestamp.
 
         '''
         if ticker is None:
-            return self._portfolio.open_positions
+            return {ticker: self._export_position(position) for ticker, position
+                    in self._portfolio.open_positions.items()}
         else:
-            return self._portfolio.open_positions[ticker]
+            return self._export_position(
+                self._portfolio.open_positions[ticker])
+
+    def _export_position(self, position):
+        '''
+        Position with its nanosecond times converted to pd.Timestamp.
+        '''
+        return position._replace(
+            time=pd.Timestamp(position.time),
+            purchase_time=pd.Timestamp(position.purchase_time))
 
     def get_shares(self, ticker):
         '''
@@ -371,7 +567,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
             at the current backtest time.
                 
         '''
-        return self._portfolio.portfolio_value[self.simulation_time]
+        return self._portfolio.portfolio_value[self._clock]
 
     def cancel_all_unfilled_orders(self):
         '''
@@ -385,8 +581,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         None
         '''
 
-        for order_type, orders in self.unfilled_orders.items():
-            orders.clear()
+        self.unfilled_orders.clear()
 
     def cancel_unfilled_order(self, order):
         '''
@@ -402,14 +597,15 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         None
         '''
         try:
-            self.unfilled_orders[order.time_condition].remove(order)
+            self.unfilled_orders.remove(order)
             if self.verbose:
-                print('[UPDATE] Order canceled.')
+                self._log.log(self._clock, '[UPDATE] Order canceled.')
 
         except ValueError:
 
             if self.verbose:
-                print('[ALERT] Order not in unfilled orders')
+                self._log.log(self._clock,
+                              '[ALERT] Order not in unfilled orders')
 
     def get_market_status(self):
         '''
@@ -437,7 +633,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
 
         Returns:
         -------
-        self._portfolio.transaction_log: collections.namedtuple
+        self._portfolio.transaction_log: transactions.TransactionLog
             The transaction log.
         '''
         return self._portfolio.transaction_log
@@ -455,14 +651,23 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         unfilled_orders: int
             The number of unfilled orders.
         '''
-        
-        unfilled_orders = 0
 
-        for _, orders in self.unfilled_orders.items():
-            if len(orders) != 0:
-                unfilled_orders += 1
+        return len(self.unfilled_orders)
 
-        return unfilled_orders
+    @property
+    def simulation_time(self):
+        '''
+        The backtest time as a pd.Timestamp. The engine keeps the time in
+        epoch nanoseconds and only converts it when it is read.
+        '''
+        if self._clock is None:
+            return None
+
+        return pd.Timestamp(self._clock)
+
+    @simulation_time.setter
+    def simulation_time(self, time):
+        self._clock = None if time is None else to_nanoseconds(time)
 
     def get_time(self):
         '''
@@ -480,124 +685,484 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         '''
         return self.simulation_time
 
-    ''' Backtest Methods '''
+    ''' Indicator Methods '''
 
-    def initialize_portfolio(self):
+    def add_indicator(self, security, indicator):
         '''
-        Initialize the backtest portfolio by updating the cash and portfolio
-        values of the porfolio class.
+        Register an indicator on a security. The indicator is updated in
+        O(1) as market data arrives and its value can be read at any time.
+
+        Parameters:
+        ----------
+        security: Security or str
+            Security, or ticker of a security in the universe.
+
+        indicator: indicators.Indicator
+            e.g. indicators.SimpleMovingAverage(20).
+
+        Returns:
+        -------
+        indicator: indicators.Indicator
+            The registered indicator.
 
         '''
+        if isinstance(security, str):
+            security = self.securities_in_universe[security]
 
-        # set initial cash, initialize portfolio starting values
-        self._portfolio.modify_cash(self.simulation_time, self.inital_cash)
-        self._portfolio.update_portfolio_values(self.simulation_time)
+        return security.add_indicator(indicator)
 
-    def _queue_data(self, data):
+    def subscribe_bars(self, size, bar_type='time', tickers=None):
         '''
-        Queue the data into our backtest.
+        Aggregate the market data into bars. Once subscribed, the strategy
+        callbacks (at_tick(), trade_logic(), at_end_of_tick()) run on each
+        BarEvent instead of on every quote and trade, after on_bar().
+        Quotes and trades still update securities, positions and unfilled
+        orders.
 
         Parameters:
         ----------
-        data: pandas.DataFrame
-            The Pandas DataFrame with the tick data. 
+        size: str, pd.Timedelta, int or float
+            Interval of time bars (e.g. '1min'), or number of trades,
+            volume or dollar value of the other bar types.
 
-            Format:
-            ------
-            DATE_TIME,BID,BID_SIZE,ASK,ASK_SIZE,SEC,TYPE,SIZE,PRICE
-            2017-11-10 09:46:32.278115304,83.79,1.0,83.81,2.0,MSFT,QUOTE,,
-            2017-11-10 09:46:32.278133425,103.77,1.0,103.88,1.0,AAPL,QUOTE,,
-            2017-11-10 09:46:32.278142489,103.77,1.0,103.88,1.0,AAPL,QUOTE,,
-            2017-11-10 09:46:32.278175650,,,,,MSFT,TRADE,100.0,84.8
-            2017-11-10 09:46:32.278182576,83.79,7.0,83.8,5.0,MSFT,QUOTE,,
-            2017-11-10 09:46:32.278187841,,,,,AAPL,TRADE,100.0,103.8
-            2017-11-10 09:46:32.278192693,83.79,3.0,83.81,4.0,MSFT,QUOTE,,
-            2017-11-10 09:46:32.278221346,103.79,4.0,103.8,3.0,AAPL,QUOTE,,
-            2017-11-10 09:46:32.278229858,83.72,1.0,83.81,2.0,MSFT,QUOTE,,
-            2017-11-10 09:46:32.278235405,,,,,MSFT,TRADE,200.0,85.8
+        bar_type: str
+            options: 'time', 'tick', 'volume', 'dollar'
+
+        tickers: list
+            Tickers to build bars for, defaults to all tickers.
+
+        Returns:
+        -------
+        bar_builder: bars.BarBuilder
 
         '''
-        time_format = '{} {}'
+        if bar_type not in BAR_BUILDERS:
+            raise ValueError('Unknown bar type \'{}\'.'.format(bar_type))
 
-        first_time_in_data = data.index[0]
-        first_market_open_time = pd.Timestamp(time_format.format(
-            first_time_in_data.date(), self.market_open_time))
+        bar_builder = BAR_BUILDERS[bar_type](size, tickers)
+        self._bar_builders.append(bar_builder)
 
-        first_market_open_event = MarketStatusEvent(
-            first_market_open_time, market_status='OPEN')
+        return bar_builder
 
-        self._events_queue.put(
-            (self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY, first_market_open_event))
+    ''' Subscription Methods '''
 
-        market_status = 'OPEN'
+    def subscribe(self, event, callback, tickers=None):
+        '''
+        Register a callback for an event. Once a callback is registered,
+        at_tick(), trade_logic() and at_end_of_tick() are no longer called
+        after every event, only the callbacks of each event are (and the
+        strategy methods on bars, see subscribe_bars()).
 
-        previous_time = first_market_open_time
+        Parameters:
+        ----------
+        event: str
+            options: 'quote', 'trade', 'bar', 'fill', 'market_open',
+                     'market_close'
 
-        # Begin to queue data into priority queue.
-        for row in data.itertuples(index=True):
+        callback: callable
+            Called with the QuoteEvent, TradeEvent, BarEvent or
+            MarketStatusEvent after the engine has processed it, or with
+            the transactions.market_transaction of each fill.
 
-            if (market_status == 'OPEN' and
-                    row.Index.time() > pd.Timestamp(self.market_close_time).time()
-                    or row.Index.date() > previous_time.date()):
+        tickers: str or list
+            Tickers the callback is called for, defaults to all tickers.
+            Not used for market open and close.
 
-                new_market_close_time = pd.Timestamp(
-                    time_format.format(previous_time.date(), self.market_close_time))
+        Returns:
+        -------
+        None
 
-                market_close_event = MarketStatusEvent(new_market_close_time,
-                                                       market_status='CLOSE')
+        '''
+        for ticker in self._subscription_tickers(event, tickers):
+            self._subscriptions[event].setdefault(ticker, []).append(callback)
+            self._number_of_subscriptions += 1
 
-                # Add market close status 
-                self._events_queue.put(
-                    (self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY, market_close_event))
+    def unsubscribe(self, event, callback, tickers=None):
+        '''
+        Remove a callback registered with subscribe() with the same event
+        and tickers.
+        '''
+        for ticker in self._subscription_tickers(event, tickers):
+            callbacks = self._subscriptions[event].get(ticker, [])
+
+            if callback not in callbacks:
+                raise ValueError('Callback is not subscribed to {} for '
+                                 '{}.'.format(event, ticker or 'all tickers'))
+
+            callbacks.remove(callback)
+            self._number_of_subscriptions -= 1
+
+            if not callbacks:
+                del self._subscriptions[event][ticker]
+
+    def _subscription_tickers(self, event, tickers):
+
+        if event not in self.SUBSCRIPTION_EVENTS:
+            raise ValueError('Unknown event \'{}\'.'.format(event))
+
+        if tickers is None or event in ('market_open', 'market_close'):
+            return [None]
+
+        elif isinstance(tickers, str):
+            return [tickers]
+
+        return list(tickers)
+
+    def _dispatch(self, event, ticker, argument):
+        '''
+        Call the callbacks subscribed to an event for a ticker.
+        '''
+        callbacks = self._subscriptions[event]
+
+        if not callbacks:
+            return
+
+        for callback in callbacks.get(ticker, ()):
+            callback(argument)
+
+        if ticker is not None:
+            for callback in callbacks.get(None, ()):
+                callback(argument)
+
+    ''' Scheduling Methods '''
+
+    def schedule_at(self, time, callback):
+        '''
+        Call a callback at a simulated time, after the market data of that
+        time.
+
+        Parameters:
+        ----------
+        time: pd.Timestamp or str
+            Time of the call, or a time of day (e.g. '15:55:00') to call
+            the callback at that time in every session. Times of day must
+            be between market_open_time and market_close_time, the close
+            market status event runs before a callback at the close.
+
+        callback: callable
+            Called with the TimerEvent.
+
+        Returns:
+        -------
+        None
+
+        '''
+        if isinstance(time, str):
+            self._add_session_timer(callback, time_of_day(time), None)
+
+        else:
+            time = to_nanoseconds(time)
+
+            if self._clock is not None and time < self._clock:
+                raise ValueError('Cannot schedule {} before the backtest '
+                                 'time {}.'.format(pd.Timestamp(time),
+                                                   self.simulation_time))
+
+            self._events_queue.put(time,
+                                   self.TIMER_EVENT_QUEUE_PRIORITY,
+                                   TimerEvent(time, callback))
+
+    def schedule_every(self, interval, callback, market_hours_only=True):
+        '''
+        Call a callback every interval of simulated time. Repeating timers
+        stop after the last market data event.
+
+        Parameters:
+        ----------
+        interval: str or pd.Timedelta
+            Time between calls, e.g. '5min'.
 
-                market_status = 'CLOSE'
+        callback: callable
+            Called with the TimerEvent.
 
-            if (market_status == 'CLOSE' and
-                    row.Index.time() > pd.Timestamp(self.market_open_time).time()):
+        market_hours_only: bool
+            Call the callback at the market open and every interval after
+            it until the market close, in every session. Otherwise call it
+            every interval from the current backtest time.
 
-                new_time = row.Index
-                new_market_open_time = pd.Timestamp(
-                    time_format.format(new_time.date(), self.market_open_time))
+        Returns:
+        -------
+        None
+
+        '''
+        interval = pd.Timedelta(interval).value
+
+        if interval <= 0:
+            raise ValueError('Timer interval must be positive.')
+
+        if market_hours_only:
+            self._add_session_timer(callback, None, interval)
+
+        else:
+            time = self._clock + interval
+            self._events_queue.put(time,
+                                   self.TIMER_EVENT_QUEUE_PRIORITY,
+                                   TimerEvent(time, callback, interval))
+
+    def _add_session_timer(self, callback, offset, interval):
+
+        self._session_timers.append((callback, offset, interval))
+
+        # Arm the timer for the current session
+        if self._market_status == 'OPEN':
+            self._arm_session_timer(callback, offset, interval)
+
+    def _arm_session_timers(self, market_open_time):
+        '''
+        Schedule the session timers of the session opening at
+        market_open_time.
+        '''
+        self._session_open = market_open_time
+        self._session_close = (self._session_open -
+                               time_of_day(self.market_open_time) +
+                               time_of_day(self.market_close_time))
+
+        for callback, offset, interval in self._session_timers:
+            self._arm_session_timer(callback, offset, interval)
+
+    def _arm_session_timer(self, callback, offset, interval):
+
+        now = self._clock
+
+        if interval is None:
+            day = self._session_open - time_of_day(self.market_open_time)
+            time = day + offset
+
+            if time < now or time > self._session_close:
+                return
+
+            end = None
+
+        else:
+            # Calls are aligned to the market open
+            elapsed = now - self._session_open
+            time = self._session_open + -(-elapsed // interval) * interval
+
+            if time >= self._session_close:
+                return
+
+            end = self._session_close
+
+        self._events_queue.put(time, self.TIMER_EVENT_QUEUE_PRIORITY,
+                               TimerEvent(time, callback, interval, end))
+
+    def _process_timer(self, timer_event, repeat):
+        '''
+        Call the callback of a timer and reschedule repeating timers.
+        '''
+        timer_event.callback(timer_event)
+
+        if timer_event.interval is None or not repeat:
+            return
+
+        time = timer_event.time_ns + timer_event.interval
+
+        if timer_event.end is None or time < timer_event.end:
+            self._events_queue.put(time, self.TIMER_EVENT_QUEUE_PRIORITY,
+                                   TimerEvent(time, timer_event.callback,
+                                              timer_event.interval,
+                                              timer_event.end))
+
+    ''' Backtest Methods '''
+
+    def initialize_portfolio(self):
+        '''
+        Initialize the backtest portfolio by updating the cash and portfolio
+        values of the porfolio class.
 
-                market_open_event = MarketStatusEvent(new_market_open_time,
-                                                      market_status='OPEN')
+        '''
 
-                self._events_queue.put(
-                    (self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY, market_open_event))
+        # set initial cash, initialize portfolio starting values
+        self._portfolio.modify_cash(self._clock, self.inital_cash)
+        self._portfolio.update_portfolio_values(self._clock)
 
-                market_status = 'OPEN'
+    def _load_data(self, data):
+        '''
+        Set the event source the backtest pulls market data from.
 
-            if row.TYPE == 'TRADE':
-                new_event = TradeEvent(row.Index, row.SEC, row.PRICE, row.SIZE)
+        Parameters:
+        ----------
+        data: pandas.DataFrame or sources.EventSource
+            The tick data. A DataFrame is wrapped in a DataFrameSource, see
+            sources.DataFrameSource for the expected format. A
+            bars.BarSource runs the backtest in the bar backtest mode.
 
-            elif row.TYPE == 'QUOTE':
-                new_event = QuoteEvent(row.Index, row.SEC, row.BID, row.ASK,
-                                       row.BID_SIZE, row.ASK_SIZE)
+        '''
+        if isinstance(data, EventSource):
+            self._event_source = data
+            self._bar_mode = isinstance(data, BarSource)
 
-            self._events_queue.put(
-                (self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY, new_event))
+        elif isinstance(data, pd.DataFrame):
+            self._event_source = DataFrameSource(data)
 
-            previous_time = row.Index
+        else:
+            raise TypeError('Data must be a DataFrame or an EventSource.')
 
     def _update_securities_data(self, event):
         '''
         Update the security data from event data.
         '''
 
-        security = self.securities_in_universe[event.ticker]
+        ticker_id = event.ticker_id
+
+        if ticker_id is not None:
+            security = self._securities[ticker_id]
+        else:
+            security = self.securities_in_universe[event.ticker]
+
+        kind = event.kind
 
-        if event.event_type == 'TradeEvent':
-            security.last_sale_time = event.time
+        if kind == TRADE_EVENT:
+            security.last_sale_time_ns = event.time_ns
             security.last_sale_price = event.sale_price
             security.last_sale_size = event.sale_size
 
-        elif event.event_type == 'QuoteEvent':
-            security.time = event.time
+            if security._history is not None:
+                security._history['TradeEvent'].append(
+                    event.time_ns, event.sale_price, event.sale_size)
+
+            indicators = security.indicators['TradeEvent']
+
+        elif kind == QUOTE_EVENT:
+            security.time_ns = event.time_ns
             security.bid = event.bid
             security.ask = event.ask
             security.bid_size = event.bid_size
             security.ask_size = event.ask_size
 
+            if security._history is not None:
+                security._history['QuoteEvent'].append(
+                    event.time_ns, event.bid, event.ask, event.bid_size,
+                    event.ask_size)
+
+            indicators = security.indicators['QuoteEvent']
+
+        else:
+
+            # Bars update the trade data in the bar backtest mode
+            security.last_sale_time_ns = event.time_ns
+            security.last_sale_price = event.close
+            security.last_sale_size = event.volume
+
+            if security._history is not None:
+                security._history['TradeEvent'].append(
+                    event.time_ns, event.close, event.volume)
+
+            indicators = security.indicators['TradeEvent']
+
+        for indicator in indicators:
+            indicator.update_from(security)
+
+    def _on_trade_event(self, event):
+        self._update_securities_data(event)
+
+        try:
+            # if portfolio has shares of this security, update portfolio
+            # value and investment values
+            self._portfolio.modify_position(
+                event.ticker, time=self._clock,
+                market_price=event.sale_price)
+
+            self._portfolio.update_portfolio_values(self._clock)
+
+        except KeyError as e:
+            pass
+
+        self._dispatch('trade', event.ticker, event)
+
+    def _on_quote_event(self, event):
+        self._update_securities_data(event)
+
+        self._query_unfilled_orders(event.ticker)
+
+        self._dispatch('quote', event.ticker, event)
+
+    def _on_market_status_event(self, event):
+        self._market_status = event.market_status
+
+        if self._placed_bar_orders:
+            self._book_bar_orders(event.time_ns + 1)
+
+        if event.market_status == 'CLOSE':
+            self.unfilled_orders.clear('DAY')
+            self._portfolio.portfolio_value.commit()
+            self._portfolio.reconcile_investment_total()
+
+            self._dispatch('market_close', None, event)
+
+        else:
+            self._arm_session_timers(event.time_ns)
+
+            self._dispatch('market_open', None, event)
+
+    def _on_bar_event(self, event):
+        if self._bar_mode:
+            if self._placed_bar_orders:
+                self._book_bar_orders(event.time_ns)
+
+            self._fill_bar_orders(event)
+            self._last_bars[event.ticker] = event
+            self._update_securities_data(event)
+
+            try:
+                self._portfolio.modify_position(
+                    event.ticker, time=self._clock,
+                    market_price=event.close)
+
+                self._portfolio.update_portfolio_values(self._clock)
+
+            except KeyError as e:
+                pass
+
+        self.on_bar(event)
+
+        self._dispatch('bar', event.ticker, event)
+
+    def _on_order_event(self, event):
+        if self._bar_mode:
+            self._process_bar_order(event.contract)
+        else:
+            self._process_order(event)
+
+    def _on_timer_event(self, event):
+        # Repeating timers stop with the market data
+        self._process_timer(event, self._more_market_data)
+
+    def _process_market_batch(self, batch):
+        '''
+        Apply a batch of quotes and trades, see coalesce_window. Unfilled
+        orders of the quoted tickers are checked once, against the last
+        quotes of the batch. The subscribed callbacks then run once per
+        ticker, with its last quote and last trade of the batch.
+        '''
+        last_quotes = {}
+        last_trades = {}
+
+        for event in batch:
+            self._update_securities_data(event)
+
+            if event.kind == QUOTE_EVENT:
+                last_quotes[event.ticker] = event
+
+            else:
+                last_trades[event.ticker] = event
+
+                if event.ticker in self._portfolio.open_positions:
+                    self._portfolio.modify_position(
+                        event.ticker, time=self._clock,
+                        market_price=event.sale_price)
+
+        self._portfolio.update_portfolio_values(self._clock)
+
+        for ticker in last_quotes:
+            self._query_unfilled_orders(ticker)
+
+        for ticker, event in last_quotes.items():
+            self._dispatch('quote', ticker, event)
+
+        for ticker, event in last_trades.items():
+            self._dispatch('trade', ticker, event)
+
     def _update_portfolio_values(self, time, cash, investment_value,
                                  portfolio_value):
 
@@ -619,14 +1184,15 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         if np.isnan(order_security.ask) or np.isnan(order_security.bid):
 
             if order.time_condition == 'GTC' or order.time_condition == 'DAY':
-                self.unfilled_orders[order.time_condition].append(order)
+                self.unfilled_orders.add(order)
 
             elif order.time_condition == 'AON':
                 if self.verbose:
                     message = '[UPDATE] {} {}-{} ({}: ${:.2f} x {} shares) could not be filled.'
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         order.price, order.shares))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, order.price,
+                                  order.shares)
 
         # Market Order
         # If there are enough shares
@@ -663,25 +1229,27 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                 order.shares = difference_in_shares
                 order.order_status = 'PARTIAL'
 
-                self.unfilled_orders[order.time_condition].append(order)
+                self.unfilled_orders.add(order)
 
             elif order.time_condition == 'FOK':
                 # Fill-Or-Kill
                 if self.verbose:
                     message = '[UPDATE] {} {}-{} ({}: ${:.2f} x {} shares) could not be filled.'
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         order.price, order.shares))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, order.price,
+                                  order.shares)
 
             elif order.time_condition == 'AON':
                 # All-Or-None
-                self.unfilled_orders['AON'].append(order)
+                self.unfilled_orders.add(order)
 
             elif order.time_condition == 'IOC':
                 # Immediate-Or-Cancel
                 new_market_order = MarketOrder(
                     self.simulation_time, order.direction, order_security,
-                    order_security.ask_size, time_condition=order.time_condition)
+                    order_security.ask_size, time_condition=order.time_condition,
+                    validate=False)
 
                 self._fill_market_order(new_market_order)
 
@@ -698,33 +1266,35 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                 # Partial fill
                 new_market_order = MarketOrder(
                     self.simulation_time, order.direction, order_security,
-                    order_security.bid_size, time_condition=order.time_condition)
+                    order_security.bid_size, time_condition=order.time_condition,
+                    validate=False)
 
                 self._fill_market_order(new_market_order)
 
                 order.shares = difference_in_shares
 
-                self.unfilled_orders[order.time_condition].append(
-                    order)
+                self.unfilled_orders.add(order)
 
             elif order.time_condition == 'FOK':
                 # Fill-Or-Kill
                 if self.verbose:
                     message = '[UPDATE] {} {}-{} ({}: ${:.2f} x {} shares) could not be filled.'
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         order.price, order.shares))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, order.price,
+                                  order.shares)
 
             elif order.time_condition == 'AON':
                 # All-Or-None
-                self.unfilled_orders['AON'].append(order)
+                self.unfilled_orders.add(order)
 
             elif order.time_condition == 'IOC':
 
                 # Immediate-Or-Cancel
                 new_market_order = MarketOrder(
                     self.simulation_time, order.direction, order_security,
-                    order_security.bid_size, time_condition=order.time_condition)
+                    order_security.bid_size, time_condition=order.time_condition,
+                    validate=False)
 
                 self._fill_market_order(new_market_order)
                 order.order_status = 'PARTIAL'
@@ -757,34 +1327,38 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                 new_limit_order = LimitOrder(
                     self.simulation_time, order.direction, order_security,
                     order.price, order_security.ask_size,
-                    time_condition=order.time_condition)
+                    time_condition=order.time_condition,
+                    validate=False)
 
                 self._fill_market_order(new_limit_order)
 
                 order.shares = difference_in_shares
 
-                self.unfilled_orders[order.time_condition].append(order)
+                self.unfilled_orders.add(order)
 
             elif order.time_condition == 'FOK':
                 # Fill-Or-Kill
                 if self.verbose:
                     message = '[UPDATE] {} {}-{} ({}: ${:.2f} x {} shares) could not be filled. '\
                         'Not enough shares avaliable.'
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         order.price, order.shares))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, order.price,
+                                  order.shares)
 
             elif order.time_condition == 'AON':
                 # All-Or-None
-                self.unfilled_orders['AON'].append(order)
+                self.unfilled_orders.add(order)
 
             elif order.time_condition == 'IOC':
                 # Immediate-Or-Cancel
-                assert(order_security.ask <= order.price)
+                if self._strict:
+                    assert(order_security.ask <= order.price)
                 new_limit_order = LimitOrder(
                     self.simulation_time, order.direction, order_security,
                     order.price, order_security.ask_size,
-                    time_condition=order.time_condition)
+                    time_condition=order.time_condition,
+                    validate=False)
 
                 self._fill_market_order(new_limit_order)
 
@@ -795,7 +1369,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
 
             if order.time_condition == 'GTC' or order.time_condition == 'DAY':
 
-                assert(order_security.bid >= order.price)
+                if self._strict:
+                    assert(order_security.bid >= order.price)
                 # Good-Til-Canceled
                 difference_in_shares = order.shares - order_security.bid_size
 
@@ -803,13 +1378,14 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                 new_limit_order = LimitOrder(
                     self.simulation_time, order.direction, order_security,
                     order.price, order_security.bid_size,
-                    time_condition=order.time_condition)
+                    time_condition=order.time_condition,
+                    validate=False)
 
                 self._fill_market_order(new_limit_order)
 
                 order.shares = difference_in_shares
 
-                self.unfilled_orders[order.time_condition].append(order)
+                self.unfilled_orders.add(order)
                 order.order_status = 'PARTIAL'
 
             elif order.time_condition == 'FOK':
@@ -817,22 +1393,25 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                 if self.verbose:
                     message = '[UPDATE] {} {}-{} ({}: ${:.2f} x {} shares) could not be filled. '\
                         'Not enough shares avaliable.'
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         order.price, order.shares))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, order.price,
+                                  order.shares)
 
             elif order.time_condition == 'AON':
                 # All-Or-None
-                self.unfilled_orders['AON'].append(order)
+                self.unfilled_orders.add(order)
 
             elif order.order_type == 'IOC':
                 # Immediate-Or-Cancel
-                assert(order_security.bid <= order.price)
+                if self._strict:
+                    assert(order_security.bid <= order.price)
 
                 new_limit_order = LimitOrder(
                     self.simulation_time, order.direction, order_security,
                     order.price, order_security.bid_size,
-                    time_condition=order.time_condition)
+                    time_condition=order.time_condition,
+                    validate=False)
 
                 self._fill_market_order(new_limit_order)
 
@@ -840,47 +1419,169 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         elif (order.order_type == 'LimitOrder' and order.direction == 'BUY' and
                 order.price < order_security.ask):
             try:
-                self.unfilled_orders[order.time_condition].append(order)
+                self.unfilled_orders.add(order)
 
             except KeyError:
                 if self.verbose:
                     message = '[UPDATE] {} {}-{} ({}: ${:.2f} x {} shares) could not be filled.'
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         order.price, order.shares))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, order.price,
+                                  order.shares)
 
             # Price not valid for limit order
         elif (order.order_type == 'LimitOrder' and order.direction == 'SELL' and
                 order.price > order_security.bid):
             try:
-                self.unfilled_orders[order.time_condition].append(order)
+                self.unfilled_orders.add(order)
 
             except KeyError:
                 # Fill-Or-Kill
                 if self.verbose:
                     message = '[UPDATE] {} {}-{} ({}: ${:.2f} x {} shares) could not be filled.'
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         order.price, order.shares))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, order.price,
+                                  order.shares)
 
-    def _query_unfilled_orders(self):
+    def _process_bar_order(self, order):
+        '''
+        Handles an order event in the bar backtest mode. Orders are filled
+        against the bars of their ticker after the time they are placed, or
+        at the close of the current bar for market orders with
+        bar_market_fill = 'close'.
+        '''
+        if order.shares < 0:
+            raise ValueError('Shares cannot be less than 0.')
 
-        unfilled_orders = [orders for _,
-                           orders in self.unfilled_orders.items()]
+        ticker = order.security.ticker
+        last_bar = self._last_bars.get(ticker)
 
-        for order in itertools.chain(*unfilled_orders):
+        if (order.order_type == 'MarketOrder' and
+                self.bar_market_fill == 'close' and last_bar is not None):
+
+            price = bar_fill_price(order, last_bar, self.bar_limit_fill,
+                                   self.bar_slippage, market_fill='close')
+
+            if (self._fill_bar_order(order, last_bar, price) or
+                    order.time_condition not in
+                    self.unfilled_orders.TIME_CONDITIONS):
+                return
+
+        self._placed_bar_orders.append((self._clock, order))
+
+    def _book_bar_orders(self, time):
+        '''
+        Move the orders placed before time to the orders filled against the
+        following bars.
+        '''
+        placed_orders = []
+
+        for placed_time, order in self._placed_bar_orders:
+            if placed_time >= time:
+                placed_orders.append((placed_time, order))
+
+            elif order.time_condition in self.unfilled_orders.TIME_CONDITIONS:
+                self.unfilled_orders.add(order)
+
+            else:
+                self._immediate_bar_orders.setdefault(
+                    order.security.ticker, []).append(order)
+
+        self._placed_bar_orders = placed_orders
+
+    def _fill_bar_orders(self, bar):
+        '''
+        Try to fill the orders of a ticker against a new bar, before the
+        security data is updated with it.
+        '''
+        for order in self._immediate_bar_orders.pop(bar.ticker, []):
+            price = bar_fill_price(order, bar, self.bar_limit_fill,
+                                   self.bar_slippage)
+
+            if price == price:
+                self._fill_bar_order(order, bar, price)
+
+            elif self.verbose:
+                message = '[UPDATE] {} {}-{} ({}: {} shares) could not be filled.'
+                self._log.log(self._clock, message, order.direction,
+                              order.order_type, order.time_condition,
+                              bar.ticker, order.shares)
+
+        # Buy limit orders at or above the low, sell limit orders at or
+        # below the high
+        for order in self.unfilled_orders.crossed(bar.ticker, bar.high,
+                                                  bar.low):
+            price = bar_fill_price(order, bar, self.bar_limit_fill,
+                                   self.bar_slippage)
+
+            if price == price and self._fill_bar_order(order, bar, price):
+                self.unfilled_orders.remove(order)
+
+    def _fill_bar_order(self, order, bar, price):
+        '''
+        Fill an order at a price, up to bar_volume_limit of the volume of
+        the bar. Returns True if the order is done, False if shares remain.
+        '''
+        shares = order.shares
+
+        if self.bar_volume_limit is not None:
+            shares = min(shares, self.bar_volume_limit * bar.volume)
+
+            # All-Or-None waits for a larger bar, Fill-Or-Kill is cancelled
+            if shares < order.shares and order.time_condition in ('AON',
+                                                                  'FOK'):
+                return order.time_condition == 'FOK'
+
+        if not shares > 0:
+            return False
+
+        if shares < order.shares:
+
+            # Partial fill
+            if order.order_type == 'MarketOrder':
+                partial_order = MarketOrder(
+                    self.simulation_time, order.direction, order.security,
+                    shares, time_condition=order.time_condition,
+                    validate=False)
+            else:
+                partial_order = LimitOrder(
+                    self.simulation_time, order.direction, order.security,
+                    order.price, shares, time_condition=order.time_condition,
+                    validate=False)
+
+            self._fill_market_order(partial_order, price)
+
+            order.shares -= shares
+            order.order_status = 'PARTIAL'
+
+            return False
+
+        self._fill_market_order(order, price)
+        order.order_status = 'FILLED'
+
+        return True
+
+    def _query_unfilled_orders(self, ticker):
+        '''
+        Try to fill the unfilled orders of a ticker after a new quote. Only
+        market orders and the limit orders crossed by the quote are checked.
+        '''
+        order_security = self.securities_in_universe[ticker]
+
+        for order in self.unfilled_orders.crossed(ticker, order_security.bid,
+                                                  order_security.ask):
 
-            order_security = order.security
             if order.order_type == 'MarketOrder' and order.direction == 'BUY':
 
                 if np.isnan(order_security.ask) and order.time_condition != 'AON':
                     # self.unfilled_orders[order.order].append(order)
-                    # self.unfilled_orders[order.time_condition].append(order)
+                    # self.unfilled_orders.add(order)
                     pass
 
                 elif order_security.ask_size >= order.shares:
                     self._fill_market_order(order)
-                    self.unfilled_orders[order.time_condition].remove(order)
+                    self.unfilled_orders.remove(order)
 
                 elif order_security.ask_size < order.shares and order_security.ask_size != 0:
 
@@ -891,7 +1592,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                         new_mkt_order = MarketOrder(
                             self.simulation_time, order.direction,
                             order_security, order_security.ask_size,
-                            time_condition=order.time_condition)
+                            time_condition=order.time_condition,
+                            validate=False)
 
                         self._fill_market_order(new_mkt_order)
 
@@ -906,8 +1608,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
 
                 if order_security.bid_size >= order.shares:
                     self._fill_market_order(order)
-                    self.unfilled_orders[order.time_condition].remove(
-                        order)
+                    self.unfilled_orders.remove(order)
 
                 elif order_security.bid_size < order.shares and order_security.bid_size != 0:
 
@@ -918,7 +1619,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                         new_mkt_order = MarketOrder(
                             self.simulation_time, order.direction,
                             order_security, order_security.bid_size,
-                            time_condition=order.time_condition)
+                            time_condition=order.time_condition,
+                            validate=False)
 
                         self._fill_market_order(new_mkt_order)
 
@@ -937,8 +1639,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                     if order_security.ask_size >= order.shares:
 
                         self._fill_market_order(order)
-                        self.unfilled_orders[order.time_condition].remove(
-                            order)
+                        self.unfilled_orders.remove(order)
 
                     elif order_security.ask_size < order.shares and order_security.ask_size != 0:
 
@@ -950,7 +1651,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                                 self.simulation_time, order.direction,
                                 order_security, order.price,
                                 order_security.ask_size,
-                                time_condition=order.time_condition)
+                                time_condition=order.time_condition,
+                                validate=False)
 
                             self._fill_market_order(new_lmt_order)
 
@@ -965,8 +1667,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                     if order_security.bid_size >= order.shares:
 
                         self._fill_market_order(order)
-                        self.unfilled_orders[order.time_condition].remove(
-                            order)
+                        self.unfilled_orders.remove(order)
 
                     elif order_security.ask_size < order.shares and order_security.ask_size != 0:
 
@@ -978,7 +1679,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                                 self.simulation_time, order.direction,
                                 order_security, order.price,
                                 order_security.bid_size,
-                                time_condition=order.time_condition)
+                                time_condition=order.time_condition,
+                                validate=False)
 
                             self._fill_market_order(new_lmt_order)
 
@@ -989,20 +1691,22 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                         elif order.time_condition == 'AON':
                             pass
 
-    def _fill_market_order(self, order):
+    def _fill_market_order(self, order, price=None):
         '''
         Does not check if shares available, just checks if enough cash for buy
-        orders.
+        orders. Orders are filled at the current quote, or at price in the
+        bar backtest mode.
         '''
 
         filled_successfully = False
         order_security = order.security
+        market_transactions = len(self._portfolio.transaction_log.market)
         # order_size = order.shares
         # order_direction = order.direction
 
         if order.direction == 'BUY':
 
-            market_price = order_security.ask
+            market_price = order_security.ask if price is None else price
             commission = self.calculate_commission(self.broker, market_price,
                                                    order.shares)
 
@@ -1023,62 +1727,64 @@ class BacktestEngine(metaclass=abc.ABCMeta):
                     self._portfolio.modify_position(
                         order_security.ticker, purchase_price=avg_price,
                         shares=old_purchase_size + order.shares,
-                        purchase_time=self.simulation_time,
+                        purchase_time=self._clock,
                         market_price=market_price)
 
                 # adding new shares
                 except KeyError as e:
                     self._portfolio.add_position(
-                        self.simulation_time, order_security.ticker,
+                        self._clock, order_security.ticker,
                         market_price, order.shares)
 
-                    self._update_portfolio_holdings(self.simulation_time)
+                    self._update_portfolio_holdings(self._clock)
 
                 # print('fill order {}'.format(self.simulation_time))
                 self.remove_cash(order_cost)
 
                 self._portfolio.add_transaction(
-                    self.simulation_time, cash=-order_cost)
+                    self._clock, cash=-order_cost)
 
                 self._portfolio.add_transaction(
-                    self.simulation_time, direction=order.direction,
+                    self._clock, direction=order.direction,
                     ticker=order_security.ticker, price=market_price,
                     shares=order.shares, commission=commission)
 
-                self._portfolio.update_portfolio_values(self.simulation_time)
-                self._update_portfolio_holdings(self.simulation_time)
+                self._portfolio.update_portfolio_values(self._clock)
+                self._update_portfolio_holdings(self._clock)
 
                 # remove number of shares avaliable
-                if order_security.ask_size - order.shares >= 0:
-                    order_security.ask_size -= order.shares
-                else:
-                    order_security.ask_size = 0
-                assert(order_security.ask_size >= 0)
+                if price is None:
+                    if order_security.ask_size - order.shares >= 0:
+                        order_security.ask_size -= order.shares
+                    else:
+                        order_security.ask_size = 0
+
+                    if self._strict:
+                        assert(order_security.ask_size >= 0)
 
                 if self.verbose:
-                    message = '[UPDATE] {} {}-{} for {} @ ${:.2f} x {:.0f} = ${:.2f} filled at {}.'
+                    message = '[UPDATE] {} {}-{} for {} @ ${:.2f} x {:.0f} = ${:.2f} filled at {time}.'
 
-                    print(message.format(order.direction, order.order_type,
-                                         order.time_condition, order_security.ticker,
-                                         market_price, order.shares,
-                                         order.shares * market_price,
-                                         self.simulation_time))
+                    self._log.log(self._clock, message, order.direction,
+                                  order.order_type, order.time_condition,
+                                  order_security.ticker, market_price,
+                                  order.shares, order.shares * market_price)
 
                 order_security.last_sale_price = market_price
                 order_security.last_sale_size = order.shares
-                order_security.last_sale_time = self.simulation_time
+                order_security.last_sale_time_ns = self._clock
                 filled_successfully = True
 
             else:
                 if self.verbose:
                     message = '[WARNING] Not enough cash to fill {}-{} for {}. Order not filled.'
-                    print(message.format(order.order_type, order.time_condition,
-                                         order.security.ticker))
+                    self._log.log(self._clock, message, order.order_type,
+                                  order.time_condition, order.security.ticker)
 
                 order.order_status = 'UNFILLED'
 
         elif order.direction == 'SELL':
-            market_price = order_security.bid
+            market_price = order_security.bid if price is None else price
             commission = self.calculate_commission(self.broker, market_price,
                                                    order.shares)
 
@@ -1092,20 +1798,20 @@ class BacktestEngine(metaclass=abc.ABCMeta):
 
                 # cash transaction
                 self._portfolio.add_transaction(
-                    self.simulation_time, cash=(market_price * order.shares))
+                    self._clock, cash=(market_price * order.shares))
 
                 self._portfolio.modify_position(
-                    ticker=order_security.ticker, time=self.simulation_time,
+                    ticker=order_security.ticker, time=self._clock,
                     shares=difference, market_price=market_price)
 
                 # order transaction
                 self._portfolio.add_transaction(
-                    self.simulation_time, direction=order.direction,
+                    self._clock, direction=order.direction,
                     ticker=order_security.ticker, price=market_price,
                     shares=order.shares, commission=commission)
 
-                self._portfolio.update_portfolio_values(self.simulation_time)
-                self._update_portfolio_holdings(self.simulation_time)
+                self._portfolio.update_portfolio_values(self._clock)
+                self._update_portfolio_holdings(self._clock)
 
             # selling all shares of ticker
             elif order.shares == shares_in_account:
@@ -1116,49 +1822,51 @@ class BacktestEngine(metaclass=abc.ABCMeta):
 
                 # cash transaction
                 self._portfolio.add_transaction(
-                    self.simulation_time, cash=(market_price * order.shares))
+                    self._clock, cash=(market_price * order.shares))
 
                 # order transaction
                 self._portfolio.add_transaction(
-                    self.simulation_time, direction=order.direction,
+                    self._clock, direction=order.direction,
                     ticker=order_security.ticker, price=market_price,
                     shares=order.shares, commission=commission)
 
-                self._portfolio.update_portfolio_values(self.simulation_time)
-                self._update_portfolio_holdings(self.simulation_time)
+                self._portfolio.update_portfolio_values(self._clock)
+                self._update_portfolio_holdings(self._clock)
 
             # remove number of ask shares avaliable
-            if order_security.bid_size - order.shares >= 0:
-                order_security.bid_size -= order.shares
-            else:
-                order_security.bid_size = 0
+            if price is None:
+                if order_security.bid_size - order.shares >= 0:
+                    order_security.bid_size -= order.shares
+                else:
+                    order_security.bid_size = 0
 
-            assert(order_security.bid_size >= 0)
+                if self._strict:
+                    assert(order_security.bid_size >= 0)
 
             if self.verbose:
-                message = '[UPDATE] {} {}-{} for {} @ ${:.2f} x {:.0f} = ${:.2f} filled at {}.'
+                message = '[UPDATE] {} {}-{} for {} @ ${:.2f} x {:.0f} = ${:.2f} filled at {time}.'
 
-                print(message.format(order.direction, order.order_type,
-                                     order.time_condition, order_security.ticker,
-                                     market_price, order.shares,
-                                     order.shares * market_price,
-                                     self.simulation_time))
+                self._log.log(self._clock, message, order.direction,
+                              order.order_type, order.time_condition,
+                              order_security.ticker, market_price,
+                              order.shares, order.shares * market_price)
 
             order_security.last_sale_price = market_price
             order_security.last_sale_size = order.shares
-            order_security.last_sale_time = self.simulation_time
+            order_security.last_sale_time_ns = self._clock
 
             filled_successfully = True
 
+        if len(self._portfolio.transaction_log.market) > market_transactions:
+            self._dispatch('fill', order_security.ticker,
+                           self._portfolio.transaction_log.last_market())
+
         return filled_successfully
 
     def calculate_commission(self, broker, price, shares):
         """
-        Interactive brokers (CA) commission schedule.
-
-        0.01 CAD per share
-        Minimum per order is 1.00 CAD
-        Maximum per order is 0.5% of trade value.
+        Commission of an order, see commissions.calculate_commission for
+        the commission schedule.
 
         Parameters:
         ----------
@@ -1175,30 +1883,7 @@ class BacktestEngine(metaclass=abc.ABCMeta):
             The commission of the order.
         """
         if self.include_commission:
-
-            COST_PER_SHARE = 0.01
-            MIN_PER_ORDER_COST = 1.
-            MAX_PER_ORDER_PERCENTAGE = 0.005
-
-            interactive_brokers = ['interactive brokers', 'interactive', 'ib']
-
-            if broker.lower() in interactive_brokers:
-                contract_cost = price * shares
-                commission = contract_cost * COST_PER_SHARE
-
-                if commission <= MIN_PER_ORDER_COST:
-                    return MIN_PER_ORDER_COST
-
-                elif commission >= (contract_cost * MAX_PER_ORDER_PERCENTAGE):
-                    return contract_cost * MAX_PER_ORDER_PERCENTAGE
-
-                else:
-                    return commission
-
-            else:
-                raise Exception(
-                    'The broker \'{}\' is unavailable.'.format(self.broker))
-            pass
+            return calculate_commission(broker, price, shares)
         else:
             return 0
 
@@ -1211,6 +1896,12 @@ class BacktestEngine(metaclass=abc.ABCMeta):
     def at_end_of_tick(self):
         pass
 
+    def on_bar(self, bar):
+        '''
+        User operations on a new bar, see subscribe_bars().
+        '''
+        pass
+
     @abc.abstractmethod
     def trade_logic(self):
         '''
@@ -1222,7 +1913,8 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         '''
         Method to run the simulation. Order of execution:
         1. Update portfolio values 
-        2. Get the next tick event
+        2. Get the next tick event, queued orders first, then the next
+           market data event from the event source
         3. Update security data based on information from tick event
         4. Call at_tick()
         5. Call trade_logic()
@@ -1236,94 +1928,187 @@ class BacktestEngine(metaclass=abc.ABCMeta):
         -------
         result_account_values: pd.DataFrame
             Pandas DataFrame of portfolio value, cash value and investment 
-            value at each tick of the backtest.
+            value at each tick of the backtest, or at the snapshots set by
+            snapshot_frequency.
 
         '''
+        if self.validation not in self.VALIDATION_LEVELS:
+            raise ValueError('Unknown validation level \'{}\', options: '
+                             '{}.'.format(self.validation,
+                                          ', '.join(self.VALIDATION_LEVELS)))
+
+        self._strict = self.validation == 'strict'
+        self._portfolio.validate = self._strict
+
+        # Verbose messages are buffered during the run, and flushed when it
+        # ends or fails
+        with self._log.buffered():
+            return self._run()
+
+    def _run(self):
+
+        # Number of market data events processed, the position of the event
+        # source in checkpoints
+        position = self._resume_position or 0
+        self._resume_position = None
+
         if self.verbose:
-            print('Backtest started...')
+            if position:
+                self._log.log(self._clock, 'Backtest resumed at {time}...')
+            else:
+                self._log.log(None, 'Backtest started...')
+
             start_time = datetime.datetime.now()
 
-        self.initialize_portfolio()
+        if not position:
+            self._portfolio.portfolio_value.set_frequency(
+                self.snapshot_frequency)
+            self.initialize_portfolio()
 
-        while not self._events_queue.empty():
+            if self.record_history:
+                for security in self.securities_in_universe.values():
+                    security.initialize_history()
 
-            # Get next event from queue
-            current_event = self._events_queue.get()
+        self._event_source.set_ticker_ids(self._ticker_ids)
 
-            tick_event_type = current_event[0]
-            tick_event = current_event[1]
+        # The event source seeks to the resumed position. The bars are
+        # rebuilt from the start of the data, and the events up to the
+        # position skipped.
+        if self._bar_builders:
+            market_events = self._event_source.events(self.market_open_time,
+                                                      self.market_close_time)
 
-            ''' Update portfolio values before processing next tick '''
+            for bar_builder in self._bar_builders:
+                bar_builder.reset()
+                market_events = bar_builder.events(market_events)
 
-            previous_cash = self.get_cash()
-            previous_investment_total = self.get_total_investment_value()
+            if position:
+                market_events = itertools.islice(market_events, position,
+                                                 None)
 
-            self.simulation_time = tick_event.time
+        else:
+            market_events = self._event_source.events(self.market_open_time,
+                                                      self.market_close_time,
+                                                      position)
+
+        next_market_event = next(market_events, None)
+        self._more_market_data = next_market_event is not None
+
+        if self.coalesce_window is not None:
+            coalesce_window = pd.Timedelta(self.coalesce_window).value
+
+        # Handlers of each event kind, indexed by Event.kind
+        handlers = [None] * NUMBER_OF_EVENT_KINDS
+        handlers[TRADE_EVENT] = self._on_trade_event
+        handlers[QUOTE_EVENT] = self._on_quote_event
+        handlers[MARKET_STATUS_EVENT] = self._on_market_status_event
+        handlers[BAR_EVENT] = self._on_bar_event
+        handlers[ORDER_EVENT] = self._on_order_event
+        handlers[TIMER_EVENT] = self._on_timer_event
+
+        # With bar subscriptions the strategy only runs on bars, with event
+        # subscriptions only the subscribed callbacks run. Timers only run
+        # their callback.
+        bar_strategy = bool(self._bar_builders)
+
+        if bar_strategy:
+            runs_strategy = [kind == BAR_EVENT
+                             for kind in range(NUMBER_OF_EVENT_KINDS)]
+        else:
+            runs_strategy = [kind != TIMER_EVENT
+                             for kind in range(NUMBER_OF_EVENT_KINDS)]
 
-            self._portfolio.modify_cash(self.simulation_time, previous_cash)
+        while (next_market_event is not None or
+               not self._events_queue.empty()):
 
-            for ticker in self._portfolio.open_positions.keys():
-                self._portfolio.modify_position(
-                    ticker, time=self.simulation_time)
+            batch = None
 
-            self._portfolio.update_portfolio_values(self.simulation_time)
+            # Queued events are processed before the next market event
+            # unless the market event comes first in (time, priority)
+            if (next_market_event is None or
+                    (not self._events_queue.empty() and
+                     self._events_queue.peek_key() <=
+                     (next_market_event.time_ns,
+                      self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY))):
 
-            '''Process next event tick'''
+                tick_event = self._events_queue.get()[1]
 
-            # Quote or Trade Event
-            if tick_event_type == self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY:
+            else:
+                tick_event = next_market_event
+                position += 1
 
-                if tick_event.event_type == 'MarketStatusEvent':
+                next_market_event = next(market_events, None)
 
-                    self._market_status = tick_event.market_status
+                if (self.coalesce_window is not None and
+                        tick_event.kind in self.COALESCED_EVENTS):
 
-                    if tick_event.market_status == 'CLOSE':
-                        self.unfilled_orders['DAY'].clear()
+                    batch = [tick_event]
+                    batch_end = tick_event.time_ns + coalesce_window
 
-                # self._update_securities_data(tick_event)
+                    # The batch ends before the next queued event, e.g. a
+                    # timer within the window, so the clock never goes back
+                    while (next_market_event is not None and
+                           next_market_event.kind in
+                           self.COALESCED_EVENTS and
+                           next_market_event.time_ns <= batch_end and
+                           (self._events_queue.empty() or
+                            (next_market_event.time_ns,
+                             self.QUOTE_TRADE_QUEUE_EVENT_PRIORITY) <
+                            self._events_queue.peek_key())):
 
-                # Update prices for open positions
-                elif tick_event.event_type == 'TradeEvent':
+                        batch.append(next_market_event)
+                        position += 1
 
-                    self._update_securities_data(tick_event)
+                        next_market_event = next(market_events, None)
 
-                    try:
-                        # if portfolio has shares of this security, update
-                        #  portfolio value and investment values
-                        self._portfolio.modify_position(
-                            tick_event.ticker, time=self.simulation_time,
-                            market_price=tick_event.sale_price)
+                    # The batch is processed at the time of its last event
+                    tick_event = batch[-1]
 
-                        self._portfolio.update_portfolio_values(
-                            self.simulation_time)
+                self._more_market_data = next_market_event is not None
 
-                    except KeyError as e:
-                        pass
+            ''' Update portfolio values before processing next tick '''
 
-                elif tick_event.event_type == 'QuoteEvent':
-                    self._update_securities_data(tick_event)
+            previous_cash = self.get_cash()
 
-                    self._query_unfilled_orders()
+            self._clock = tick_event.time_ns
 
-            # Order Event
-            elif tick_event_type == self.ORDER_EVENT_QUEUE_PRIORITY:
+            self._portfolio.modify_cash(self._clock, previous_cash)
 
-                self._process_order(tick_event)
+            self._portfolio.update_portfolio_values(self._clock)
 
-            elif current_event_type == self.MARGIN_CALL_EVENT_QUEUE_PRIORITY:
-                pass
+            '''Process next event tick'''
 
-            self.at_tick()
-            self.trade_logic()
-            self.at_end_of_tick()
+            kind = tick_event.kind
 
-        if self.verbose:
-            print('Backtest completed. Finished in {}'.format(
-                datetime.datetime.now() - start_time))
+            if batch is not None:
+                self._process_market_batch(batch)
+            else:
+                handlers[kind](tick_event)
+
+            if runs_strategy[kind] and (bar_strategy or
+                                        self._number_of_subscriptions == 0):
+                self.at_tick()
+                self.trade_logic()
+                self.at_end_of_tick()
+
+            if (kind == MARKET_STATUS_EVENT and
+                    tick_event.market_status == 'CLOSE'):
 
-        result_account_values = pd.DataFrame.from_dict(
-            self._portfolio.portfolio_value, orient='index')
+                self._sessions_closed += 1
+
+                if (self.checkpoint_path is not None and
+                        self._sessions_closed %
+                        self.checkpoint_frequency == 0):
+                    self._write_checkpoint(position)
+
+        # Orders placed on the last bars wait for more data
+        if self._placed_bar_orders:
+            self._book_bar_orders(self._clock + 1)
+
+        if self.verbose:
+            self._log.log(None, 'Backtest completed. Finished in {}',
+                          datetime.datetime.now() - start_time)
 
-        result_account_values = result_account_values.astype('float64')
+        result_account_values = self._portfolio.portfolio_value.to_frame()
 
         return result_account_values
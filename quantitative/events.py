@@ -2,14 +2,46 @@
 # -*- coding: utf-8 -*-
 
 import abc
+import pandas as pd
+from .ticks import to_nanoseconds
+
+# Event kind codes, used to dispatch events with a jump table
+TRADE_EVENT = 0
+QUOTE_EVENT = 1
+MARKET_STATUS_EVENT = 2
+BAR_EVENT = 3
+ORDER_EVENT = 4
+TIMER_EVENT = 5
+
+NUMBER_OF_EVENT_KINDS = 6
 
 
 class Event(metaclass=abc.ABCMeta):
+    '''
+    Base class of the events of the backtest. Events only hold their
+    fields in slots, the event type and kind are class attributes, so
+    each event is a single small object without an instance dict.
+
+    Times are kept as epoch nanoseconds in time_ns, events accept any time
+    ticks.to_nanoseconds() does and return a pd.Timestamp from time.
+    '''
 
-    def __init__(self, event_index):
+    __slots__ = ['time_ns']
 
-        self.event_type = self.__class__.__name__
-        self.event_index = event_index
+    # Name of the event class, set on each subclass
+    event_type = 'Event'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.event_type = cls.__name__
+
+    @property
+    def time(self):
+        return pd.Timestamp(self.time_ns)
+
+    @property
+    def event_index(self):
+        return self.time_ns
 
     def __repr__(self):
         return self.event_type
@@ -29,16 +61,17 @@ class TradeEvent(Event):
     Contains information about the trade data of a security.
     '''
 
-    __slots__ = ['time', 'ticker', 'sale_price', 'sale_size']
+    __slots__ = ['ticker', 'sale_price', 'sale_size', 'ticker_id']
 
-    def __init__(self, time, ticker, sale_price, sale_size):
+    kind = TRADE_EVENT
 
-        self.time = time
+    def __init__(self, time, ticker, sale_price, sale_size, ticker_id=None):
+
+        self.time_ns = to_nanoseconds(time)
         self.ticker = ticker
         self.sale_price = sale_price
         self.sale_size = sale_size
-
-        super().__init__(self.time)
+        self.ticker_id = ticker_id
 
     def __repr__(self):
         return 'TradeEvent: {}, {}'.format(self.time, self.ticker)
@@ -49,18 +82,21 @@ class QuoteEvent(Event):
     Contains information about the quote data of a security.
     '''
 
-    __slots__ = ['time', 'ticker', 'bid', 'ask', 'bid_size', 'ask_size']
+    __slots__ = ['ticker', 'bid', 'ask', 'bid_size', 'ask_size',
+                 'ticker_id']
 
-    def __init__(self, time, ticker, bid, ask, bid_size, ask_size):
+    kind = QUOTE_EVENT
 
-        self.time = time
+    def __init__(self, time, ticker, bid, ask, bid_size, ask_size,
+                 ticker_id=None):
+
+        self.time_ns = to_nanoseconds(time)
         self.ticker = ticker
         self.bid = bid
         self.ask = ask
         self.bid_size = bid_size
         self.ask_size = ask_size
-
-        super().__init__(self.time)
+        self.ticker_id = ticker_id
 
     def __repr__(self):
         return 'QuoteEvent: {}, {}'.format(self.time, self.ticker)
@@ -73,13 +109,13 @@ class MarketStatusEvent(Event):
 
     __slots__ = ['market_status']
 
+    kind = MARKET_STATUS_EVENT
+
     def __init__(self, time, market_status):
 
-        self.time = time
+        self.time_ns = to_nanoseconds(time)
         self.market_status = market_status
 
-        super().__init__(self.time)
-
     def __repr__(self):
         return 'MarketStatus: {}, {}'.format(self.time, self.market_status)
 
@@ -89,14 +125,72 @@ class OrderEvent(Event):
     Contains information about an order that was queued.
     '''
 
-    __slots__ = ['time', 'contract']
+    __slots__ = ['contract']
+
+    kind = ORDER_EVENT
 
     def __init__(self, time, contract):
 
-        self.time = time
+        self.time_ns = to_nanoseconds(time)
         self.contract = contract
 
-        super().__init__(self.time)
-
     def __repr__(self):
         return 'OrderEvent: {}, {}'.format(self.time, self.contract)
+
+
+class BarEvent(Event):
+    '''
+    Contains the aggregated trade and quote data of a security over a bar,
+    see bars.BarBuilder.
+    '''
+
+    __slots__ = ['ticker', 'start_time', 'open', 'high', 'low',
+                 'close', 'volume', 'vwap', 'trades', 'bid', 'ask', 'spread',
+                 'quotes', 'ticker_id']
+
+    kind = BAR_EVENT
+
+    def __init__(self, time, ticker, start_time, open, high, low, close,
+                 volume, vwap, trades, bid, ask, spread, quotes,
+                 ticker_id=None):
+
+        self.time_ns = to_nanoseconds(time)
+        self.ticker = ticker
+        self.start_time = start_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.vwap = vwap
+        self.trades = trades
+        self.bid = bid
+        self.ask = ask
+        self.spread = spread
+        self.quotes = quotes
+        self.ticker_id = ticker_id
+
+    def __repr__(self):
+        return 'BarEvent: {}, {}'.format(self.time, self.ticker)
+
+
+class TimerEvent(Event):
+    '''
+    Contains a callback scheduled at a simulated time, see
+    BacktestEngine.schedule_at() and BacktestEngine.schedule_every().
+    Repeating timers are rescheduled every interval nanoseconds until end.
+    '''
+
+    __slots__ = ['callback', 'interval', 'end']
+
+    kind = TIMER_EVENT
+
+    def __init__(self, time, callback, interval=None, end=None):
+
+        self.time_ns = to_nanoseconds(time)
+        self.callback = callback
+        self.interval = interval
+        self.end = end
+
+    def __repr__(self):
+        return 'TimerEvent: {}, {}'.format(self.time, self.callback)
@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import abc
+import numpy as np
+from collections import deque
+
+# Security fields updated by each event type
+TRADE_FIELDS = ('last_sale_price', 'last_sale_size')
+QUOTE_FIELDS = ('bid', 'ask', 'bid_size', 'ask_size')
+
+
+class Indicator(metaclass=abc.ABCMeta):
+    '''
+    Indicator updated in O(1) from the data of a security.
+
+    Indicators are registered with Security.add_indicator() or
+    BacktestEngine.add_indicator(), and the engine updates them each time
+    the event that changes their field arrives. NaN inputs are skipped.
+
+    Parameters:
+    ----------
+    field: str
+        Security attribute the indicator is computed on.
+    '''
+
+    def __init__(self, field):
+        if field in TRADE_FIELDS:
+            self.event_type = 'TradeEvent'
+        elif field in QUOTE_FIELDS:
+            self.event_type = 'QuoteEvent'
+        else:
+            raise ValueError('Unknown security field \'{}\'.'.format(field))
+
+        self.field = field
+
+    def __repr__(self):
+        return '{}({}) = {}'.format(self.__class__.__name__, self.field,
+                                    self.value)
+
+    def update_from(self, security):
+        '''
+        Update the indicator with the current data of a security.
+        '''
+        value = getattr(security, self.field)
+
+        if value == value:
+            self.update(value)
+
+    @abc.abstractmethod
+    def update(self, value):
+        pass
+
+    @property
+    @abc.abstractmethod
+    def value(self):
+        pass
+
+    @property
+    def ready(self):
+        return self.value == self.value
+
+
+class RingBuffer(object):
+    '''
+    Fixed size buffer of the last values appended, backed by a NumPy array.
+    '''
+
+    __slots__ = ['_values', '_index', 'count']
+
+    def __init__(self, size, dtype=np.float64):
+        if size < 1:
+            raise ValueError('Window must be at least 1.')
+
+        self._values = np.empty(size, dtype=dtype)
+        self._index = 0
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, len(self._values))
+
+    @property
+    def full(self):
+        return self.count >= len(self._values)
+
+    def append(self, value):
+        '''
+        Append a value. Returns the value it replaced, or NaN while the
+        buffer is filling.
+        '''
+        values = self._values
+        index = self._index
+
+        replaced = values[index] if self.count >= len(values) else np.nan
+
+        values[index] = value
+
+        index += 1
+        self._index = 0 if index == len(values) else index
+        self.count += 1
+
+        return replaced
+
+    def to_array(self):
+        '''
+        Returns the values in the order they were appended, oldest first.
+        '''
+        if not self.full:
+            return self._values[:self.count].copy()
+
+        return np.concatenate([self._values[self._index:],
+                               self._values[:self._index]])
+
+
+class SimpleMovingAverage(Indicator):
+    '''
+    Mean of the last window values. NaN until window values are seen.
+    '''
+
+    def __init__(self, window, field='last_sale_price'):
+        super().__init__(field)
+        self.window = window
+        self._buffer = RingBuffer(window)
+        self._sum = 0.
+
+    def update(self, value):
+        replaced = self._buffer.append(value)
+
+        # Recompute the sum once per window to avoid accumulating rounding
+        # errors, amortized O(1)
+        if self._buffer.count % self.window == 0:
+            self._sum = float(self._buffer._values.sum())
+        elif replaced == replaced:
+            self._sum += value - replaced
+        else:
+            self._sum += value
+
+    @property
+    def value(self):
+        if not self._buffer.full:
+            return np.nan
+        return self._sum / self.window
+
+
+class ExponentialMovingAverage(Indicator):
+    '''
+    Exponential moving average with smoothing factor 2 / (span + 1).
+    '''
+
+    def __init__(self, span, field='last_sale_price'):
+        super().__init__(field)
+        self.span = span
+        self.alpha = 2. / (span + 1)
+        self._value = np.nan
+
+    def update(self, value):
+        if self._value != self._value:
+            self._value = value
+        else:
+            self._value += self.alpha * (value - self._value)
+
+    @property
+    def value(self):
+        return self._value
+
+
+class RollingVariance(Indicator):
+    '''
+    Variance of the last window values, updated with Welford's algorithm
+    and recomputed once per window. NaN until window values are seen.
+
+    Parameters:
+    ----------
+    window: int
+        Number of values.
+
+    field: str
+        Security attribute the indicator is computed on.
+
+    ddof: int
+        Delta degrees of freedom, the divisor is window - ddof.
+    '''
+
+    def __init__(self, window, field='last_sale_price', ddof=1):
+        super().__init__(field)
+
+        if window - ddof < 1:
+            raise ValueError('Window must be larger than ddof.')
+
+        self.window = window
+        self.ddof = ddof
+        self._buffer = RingBuffer(window)
+        self._mean = 0.
+        self._m2 = 0.
+
+    def update(self, value):
+        replaced = self._buffer.append(value)
+
+        # Recompute the mean and M2 once per window to avoid accumulating
+        # rounding errors, amortized O(1)
+        if self._buffer.count % self.window == 0:
+            values = self._buffer._values
+            self._mean = float(values.mean())
+            self._m2 = float(((values - self._mean) ** 2).sum())
+
+        elif replaced != replaced:
+            count = self._buffer.count
+            delta = value - self._mean
+            self._mean += delta / count
+            self._m2 += delta * (value - self._mean)
+
+        else:
+            old_mean = self._mean
+            self._mean += (value - replaced) / self.window
+            self._m2 += (value - replaced) * (value - self._mean +
+                                              replaced - old_mean)
+
+            # Rounding can make M2 slightly negative for constant values
+            if self._m2 < 0:
+                self._m2 = 0.
+
+    @property
+    def mean(self):
+        if not self._buffer.full:
+            return np.nan
+        return self._mean
+
+    @property
+    def value(self):
+        if not self._buffer.full:
+            return np.nan
+        return self._m2 / (self.window - self.ddof)
+
+
+class RollingStandardDeviation(RollingVariance):
+    '''
+    Standard deviation of the last window values, see RollingVariance.
+    '''
+
+    @property
+    def value(self):
+        return np.sqrt(super().value)
+
+
+class VolumeWeightedAveragePrice(Indicator):
+    '''
+    Volume weighted average price of trades, over the last window trades
+    or, with window=None, all trades since the last reset().
+    '''
+
+    def __init__(self, window=None):
+        super().__init__('last_sale_price')
+        self.window = window
+        self._price_volume = RingBuffer(window) if window else None
+        self._volume = RingBuffer(window) if window else None
+        self._price_volume_sum = 0.
+        self._volume_sum = 0.
+
+    def update_from(self, security):
+        price = security.last_sale_price
+        size = security.last_sale_size
+
+        if price == price and size == size:
+            self.update(price, size)
+
+    def update(self, price, size=1.):
+        price_volume = price * size
+
+        if self.window:
+            replaced_price_volume = self._price_volume.append(price_volume)
+            replaced_volume = self._volume.append(size)
+
+            if replaced_volume == replaced_volume:
+                price_volume -= replaced_price_volume
+                size -= replaced_volume
+
+        self._price_volume_sum += price_volume
+        self._volume_sum += size
+
+    def reset(self):
+        '''
+        Start a new VWAP, e.g. at the start of a session.
+        '''
+        self.__init__(self.window)
+
+    @property
+    def value(self):
+        if self._volume_sum == 0:
+            return np.nan
+        return self._price_volume_sum / self._volume_sum
+
+
+class RollingMax(Indicator):
+    '''
+    Maximum of the last window values, kept with a monotonic deque.
+    '''
+
+    def __init__(self, window, field='last_sale_price'):
+        super().__init__(field)
+        self.window = window
+        self._deque = deque()
+        self._count = 0
+
+    def _dominates(self, new, old):
+        return new >= old
+
+    def update(self, value):
+        dominated = self._deque
+
+        while dominated and self._dominates(value, dominated[-1][1]):
+            dominated.pop()
+
+        dominated.append((self._count, value))
+        self._count += 1
+
+        if dominated[0][0] <= self._count - 1 - self.window:
+            dominated.popleft()
+
+    @property
+    def value(self):
+        if self._count < self.window:
+            return np.nan
+        return self._deque[0][1]
+
+
+class RollingMin(RollingMax):
+    '''
+    Minimum of the last window values, kept with a monotonic deque.
+    '''
+
+    def _dominates(self, new, old):
+        return new <= old
+
+
+class BidAskImbalance(Indicator):
+    '''
+    Quote size imbalance, (bid_size - ask_size) / (bid_size + ask_size),
+    from -1 (all asks) to 1 (all bids). With a window, the mean of the last
+    window quotes.
+    '''
+
+    def __init__(self, window=None):
+        super().__init__('bid_size')
+        self._mean = SimpleMovingAverage(window, 'bid_size') if window else None
+        self._value = np.nan
+
+    def update_from(self, security):
+        bid_size = security.bid_size
+        ask_size = security.ask_size
+        total = bid_size + ask_size
+
+        if total == total and total != 0:
+            self.update((bid_size - ask_size) / total)
+
+    def update(self, value):
+        self._value = value
+
+        if self._mean is not None:
+            self._mean.update(value)
+
+    @property
+    def value(self):
+        if self._mean is not None:
+            return self._mean.value
+        return self._value
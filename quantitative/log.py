@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import contextlib
+import pandas as pd
+
+
+class BacktestLog(object):
+    '''
+    Log of the verbose messages of the backtest. Messages are stored with
+    their arguments and the backtest time in nanoseconds, and only
+    formatted when the log is flushed. While buffering, e.g. during
+    BacktestEngine.run(), messages are written capacity at a time.
+
+    Messages are str.format() templates, {time} is replaced by the
+    backtest time as a pd.Timestamp.
+
+    Parameters:
+    ----------
+    stream: file
+        Where messages are written, defaults to sys.stdout.
+
+    capacity: int
+        Number of messages held before the buffer is flushed.
+    '''
+
+    __slots__ = ['stream', 'capacity', '_records', '_buffering']
+
+    def __init__(self, stream=None, capacity=1024):
+        self.stream = stream
+        self.capacity = capacity
+        self._records = []
+        self._buffering = False
+
+    def __len__(self):
+        return len(self._records)
+
+    def log(self, time, message, *args):
+        '''
+        Log a message.
+
+        Parameters:
+        ----------
+        time: int
+            Backtest time in epoch nanoseconds, or None.
+
+        message: str
+            Template of the message, formatted with args when flushed.
+        '''
+        records = self._records
+        records.append((time, message, args))
+
+        if not self._buffering or len(records) >= self.capacity:
+            self.flush()
+
+    def flush(self):
+        '''
+        Format and write the buffered messages.
+        '''
+        if not self._records:
+            return
+
+        stream = self.stream if self.stream is not None else sys.stdout
+
+        stream.write(''.join(
+            message.format(*args, time=_timestamp(time)) + '\n'
+            for time, message, args in self._records))
+        stream.flush()
+
+        self._records = []
+
+    @contextlib.contextmanager
+    def buffered(self):
+        '''
+        Buffer the messages logged in the block, and flush them when it
+        exits, including on errors.
+        '''
+        self._buffering = True
+
+        try:
+            yield self
+
+        finally:
+            self._buffering = False
+            self.flush()
+
+
+def _timestamp(time):
+    return None if time is None else pd.Timestamp(time)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import bisect
+
+
+class UnfilledOrderBook(object):
+    '''
+    Orders that could not be filled at the time they were processed,
+    indexed by ticker. Limit orders of each ticker are kept in buy and sell
+    ladders sorted by price, so a quote only reaches the limit orders whose
+    price it crosses.
+
+    Orders can also be read by time condition like a dict of tuples,
+    e.g. unfilled_orders['GTC'] or unfilled_orders.items(). The tuples are
+    read-only, orders are added and removed with add() and remove().
+    '''
+
+    TIME_CONDITIONS = ('AON', 'GTC', 'DAY')
+
+    def __init__(self):
+        self._orders = {}
+        self._books = {}
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(list(self._orders.values()))
+
+    def __contains__(self, order):
+        return order.order_id in self._orders
+
+    def __getitem__(self, time_condition):
+        '''
+        Returns a tuple of the unfilled orders with a time condition.
+        '''
+        if time_condition not in self.TIME_CONDITIONS:
+            raise KeyError(time_condition)
+
+        return tuple(order for order in self._orders.values()
+                     if order.time_condition == time_condition)
+
+    def keys(self):
+        return list(self.TIME_CONDITIONS)
+
+    def items(self):
+        return [(time_condition, self[time_condition])
+                for time_condition in self.TIME_CONDITIONS]
+
+    def add(self, order):
+        '''
+        Add an order to the book.
+
+        Raises:
+        ------
+        KeyError
+            If the time condition of the order cannot rest in the book,
+            e.g. 'FOK' or 'IOC'.
+        '''
+        if order.time_condition not in self.TIME_CONDITIONS:
+            raise KeyError(order.time_condition)
+
+        if order.order_id in self._orders:
+            return
+
+        ticker = order.security.ticker
+
+        if ticker not in self._books:
+            self._books[ticker] = _TickerBook()
+
+        self._books[ticker].add(order)
+        self._orders[order.order_id] = order
+
+    def remove(self, order):
+        '''
+        Remove an order from the book.
+
+        Raises:
+        ------
+        ValueError
+            If the order is not in the book.
+        '''
+        if order.order_id not in self._orders:
+            raise ValueError('Order not in unfilled orders.')
+
+        del self._orders[order.order_id]
+        self._books[order.security.ticker].remove(order)
+
+    def clear(self, time_condition=None):
+        '''
+        Remove all orders, or all orders with a time condition.
+        '''
+        if time_condition is None:
+            self._orders.clear()
+            self._books.clear()
+
+        else:
+            for order in self[time_condition]:
+                self.remove(order)
+
+    def crossed(self, ticker, bid, ask):
+        '''
+        Returns the orders of a ticker that may be filled at a quote: all
+        market orders, buy limit orders priced at or above the ask, and
+        sell limit orders priced at or below the bid. Limit orders are
+        ordered best price first.
+        '''
+        book = self._books.get(ticker)
+
+        if book is None:
+            return []
+
+        return book.crossed(bid, ask)
+
+
+class _TickerBook(object):
+    '''
+    Unfilled orders of one ticker.
+    '''
+
+    __slots__ = ['market_orders', 'buy_ladder', 'sell_ladder']
+
+    def __init__(self):
+        self.market_orders = {}
+        self.buy_ladder = _PriceLadder()
+        self.sell_ladder = _PriceLadder()
+
+    def _ladder(self, order):
+        if order.direction == 'BUY':
+            return self.buy_ladder
+        return self.sell_ladder
+
+    def add(self, order):
+        if order.order_type == 'LimitOrder':
+            self._ladder(order).add(order)
+        else:
+            self.market_orders[order.order_id] = order
+
+    def remove(self, order):
+        if order.order_type == 'LimitOrder':
+            self._ladder(order).remove(order)
+        else:
+            del self.market_orders[order.order_id]
+
+    def crossed(self, bid, ask):
+        orders = list(self.market_orders.values())
+
+        # NaN quotes cross no limit orders
+        if ask == ask:
+            orders.extend(self.buy_ladder.at_or_above(ask))
+
+        if bid == bid:
+            orders.extend(self.sell_ladder.at_or_below(bid))
+
+        return orders
+
+
+class _PriceLadder(object):
+    '''
+    Limit orders grouped by price level, with the price levels sorted.
+    Orders at the same price are kept in the order they were added.
+    '''
+
+    __slots__ = ['prices', 'levels']
+
+    def __init__(self):
+        self.prices = []
+        self.levels = {}
+
+    def add(self, order):
+        level = self.levels.get(order.price)
+
+        if level is None:
+            bisect.insort(self.prices, order.price)
+            level = self.levels[order.price] = {}
+
+        level[order.order_id] = order
+
+    def remove(self, order):
+        level = self.levels[order.price]
+        del level[order.order_id]
+
+        if not level:
+            del self.levels[order.price]
+            del self.prices[bisect.bisect_left(self.prices, order.price)]
+
+    def at_or_above(self, price):
+        '''
+        Orders priced at or above price, highest price first.
+        '''
+        start = bisect.bisect_left(self.prices, price)
+
+        return [order for level_price in reversed(self.prices[start:])
+                for order in self.levels[level_price].values()]
+
+    def at_or_below(self, price):
+        '''
+        Orders priced at or below price, lowest price first.
+        '''
+        stop = bisect.bisect_right(self.prices, price)
+
+        return [order for level_price in self.prices[:stop]
+                for order in self.levels[level_price].values()]
@@ -1,11 +1,43 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from .events import Event
 from .securities import Security
+import numbers
 import uuid
 import abc
 
+DIRECTIONS = ('BUY', 'SELL')
+
+
+def validate_order(direction, security, shares, price=None):
+    '''
+    Check the arguments of an order.
+
+    Raises:
+    ------
+    ValueError
+        If the direction is not BUY or SELL.
+
+    TypeError
+        If the security is not a Security, or the shares or price are not
+        numbers.
+    '''
+    if direction not in DIRECTIONS:
+        raise ValueError('Order direction must be BUY or SELL, not '
+                         '{!r}.'.format(direction))
+
+    if not isinstance(security, Security):
+        raise TypeError('Order security must be a Security, not '
+                        '{}.'.format(type(security).__name__))
+
+    if not isinstance(shares, numbers.Real):
+        raise TypeError('Order shares must be a number, not '
+                        '{}.'.format(type(shares).__name__))
+
+    if price is not None and not isinstance(price, numbers.Real):
+        raise TypeError('Order price must be a number, not '
+                        '{}.'.format(type(price).__name__))
+
 
 class Order(metaclass=abc.ABCMeta):
 
@@ -21,18 +53,18 @@ class Order(metaclass=abc.ABCMeta):
 
 class MarketOrder(Order):
     '''
-    Container for market order.
+    Container for market order. The arguments are checked with
+    validate_order() unless validate is False.
     '''
 
     __slots__ = ['creation_time', 'direction',
                  'security', 'shares', 'order_type']
 
     def __init__(self, creation_time, direction, security, shares,
-                 time_condition='GTC', order_condition=None):
+                 time_condition='GTC', order_condition=None, validate=True):
 
-        assert(type(direction) == str)
-        assert(type(shares) == int or float)
-        assert(type(security) == Security)
+        if validate:
+            validate_order(direction, security, shares)
 
         self.creation_time = creation_time
         self.direction = direction
@@ -49,19 +81,18 @@ class MarketOrder(Order):
 
 class LimitOrder(Order):
     '''
-    Container for limit order.
+    Container for limit order. The arguments are checked with
+    validate_order() unless validate is False.
     '''
 
     __slots__ = ['creation_time', 'direction', 'security', 'price', 'shares',
                  'order_type']
 
     def __init__(self, creation_time, direction, security, price, shares,
-                 time_condition='GTC', order_condition=None):
+                 time_condition='GTC', order_condition=None, validate=True):
 
-        assert(type(direction) == str)
-        assert(type(price) == int or float)
-        assert(type(shares) == int or float)
-        assert(type(security) == Security)
+        if validate:
+            validate_order(direction, security, shares, price)
 
         self.creation_time = creation_time
         self.direction = direction
@@ -5,44 +5,48 @@ import pandas as pd
 import numpy as np
 import abc
 from collections import namedtuple
+from .recorder import AccountValueRecorder
+from .ticks import to_nanoseconds
+from .transactions import (TransactionLog, market_transaction,
+                           cash_transaction)
+
+# Open position of a ticker, defined at module level so portfolios can be
+# pickled, see BacktestEngine.checkpoint_path
+security_position = namedtuple('security_position',
+                               ['time', 'ticker', 'market_price', 'shares',
+                                'purchase_price', 'purchase_time'])
 
 
 class Portfolio(metaclass=abc.ABCMeta):
 
     def __init__(self):
         ''' Cash Attributes'''
-        self.cash_in_account = {}
-
-        self.cash_ledger = namedtuple('cash_ledger', ['time', 'cash'])
+        # Current cash, earlier values are kept in portfolio_value. Times are
+        # epoch nanoseconds, see ticks.to_nanoseconds()
+        self.cash = np.nan
+        self.cash_time = None
 
         '''Portfolio Value Attributes'''
-        self.portfolio_value = {}
-
-        self.current_portfolio_value = namedtuple('current_portfolio_value',
-                                                  ['cash', 'investment_value',
-                                                      'portfolio_value'])
+        self.portfolio_value = AccountValueRecorder()
 
         '''Transaction Log Attributes'''
-        self.transaction_log = {}
-
-        self.market_transaction = namedtuple('market_transaction',
-                                             ['time', 'ticker',
-                                              'price', 'shares', 'direction',
-                                              'commission', 'sequence'])
+        self.transaction_log = TransactionLog()
 
-        self.cash_transaction = namedtuple('cash_transaction',
-                                           ['time', 'cash'])
+        self.market_transaction = market_transaction
+        self.cash_transaction = cash_transaction
 
         '''Open Positions Attributes'''
         self.open_positions = {}
 
-        self.security_position = namedtuple('security_position',
-                                            ['time', 'ticker', 'market_price',
-                                                'shares', 'purchase_price',
-                                                'purchase_time'])
+        self.security_position = security_position
+
+        # Market value of the open positions, updated as they change
+        self.investment_total = 0
+
         '''Holdings'''
         self.securities_in_universe = []
-        self.holdings = {}
+        self._holdings = {}
+        self._holdings_updated = True
 
         ''' Security Sequence Attributes '''
         self.security_sequences = {}
@@ -56,6 +60,10 @@ class Portfolio(metaclass=abc.ABCMeta):
         self.broker = 'ib'
         self.include_commission = True
 
+        # Check the account values when they are read, set by the engine
+        # from its validation level
+        self.validate = True
+
     ''' Cash in Account Methods '''
 
     def get_cash(self, time):
@@ -64,16 +72,25 @@ class Portfolio(metaclass=abc.ABCMeta):
 
         Parameters:
         ----------
-        time: pd.Timestamp
-            Time.
+        time: int or pd.Timestamp
+            Time in epoch nanoseconds.
 
         Returns:
         -------
-        self.cash_in_account[time].cash: float
+        cash: float
             The cash value.
+
+        Raises:
+        ------
+        KeyError
+            If no values were recorded at the time. Earlier cash values are
+            only kept at the snapshots of the snapshot frequency, see
+            recorder.AccountValueRecorder.
         '''
-        assert(type(time) == pd.Timestamp)
-        return self.cash_in_account[time].cash
+        if to_nanoseconds(time) == self.cash_time:
+            return self.cash
+
+        return self._recorded_values(time).cash
 
     def modify_cash(self, time, amount):
         '''
@@ -81,99 +98,98 @@ class Portfolio(metaclass=abc.ABCMeta):
 
         Parameters:
         ----------
-        time: pd.Timestamp
-            Time.
+        time: int or pd.Timestamp
+            Time in epoch nanoseconds.
 
         amount: float
             The new cash amount at the time.
         '''
-
-        assert(type(time) == pd.Timestamp)
-        ledger = self.cash_ledger(time, amount)
-        self.cash_in_account[time] = ledger
+        self.cash = amount
+        self.cash_time = to_nanoseconds(time)
 
     ''' Portfolio Value Methods '''
 
     def get_porfolio_value(self, time):
-        assert(type(time) == pd.Timestamp)
-        assert(self.portfolio_value[time].cash + self.portfolio_value[time].investment_value
-               == self.portfolio_value[time].portfolio_value)
-        return self.portfolio_value[time].portfolio_value
+        values = self._recorded_values(time)
 
-    def update_portfolio_values(self, time):
-        assert(type(time) == pd.Timestamp)
-        cash = self.get_cash(time)
-        investment_total = self.calculate_investment_total(time)
+        if self.validate:
+            assert(values.cash + values.investment_value ==
+                   values.portfolio_value)
 
-        portfolio_val = cash + investment_total
-
-        ledger = self.current_portfolio_value(
-            cash, investment_total, portfolio_val)
+        return values.portfolio_value
 
-        self.portfolio_value[time] = ledger
+    def _recorded_values(self, time):
 
-    ''' Holdings Modification Methods'''
+        try:
+            return self.portfolio_value[time]
 
-    def update_portfolio_holdings(self, time):
+        except KeyError:
+            raise KeyError('No account values recorded at {} with the '
+                           'snapshot frequency {!r}, only the snapshots '
+                           'are kept.'.format(
+                               pd.Timestamp(to_nanoseconds(time)),
+                               self.portfolio_value.frequency)) from None
 
-        self.holdings.clear()
-        total_investment_value = self.calculate_investment_total(time)
+    def update_portfolio_values(self, time):
+        cash = self.get_cash(time)
+        investment_total = self.calculate_investment_total(time)
 
-        for ticker, ledger in self.open_positions.items():
-            self.holdings[ticker] = ((ledger.market_price * ledger.shares)
-                                     / total_investment_value)
+        portfolio_val = cash + investment_total
 
-    '''Transaction Log Methods '''
+        self.portfolio_value.record(time, cash, investment_total,
+                                    portfolio_val)
 
-    def add_transaction(self, time, **kwargs):
+    ''' Holdings Modification Methods'''
 
-        assert(type(time) == pd.Timestamp)
-        if time in self.transaction_log.keys():
+    @property
+    def holdings(self):
+        '''
+        Weight of each open position in the investment total. Computed
+        when accessed after the open positions have changed.
+        '''
+        if not self._holdings_updated:
+            self._holdings.clear()
 
-            if 'cash' in kwargs.keys():
-                kwargs['time'] = time
+            for ticker, ledger in self.open_positions.items():
+                self._holdings[ticker] = ((ledger.market_price * ledger.shares)
+                                          / self.investment_total)
 
-                self.transaction_log[time].append(
-                    self.cash_transaction(**kwargs))
+            self._holdings_updated = True
 
-            else:
-                ticker = kwargs['ticker']
-                sequence = self.generate_sequence_for_transaction(ticker)
+        return self._holdings
 
-                kwargs['time'] = time
-                kwargs['sequence'] = sequence
+    def update_portfolio_holdings(self, time):
+        self._holdings_updated = False
 
-                ledger = self.market_transaction(**kwargs)
+    '''Transaction Log Methods '''
 
-                self.transaction_log[time].append(ledger)
+    def add_transaction(self, time, **kwargs):
+        '''
+        Log a cash transaction, add_transaction(time, cash=...), or a
+        market transaction, add_transaction(time, ticker=..., price=...,
+        shares=..., direction=..., commission=...).
+        '''
+        if 'cash' in kwargs:
+            self.transaction_log.add_cash(time, kwargs['cash'])
 
         else:
-            if 'cash' in kwargs.keys():
-                kwargs['time'] = time
-
-                self.transaction_log[time] = [
-                    self.cash_transaction(**kwargs)]
+            sequence = self.generate_sequence_for_transaction(
+                kwargs['ticker'])
 
-            else:
-                ticker = kwargs['ticker']
-                sequence = self.generate_sequence_for_transaction(ticker)
-
-                kwargs['time'] = time
-                kwargs['sequence'] = sequence
-
-                ledger = self.market_transaction(**kwargs)
-
-                self.transaction_log[time] = [ledger]
+            self.transaction_log.add_market(time, sequence=sequence,
+                                            **kwargs)
 
     def remove_transaction(self):
         pass
 
     def get_transaction(self, time):
 
-        assert(type(time) == pd.Timestamp)
         transaction = self.transaction_log[time]
 
-        if len(transaction) == 1:
+        if len(transaction) == 0:
+            raise KeyError(time)
+
+        elif len(transaction) == 1:
             return transaction[0]
 
         else:
@@ -193,29 +209,57 @@ class Portfolio(metaclass=abc.ABCMeta):
 
     def add_position(self, time, ticker, price, shares):
 
-        assert(type(time) == pd.Timestamp)
+        if ticker in self.open_positions:
+            self.remove_position(ticker)
+
         ledger = self.security_position(
             time, ticker, price, shares, price, time)
         self.open_positions[ticker] = ledger
 
-    def modify_position(self, ticker, **kwargs):
+        self.investment_total += price * shares
+        self._holdings_updated = False
 
-        if 'time' in kwargs:
-            assert(type(kwargs['time']) == pd.Timestamp)
+    def modify_position(self, ticker, **kwargs):
 
         current_security_position = self.open_positions[ticker]
         new_position = current_security_position._replace(**kwargs)
         self.open_positions[ticker] = new_position
 
+        if 'market_price' in kwargs or 'shares' in kwargs:
+            self.investment_total += (
+                new_position.market_price * new_position.shares -
+                current_security_position.market_price *
+                current_security_position.shares)
+
+            self._holdings_updated = False
+
     def remove_position(self, ticker):
 
-        del self.open_positions[ticker]
+        ledger = self.open_positions.pop(ticker)
 
-    def calculate_investment_total(self, time):
+        if self.open_positions:
+            self.investment_total -= ledger.market_price * ledger.shares
+        else:
+            # Reset to avoid accumulating rounding errors
+            self.investment_total = 0
+
+        self._holdings_updated = False
 
-        total = 0
-        for ticker, ledger in self.open_positions.items():
-            assert(time == ledger.time)
-            total += ledger.market_price * ledger.shares
+    def reconcile_investment_total(self):
+        '''
+        Recompute the investment total from the open positions, dropping
+        the rounding errors of the incremental updates. Called by the
+        engine at each market close.
+        '''
+        self.investment_total = sum(
+            ledger.market_price * ledger.shares
+            for ledger in self.open_positions.values())
+
+        self._holdings_updated = False
 
-        return total
+    def calculate_investment_total(self, time):
+        '''
+        Returns the market value of the open positions, kept up to date by
+        add_position, modify_position and remove_position.
+        '''
+        return self.investment_total
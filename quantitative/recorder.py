@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from .ticks import to_nanoseconds
+
+current_portfolio_value = namedtuple('current_portfolio_value',
+                                     ['cash', 'investment_value',
+                                      'portfolio_value'])
+
+
+class AccountValueRecorder(object):
+    '''
+    Records the cash, investment value and portfolio value of the backtest
+    in preallocated NumPy arrays, one row per time. Times are epoch
+    nanoseconds, or anything ticks.to_nanoseconds() accepts. Recording a value at
+    the same time as the last row overwrites that row.
+
+    The last row always holds the latest values. When a value is recorded
+    at a new time, the frequency decides if the last row is kept as a
+    snapshot or overwritten.
+
+    Parameters:
+    ----------
+    capacity: int
+        Number of rows preallocated. The arrays double in size when full.
+
+    frequency: str/int
+        Snapshot frequency of the recorded values.
+        options: 'event' (every event), 'change' (only when a value
+                 changes), 'close' (rows passed to commit(), e.g. at market
+                 close), N (every N events), or an interval accepted by
+                 pd.Timedelta such as '1min' (last values in each interval)
+    '''
+
+    __slots__ = ['frequency', '_time', '_values', '_length', '_count',
+                 '_committed', '_every', '_interval']
+
+    COLUMNS = ['cash', 'investment_value', 'portfolio_value']
+
+    def __init__(self, capacity=4096, frequency='event'):
+        self._time = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((capacity, len(self.COLUMNS)),
+                                dtype=np.float64)
+        self._length = 0
+
+        # Number of distinct times recorded
+        self._count = 0
+        self._committed = False
+
+        self.set_frequency(frequency)
+
+    def set_frequency(self, frequency):
+        '''
+        Set the snapshot frequency, see AccountValueRecorder.
+        '''
+        self._every = None
+        self._interval = None
+
+        if frequency in ('event', 'change', 'close'):
+            pass
+
+        elif isinstance(frequency, (int, np.integer)):
+            if frequency < 1:
+                raise ValueError('Snapshot frequency must be at least 1.')
+
+            self._every = int(frequency)
+
+        else:
+            self._interval = pd.Timedelta(frequency).value
+
+            if self._interval <= 0:
+                raise ValueError('Snapshot interval must be positive.')
+
+        self.frequency = frequency
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, time):
+        return self._index(time) is not None
+
+    def __getitem__(self, time):
+        '''
+        Returns the values recorded at a time as a current_portfolio_value
+        namedtuple.
+        '''
+        index = self._index(time)
+
+        if index is None:
+            raise KeyError(time)
+
+        return current_portfolio_value(*self._values[index].tolist())
+
+    def record(self, time, cash, investment_value, portfolio_value):
+        '''
+        Record the account values at a time.
+
+        Parameters:
+        ----------
+        time: int or pd.Timestamp
+            Time in epoch nanoseconds, must not be before the last recorded
+            time.
+
+        cash, investment_value, portfolio_value: float
+            The account values.
+        '''
+        time = to_nanoseconds(time)
+        index = self._length
+
+        if index and self._time[index - 1] == time:
+            index -= 1
+
+        else:
+            if index and not self._keep_last(time):
+                index -= 1
+
+            elif index == len(self._time):
+                self._grow()
+
+            self._time[index] = time
+            self._length = index + 1
+
+            self._count += 1
+            self._committed = False
+
+        values = self._values[index]
+        values[0] = cash
+        values[1] = investment_value
+        values[2] = portfolio_value
+
+    def commit(self):
+        '''
+        Keep the last row as a snapshot regardless of the frequency.
+        '''
+        self._committed = True
+
+    def last(self):
+        '''
+        Returns the last recorded values as a current_portfolio_value
+        namedtuple.
+        '''
+        return current_portfolio_value(
+            *self._values[self._length - 1].tolist())
+
+    def to_frame(self, copy=True):
+        '''
+        Returns the recorded values as a DataFrame indexed by time.
+
+        Parameters:
+        ----------
+        copy: bool
+            Copy the recorded values, the default. With copy=False the
+            DataFrame is a view of the recorder arrays, e.g. to avoid a
+            copy of a large run. It must then be treated as read-only:
+            changing it changes the values read from the recorder, and
+            later records can overwrite its rows.
+
+        Returns:
+        -------
+        account_values: pd.DataFrame
+            Cash, investment value and portfolio value by time.
+        '''
+        length = self._length
+
+        index = pd.DatetimeIndex(
+            self._time[:length].view('datetime64[ns]'), copy=copy)
+
+        return pd.DataFrame(self._values[:length], index=index,
+                            columns=self.COLUMNS, copy=copy)
+
+    def _index(self, time):
+        time = to_nanoseconds(time)
+        length = self._length
+
+        if length and self._time[length - 1] == time:
+            return length - 1
+
+        index = int(np.searchsorted(self._time[:length], time))
+
+        if index < length and self._time[index] == time:
+            return index
+
+        return None
+
+    def _keep_last(self, time):
+        '''
+        Returns True if the last row is kept when recording at a new time.
+        '''
+        last = self._length - 1
+
+        if self._committed or self.frequency == 'event':
+            return True
+
+        elif self._every is not None:
+            return self._count % self._every == 0
+
+        elif self._interval is not None:
+            return (time // self._interval !=
+                    self._time[last] // self._interval)
+
+        elif self.frequency == 'change':
+            return (last == 0 or
+                    (self._values[last] != self._values[last - 1]).any())
+
+        return False
+
+    def _grow(self):
+        capacity = max(2 * len(self._time), 1)
+
+        time = np.empty(capacity, dtype=np.int64)
+        time[:self._length] = self._time[:self._length]
+
+        values = np.empty((capacity, len(self.COLUMNS)), dtype=np.float64)
+        values[:self._length] = self._values[:self._length]
+
+        self._time = time
+        self._values = values
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+
+
+class EventScheduler(object):
+    '''
+    Single threaded priority queue of events built on heapq.
+
+    Entries are ordered by (time, priority, sequence) where time is in
+    integer nanoseconds and sequence is a monotonic counter, so events
+    with the same time and priority come out in the order they were put
+    in and the events themselves are never compared.
+    '''
+
+    __slots__ = ['_heap', '_sequence']
+
+    def __init__(self):
+        self._heap = []
+        self._sequence = itertools.count()
+
+    def __getstate__(self):
+        # The counter is kept as its next value, itertools.count cannot be
+        # pickled
+        return self._heap, next(self._sequence)
+
+    def __setstate__(self, state):
+        self._heap, sequence = state
+        self._sequence = itertools.count(sequence)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def empty(self):
+        return not self._heap
+
+    def put(self, time, priority, event):
+        '''
+        Add an event to the queue.
+
+        Parameters:
+        ----------
+        time: int
+            Time of the event in nanoseconds since epoch.
+
+        priority: int
+            Priority of the event, lower values are processed first
+            among events with the same time.
+
+        event: events.Event
+            The event.
+        '''
+        heapq.heappush(self._heap,
+                       (time, priority, next(self._sequence), event))
+
+    def get(self):
+        '''
+        Remove and return the next event.
+
+        Returns:
+        -------
+        (priority, event): tuple
+            The priority and the event.
+        '''
+        _, priority, _, event = heapq.heappop(self._heap)
+        return priority, event
+
+    def peek_key(self):
+        '''
+        Returns the (time, priority) of the next event without removing it.
+        '''
+        time, priority, _, _ = self._heap[0]
+        return time, priority
+
+    def clear(self):
+        self._heap.clear()
@@ -2,20 +2,27 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 import pandas as pd
+from .ticks import to_nanoseconds
 
 
 class Security(object):
     '''
-    Container for security information.
+    Container for security information. The times of the last quote and
+    trade are kept as epoch nanoseconds in time_ns and last_sale_time_ns,
+    time and last_sale_time return them as pd.Timestamp.
     '''
 
-    __slots__ = ['ticker', 'time', 'bid', 'ask', 'bid_size', 'ask_size',
-                 'last_sale_time', 'last_sale_size', 'last_sale_price',
-                 '_history']
+    __slots__ = ['ticker', 'time_ns', 'bid', 'ask', 'bid_size', 'ask_size',
+                 'last_sale_time_ns', 'last_sale_size', 'last_sale_price',
+                 'indicators', 'history_length', '_history']
+
+    QUOTE_FIELDS = ('time', 'bid', 'ask', 'bid_size', 'ask_size')
+    TRADE_FIELDS = ('last_sale_time', 'last_sale_price', 'last_sale_size')
 
     def __init__(self, ticker, time=None, bid=np.nan, ask=np.nan,
                  bid_size=np.nan, ask_size=np.nan, last_sale_time=None,
-                 last_sale_price=np.nan, last_sale_size=np.nan):
+                 last_sale_price=np.nan, last_sale_size=np.nan,
+                 history_length=1000):
 
         self.ticker = ticker
 
@@ -29,8 +36,30 @@ class Security(object):
         self.last_sale_price = last_sale_price
         self.last_sale_size = last_sale_size
 
+        # Indicators updated by the engine, by the event type that updates
+        # their field
+        self.indicators = {'TradeEvent': [], 'QuoteEvent': []}
+
+        # Number of quotes and trades kept when the backtest records history
+        self.history_length = history_length
         self._history = None
 
+    @property
+    def time(self):
+        return _timestamp(self.time_ns)
+
+    @time.setter
+    def time(self, time):
+        self.time_ns = None if time is None else to_nanoseconds(time)
+
+    @property
+    def last_sale_time(self):
+        return _timestamp(self.last_sale_time_ns)
+
+    @last_sale_time.setter
+    def last_sale_time(self, time):
+        self.last_sale_time_ns = None if time is None else to_nanoseconds(time)
+
     def __repr__(self):
 
         if self.time is not None:
@@ -47,6 +76,66 @@ class Security(object):
         else:
             return '[Security] {}'.format(self.ticker)
 
+    def add_indicator(self, indicator):
+        '''
+        Register an indicator, updated by the engine on each event that
+        changes the field of the indicator.
+
+        Parameters:
+        ----------
+        indicator: indicators.Indicator
+
+        Returns:
+        -------
+        indicator: indicators.Indicator
+            The registered indicator.
+        '''
+        self.indicators[indicator.event_type].append(indicator)
+        return indicator
+
+    def initialize_history(self):
+        '''
+        Start recording the last history_length quotes and trades. Called by
+        the engine when the backtest records history.
+        '''
+        self._history = {
+            'QuoteEvent': _RingHistory(self.QUOTE_FIELDS, self.history_length),
+            'TradeEvent': _RingHistory(self.TRADE_FIELDS, self.history_length)}
+
+    def history(self, field, n=None):
+        '''
+        Returns the recent values of a quote or trade field, oldest first.
+
+        Parameters:
+        ----------
+        field: str
+            Quote field ('time', 'bid', 'ask', 'bid_size', 'ask_size') or
+            trade field ('last_sale_time', 'last_sale_price',
+            'last_sale_size').
+
+        n: int
+            Number of values, at most history_length. Defaults to all
+            recorded values.
+
+        Returns:
+        -------
+        values: np.ndarray
+            Read-only view of the history, valid until the next event of
+            the security. Times are datetime64[ns].
+        '''
+        if self._history is None:
+            raise RuntimeError('History is not recorded, run the backtest '
+                               'with record_history=True.')
+
+        if field in self.QUOTE_FIELDS:
+            history = self._history['QuoteEvent']
+        elif field in self.TRADE_FIELDS:
+            history = self._history['TradeEvent']
+        else:
+            raise KeyError(field)
+
+        return history.last(field, n)
+
     def summary(self):
         summary = pd.Series([self.time, self.ticker, self.bid,
                              self.ask, self.bid_size, self.ask_size,
@@ -56,3 +145,62 @@ class Security(object):
                                    'Bid Size', 'Ask Size', 'Last Sale Time',
                                    'Last Sale Price', 'Last Sale Size'])
         return summary
+
+
+def _timestamp(time_ns):
+    return None if time_ns is None else pd.Timestamp(time_ns)
+
+
+class _RingHistory(object):
+    '''
+    Preallocated ring buffers of the last values of a set of fields.
+
+    Each value is written twice, at i and i + length, so the last n values
+    are always a contiguous slice of the buffer and can be returned as a
+    view.
+    '''
+
+    __slots__ = ['length', 'count', '_names', '_columns', '_index']
+
+    def __init__(self, fields, length):
+        if length < 1:
+            raise ValueError('History length must be at least 1.')
+
+        self.length = length
+        self.count = 0
+        self._names = fields
+        self._index = 0
+
+        # Time fields are stored as int64 nanoseconds
+        self._columns = [np.zeros(2 * length, dtype=np.int64)
+                         if name.endswith('time') else
+                         np.full(2 * length, np.nan)
+                         for name in fields]
+
+    def append(self, *values):
+        index = self._index
+        mirror = index + self.length
+
+        for column, value in zip(self._columns, values):
+            column[index] = value
+            column[mirror] = value
+
+        index += 1
+        self._index = 0 if index == self.length else index
+        self.count += 1
+
+    def last(self, field, n=None):
+        available = min(self.count, self.length)
+        n = available if n is None else min(n, available)
+
+        stop = self._index + self.length
+        column = self._columns[self._names.index(field)]
+
+        values = column[stop - n:stop]
+
+        if column.dtype == np.int64:
+            values = values.view('datetime64[ns]')
+
+        values.flags.writeable = False
+
+        return values
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from multiprocessing import shared_memory
+from .ticks import TickData
+from .sources import ColumnarSource
+
+shared_tick_data_handle = namedtuple('shared_tick_data_handle',
+                                     ['name', 'length', 'tickers', 'columns'])
+
+# Column offsets are aligned to cache lines
+ALIGNMENT = 64
+
+
+class SharedTickData(object):
+    '''
+    Publishes tick data once into a multiprocessing.shared_memory block as
+    typed columns. Other processes attach to it with the picklable handle,
+    e.g. through a SharedMemorySource, without copying the data.
+
+    The process that publishes the data owns the block and must unlink it
+    when the workers are done, or use it as a context manager.
+
+    Parameters:
+    ----------
+    data: pandas.DataFrame or ticks.TickData
+        The tick data. See sources.DataFrameSource for the DataFrame format.
+    '''
+
+    def __init__(self, data):
+        if isinstance(data, pd.DataFrame):
+            data = TickData.from_dataframe(data)
+
+        length = len(data)
+        columns = []
+        size = 0
+
+        for name in TickData.COLUMNS:
+            dtype = np.dtype(TickData.DTYPES[name])
+            columns.append((name, dtype.str, size))
+
+            size += length * dtype.itemsize
+            size += -size % ALIGNMENT
+
+        self._shared_memory = shared_memory.SharedMemory(create=True,
+                                                         size=max(size, 1))
+
+        for name, dtype, offset in columns:
+            column = np.ndarray(length, dtype=dtype, offset=offset,
+                                buffer=self._shared_memory.buf)
+            column[:] = getattr(data, name)
+            del column
+
+        self.handle = shared_tick_data_handle(self._shared_memory.name,
+                                              length, list(data.tickers),
+                                              columns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unlink()
+
+    def unlink(self):
+        '''
+        Release the shared memory block. Processes still attached keep
+        their mapping until they close it.
+        '''
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+
+
+def attach_tick_data(handle):
+    '''
+    Attach to tick data published with SharedTickData.
+
+    Parameters:
+    ----------
+    handle: shared_tick_data_handle
+        SharedTickData.handle of the published data.
+
+    Returns:
+    -------
+    tick_data: ticks.TickData
+        Tick data with columns that are views of the shared memory.
+
+    shared: multiprocessing.shared_memory.SharedMemory
+        The attached block, must be kept alive while tick_data is used.
+    '''
+    shared = shared_memory.SharedMemory(name=handle.name)
+
+    columns = {name: np.ndarray(handle.length, dtype=dtype, offset=offset,
+                                buffer=shared.buf)
+               for name, dtype, offset in handle.columns}
+
+    for column in columns.values():
+        column.flags.writeable = False
+
+    return TickData(tickers=handle.tickers, **columns), shared
+
+
+class SharedMemorySource(ColumnarSource):
+    '''
+    Event source over tick data published with SharedTickData. Pickling
+    the source only pickles the handle, so it can be sent to worker
+    processes which attach to the same memory.
+
+    Parameters:
+    ----------
+    handle: shared_tick_data_handle
+        SharedTickData.handle of the published data.
+
+    chunksize: int
+        Number of ticks converted into events at a time.
+    '''
+
+    def __init__(self, handle, chunksize=65536):
+        self.handle = handle
+        tick_data, self._shared_memory = attach_tick_data(handle)
+        super().__init__(tick_data, chunksize)
+
+    def __getstate__(self):
+        return {'handle': self.handle, 'chunksize': self.chunksize,
+                'conflation': self.conflation}
+
+    def __setstate__(self, state):
+        self.__init__(state['handle'], state['chunksize'])
+
+        if state['conflation'] is not None:
+            self.conflate(*state['conflation'])
@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import abc
+import itertools
+import numpy as np
+import pandas as pd
+from .events import TradeEvent, QuoteEvent, MarketStatusEvent
+from .ticks import (TickData, TRADE, QUOTE, NANOSECONDS_PER_DAY,
+                    time_of_day, session_boundaries, conflate_ticks,
+                    conflation_interval)
+
+
+class EventSource(metaclass=abc.ABCMeta):
+    '''
+    Lazy source of market data events for the backtest engine.
+
+    Subclasses only need to yield TradeEvent and QuoteEvent objects in
+    time order from market_data(); market open/close events are inserted
+    by events() as the data is consumed.
+    '''
+
+    # Dense integer ids of the tickers in the universe, see set_ticker_ids()
+    ticker_ids = None
+
+    def set_ticker_ids(self, ticker_ids):
+        '''
+        Set the ids the engine gives the tickers of its universe. Sources
+        that support it tag their events with the id of their ticker, so
+        the engine looks up securities by index instead of by name. Events
+        of other tickers, or from sources that do not, have a ticker_id of
+        None.
+
+        Parameters:
+        ----------
+        ticker_ids: dict
+            Integer id of each ticker.
+        '''
+        self.ticker_ids = ticker_ids
+
+    @abc.abstractmethod
+    def start_time(self):
+        '''
+        Returns the time of the first event in the source.
+
+        Returns:
+        -------
+        start_time: pd.Timestamp
+            Time of the first market data event.
+        '''
+        pass
+
+    @abc.abstractmethod
+    def market_data(self):
+        '''
+        Yields TradeEvent and QuoteEvent objects in time order.
+        '''
+        pass
+
+    def events(self, market_open_time, market_close_time, start=0):
+        '''
+        Returns an iterator over the market data events of the source with
+        MarketStatusEvents at each session open and close. See
+        ticks.session_boundaries for where sessions open and close.
+
+        Parameters:
+        ----------
+        market_open_time: str
+            Time of day the market opens. e.g. '09:30:00.000000000'
+
+        market_close_time: str
+            Time of day the market closes. e.g. '16:00:00.000000000'
+
+        start: int
+            Number of events to skip, e.g. the events a backtest consumed
+            before a checkpoint.
+        '''
+        events = self._session_events(market_open_time, market_close_time)
+
+        if start:
+            return itertools.islice(events, start, None)
+
+        return events
+
+    def _session_events(self, market_open_time, market_close_time):
+        open_offset = time_of_day(market_open_time)
+        close_offset = time_of_day(market_close_time)
+
+        # The first session opens like the others, before the first tick
+        # after the market open, pre-market ticks come first
+        first_time_in_data = self.start_time().value
+        session_day = (first_time_in_data -
+                       first_time_in_data % NANOSECONDS_PER_DAY -
+                       NANOSECONDS_PER_DAY)
+
+        session_open = False
+
+        for event in self.market_data():
+
+            event_time = event.time_ns
+
+            if session_open and event_time > session_day + close_offset:
+
+                yield MarketStatusEvent(session_day + close_offset,
+                                        market_status='CLOSE')
+
+                session_open = False
+
+            if not session_open:
+                day = event_time - event_time % NANOSECONDS_PER_DAY
+
+                if day > session_day and event_time > day + open_offset:
+                    session_day = day
+
+                    yield MarketStatusEvent(session_day + open_offset,
+                                            market_status='OPEN')
+
+                    session_open = True
+
+                    # Only after hours data on this day
+                    if event_time > session_day + close_offset:
+
+                        yield MarketStatusEvent(session_day + close_offset,
+                                                market_status='CLOSE')
+
+                        session_open = False
+
+            yield event
+
+
+class ColumnarSource(EventSource):
+    '''
+    Event source over columnar tick data. Events are created from the
+    columns one chunk at a time as the backtest consumes them.
+
+    Parameters:
+    ----------
+    tick_data: ticks.TickData
+        The tick data, sorted by time.
+
+    chunksize: int
+        Number of ticks converted into events at a time.
+    '''
+
+    def __init__(self, tick_data, chunksize=65536):
+        self.tick_data = tick_data
+        self.chunksize = chunksize
+        self.conflation = None
+
+    def conflate(self, interval, trades='keep'):
+        '''
+        Keep only the last quote of each ticker in each interval, see
+        ticks.conflate_ticks. The conflated ticks are copied once, before
+        any events are created.
+
+        Parameters:
+        ----------
+        interval: str or pd.Timedelta
+            Length of the conflation intervals, e.g. '1s'.
+
+        trades: str
+            options: 'keep', 'summarize'
+
+        Returns:
+        -------
+        self: ColumnarSource
+        '''
+        self.tick_data = conflate_ticks(self.tick_data, interval, trades)
+        self.conflation = (interval, trades)
+
+        return self
+
+    def start_time(self):
+        return pd.Timestamp(int(self.tick_data.time[0]))
+
+    def market_data(self, first_tick=0):
+        number_of_ticks = len(self.tick_data)
+
+        for start in range(first_tick, number_of_ticks, self.chunksize):
+            stop = min(start + self.chunksize, number_of_ticks)
+            yield from _tick_events(self.tick_data, start, stop,
+                                    self.ticker_ids)
+
+    def events(self, market_open_time, market_close_time, start=0):
+        '''
+        Same as EventSource.events(), with the session boundaries computed
+        from the time column up front. Skipped events are not created, the
+        source seeks to the first tick after them.
+        '''
+        positions, boundary_times, is_open = session_boundaries(
+            self.tick_data.time, market_open_time, market_close_time)
+
+        first_tick = _first_tick(positions, start, len(self.tick_data))
+        first_boundary = start - first_tick
+
+        boundaries = iter(list(zip(positions[first_boundary:].tolist(), [
+            MarketStatusEvent(boundary_time,
+                              market_status='OPEN' if status else 'CLOSE')
+            for boundary_time, status in zip(
+                boundary_times[first_boundary:].tolist(),
+                is_open[first_boundary:].tolist())])))
+
+        return self._columnar_events(boundaries, first_tick)
+
+    def _columnar_events(self, boundaries, first_tick):
+
+        next_position, next_boundary = next(boundaries, (None, None))
+
+        for index, event in enumerate(self.market_data(first_tick),
+                                      first_tick):
+
+            while index == next_position:
+                yield next_boundary
+                next_position, next_boundary = next(boundaries, (None, None))
+
+            yield event
+
+
+class DataFrameSource(ColumnarSource):
+    '''
+    Event source over tick data already loaded in a DataFrame. The columns
+    are converted to ticks.TickData once, events are created from them as
+    the backtest consumes them.
+
+    Parameters:
+    ----------
+    data: pandas.DataFrame
+        The Pandas DataFrame with the tick data.
+
+        Format:
+        ------
+        DATE_TIME,BID,BID_SIZE,ASK,ASK_SIZE,SEC,TYPE,SIZE,PRICE
+        2017-11-10 09:46:32.278115304,83.79,1.0,83.81,2.0,MSFT,QUOTE,,
+        2017-11-10 09:46:32.278133425,103.77,1.0,103.88,1.0,AAPL,QUOTE,,
+        2017-11-10 09:46:32.278142489,103.77,1.0,103.88,1.0,AAPL,QUOTE,,
+        2017-11-10 09:46:32.278175650,,,,,MSFT,TRADE,100.0,84.8
+        2017-11-10 09:46:32.278182576,83.79,7.0,83.8,5.0,MSFT,QUOTE,,
+        2017-11-10 09:46:32.278187841,,,,,AAPL,TRADE,100.0,103.8
+        2017-11-10 09:46:32.278192693,83.79,3.0,83.81,4.0,MSFT,QUOTE,,
+        2017-11-10 09:46:32.278221346,103.79,4.0,103.8,3.0,AAPL,QUOTE,,
+        2017-11-10 09:46:32.278229858,83.72,1.0,83.81,2.0,MSFT,QUOTE,,
+        2017-11-10 09:46:32.278235405,,,,,MSFT,TRADE,200.0,85.8
+
+    chunksize: int
+        Number of ticks converted into events at a time.
+    '''
+
+    def __init__(self, data, chunksize=65536):
+        super().__init__(TickData.from_dataframe(data), chunksize)
+
+
+class CSVSource(EventSource):
+    '''
+    Event source that reads a tick data CSV file in chunks, so only one
+    chunk of rows is held in memory at a time. The file must be sorted by
+    time.
+
+    Parameters:
+    ----------
+    path: str
+        Path to the CSV file, in the format described in DataFrameSource.
+
+    chunksize: int
+        Number of rows read from the file at a time.
+    '''
+
+    def __init__(self, path, chunksize=100000):
+        self.path = path
+        self.chunksize = chunksize
+        self.conflation = None
+
+    def conflate(self, interval, trades='keep'):
+        '''
+        Keep only the last quote of each ticker in each interval, see
+        ticks.conflate_ticks. Each chunk of rows is conflated separately,
+        so an interval split between chunks can keep two quotes.
+
+        Parameters:
+        ----------
+        interval: str or pd.Timedelta
+            Length of the conflation intervals, e.g. '1s'.
+
+        trades: str
+            options: 'keep', 'summarize'
+
+        Returns:
+        -------
+        self: CSVSource
+        '''
+        conflation_interval(interval, trades)
+        self.conflation = (interval, trades)
+
+        return self
+
+    def start_time(self):
+        first_row = pd.read_csv(self.path, parse_dates=True, index_col=0,
+                                nrows=1)
+        return first_row.index[0]
+
+    def market_data(self):
+        reader = pd.read_csv(self.path, parse_dates=True, index_col=0,
+                             chunksize=self.chunksize)
+
+        for chunk in reader:
+            tick_data = TickData.from_dataframe(chunk)
+
+            if self.conflation is not None:
+                tick_data = conflate_ticks(tick_data, *self.conflation)
+
+            yield from _tick_events(tick_data, 0, len(tick_data),
+                                    self.ticker_ids)
+
+
+def _first_tick(positions, start, number_of_ticks):
+    '''
+    Index of the first tick at or after position start of the events of a
+    ColumnarSource, where each tick follows the session boundaries at its
+    index.
+    '''
+    low = 0
+    high = number_of_ticks
+
+    while low < high:
+        middle = (low + high) // 2
+
+        if middle + int(np.searchsorted(positions, middle,
+                                        side='right')) >= start:
+            high = middle
+        else:
+            low = middle + 1
+
+    return low
+
+
+def _tick_events(tick_data, start, stop, ticker_ids=None):
+    '''
+    Yields a TradeEvent or QuoteEvent for each tick from start to stop,
+    tagged with the ids of their tickers in ticker_ids.
+    '''
+    times = tick_data.time[start:stop].tolist()
+    codes = tick_data.ticker[start:stop]
+    tickers = np.asarray(tick_data.tickers, dtype=object)[codes].tolist()
+
+    # Ticker codes of the data translated to the ids of the engine
+    if ticker_ids is None:
+        ids = [None] * len(tickers)
+    else:
+        ids = np.array([ticker_ids.get(ticker) for ticker in
+                        tick_data.tickers], dtype=object)[codes].tolist()
+
+    # Only the columns of each event type are converted to Python objects,
+    # quotes and trades are read from their own iterators in tick order
+    event_types = tick_data.event_type[start:stop]
+    quote_rows = np.flatnonzero(event_types == QUOTE) + start
+    trade_rows = np.flatnonzero(event_types == TRADE) + start
+
+    quotes = zip(tick_data.bid[quote_rows].tolist(),
+                 tick_data.ask[quote_rows].tolist(),
+                 tick_data.bid_size[quote_rows].tolist(),
+                 tick_data.ask_size[quote_rows].tolist())
+    trades = zip(tick_data.price[trade_rows].tolist(),
+                 tick_data.size[trade_rows].tolist())
+
+    for time, event_type, ticker, ticker_id in zip(
+            times, event_types.tolist(), tickers, ids):
+
+        if event_type == QUOTE:
+            yield QuoteEvent(time, ticker, *next(quotes), ticker_id)
+
+        elif event_type == TRADE:
+            yield TradeEvent(time, ticker, *next(trades), ticker_id)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import itertools
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from .ticks import TickData
+from .tickstore import TickStoreSource
+from .shared import SharedTickData, SharedMemorySource
+
+
+def parameter_grid(parameters):
+    '''
+    Expand a parameter grid into a list of parameter dicts.
+
+    Parameters:
+    ----------
+    parameters: dict or list
+        A dict of parameter name to list of values, expanded to every
+        combination of values, or a list of parameter dicts.
+
+    Returns:
+    -------
+    grid: list
+        List of parameter dicts.
+    '''
+    if isinstance(parameters, dict):
+        names = list(parameters.keys())
+        return [dict(zip(names, values))
+                for values in itertools.product(*parameters.values())]
+
+    return [dict(p) for p in parameters]
+
+
+def run_sweep(strategy, parameters, data, processes=None, validation='fast'):
+    '''
+    Run a backtest for every combination of parameters across a pool of
+    processes.
+
+    The market data is shared by the workers instead of being pickled to
+    each one: tick data is published once to shared memory, and a tick
+    store is memory-mapped by each worker.
+
+    Parameters:
+    ----------
+    strategy: BacktestEngine subclass
+        Called as strategy(data, **parameters), where data is an event
+        source to pass to BacktestEngine.__init__. Must be importable by
+        the worker processes.
+
+    parameters: dict or list
+        Parameter grid, see parameter_grid.
+
+    data: str, pandas.DataFrame or ticks.TickData
+        Directory of a tick store, or tick data to publish to shared memory
+        for the sweep.
+
+    processes: int
+        Number of worker processes, defaults to the number of CPUs. With
+        processes=1 the backtests run in the calling process.
+
+    validation: str
+        Validation level of the backtests, see BacktestEngine.validation.
+        Defaults to 'fast', None keeps the level set by the strategy.
+
+    Returns:
+    -------
+    metrics: pd.DataFrame
+        Final account values, cumulative return and number of market
+        transactions of each run, indexed by parameters.
+
+    equity_curves: pd.DataFrame
+        Account values returned by run(), indexed by parameters and time.
+
+    Raises:
+    ------
+    ValueError
+        If the grid is empty or a run has no parameters, e.g. {} or [{}],
+        since the results are indexed by parameters.
+    '''
+    grid = parameter_grid(parameters)
+
+    if not grid:
+        raise ValueError('Parameter grid is empty.')
+
+    if not all(grid):
+        raise ValueError('Parameter grid has runs without parameters, use '
+                         'BacktestEngine.run() for a single backtest.')
+
+    if isinstance(data, (pd.DataFrame, TickData)):
+        with SharedTickData(data) as shared:
+            source = SharedMemorySource(shared.handle)
+            return _run_grid(strategy, grid, source, processes, validation)
+
+    elif isinstance(data, str) and os.path.isdir(data):
+        return _run_grid(strategy, grid, TickStoreSource(data), processes,
+                         validation)
+
+    else:
+        raise TypeError('Data must be a tick store directory, a DataFrame '
+                        'or TickData.')
+
+
+def _run_grid(strategy, grid, source, processes, validation):
+
+    if processes == 1:
+        results = [_run_backtest(strategy, source, p, validation)
+                   for p in grid]
+
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_run_backtest,
+                                        itertools.repeat(strategy),
+                                        itertools.repeat(source), grid,
+                                        itertools.repeat(validation)))
+
+    return _combine_results(grid, results)
+
+
+def _run_backtest(strategy, source, parameters, validation=None):
+    '''
+    Run one backtest of the sweep. Returns the account values and final
+    metrics of the run.
+    '''
+    backtest = strategy(source, **parameters)
+
+    if validation is not None:
+        backtest.validation = validation
+
+    account_values = backtest.run()
+
+    start = account_values.iloc[0]
+    end = account_values.iloc[-1]
+
+    metrics = {'cash': end.cash,
+               'investment_value': end.investment_value,
+               'portfolio_value': end.portfolio_value,
+               'cumulative_return': (
+                   (end.portfolio_value - start.portfolio_value) /
+                   start.portfolio_value
+                   if start.portfolio_value else float('nan')),
+               'transactions': len(
+                   backtest.get_transaction_log().market)}
+
+    return metrics, account_values
+
+
+def _combine_results(grid, results):
+
+    names = list(grid[0].keys())
+    keys = [tuple(p[name] for name in names) for p in grid]
+
+    if len(names) == 1:
+        index = pd.Index([key[0] for key in keys], name=names[0])
+    else:
+        index = pd.MultiIndex.from_tuples(keys, names=names)
+
+    metrics = pd.DataFrame([m for m, _ in results], index=index)
+
+    equity_curves = pd.concat([curve for _, curve in results],
+                              keys=list(index),
+                              names=names + ['time'])
+
+    return metrics, equity_curves
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Security, BacktestEngine, BarSource
+
+bars = pd.DataFrame(
+    {'SEC': ['AAPL', 'MSFT', 'AAPL', 'MSFT', 'AAPL', 'MSFT'],
+     'OPEN': [100.0, 50.0, 102.0, 51.0, 98.0, 52.0],
+     'HIGH': [101.0, 51.0, 103.0, 52.0, 99.0, 53.0],
+     'LOW': [99.0, 49.0, 101.0, 50.0, 96.0, 51.0],
+     'CLOSE': [100.5, 50.5, 102.5, 51.5, 97.0, 52.5],
+     'VOLUME': [1000.0, 500.0, 1000.0, 500.0, 1000.0, 500.0]},
+    index=pd.DatetimeIndex(['2017-11-10 16:00:00'] * 2 +
+                           ['2017-11-13 16:00:00'] * 2 +
+                           ['2017-11-14 16:00:00'] * 2, name='DATE_TIME'))
+
+
+class BarModeBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(BarSource(bars), [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+        self.bars = 0
+
+    def on_bar(self, bar):
+        self.bars += 1
+
+        if bar.ticker == 'AAPL' and self.bars == 1:
+            self.place_order(self.create_market_order('BUY', self.aapl, 10))
+
+            # Filled when the last bar trades down to it
+            self.place_order(self.create_limit_order('BUY', self.aapl, 5,
+                                                     97.5))
+
+    def trade_logic(self):
+        pass
+
+
+'''Market orders fill at the next open, limit orders at their price'''
+backtest = BarModeBacktest()
+result = backtest.run()
+
+assert(backtest.bars == 6)
+transactions = backtest.get_transaction_log().market_frame()
+assert(list(transactions.price) == [102.0, 97.5])
+assert(list(transactions.shares) == [10.0, 5.0])
+assert(backtest.get_shares('AAPL') == 15)
+assert(backtest.get_number_of_unfilled_orders() == 0)
+
+'''Positions are valued at the bar close'''
+expected = 10000.0 - 10 * 102.0 - 5 * 97.5 + 15 * 97.0
+assert(np.isclose(result.portfolio_value.iloc[-1], expected))
+assert(backtest.aapl.last_sale_price == 97.0)
+
+'''Fills at the close with slippage and a volume limit'''
+backtest = BarModeBacktest()
+backtest.bar_market_fill = 'close'
+backtest.bar_slippage = 0.01
+backtest.bar_volume_limit = 0.005
+backtest.run()
+
+transactions = backtest.get_transaction_log().market_frame()
+assert(np.allclose(transactions.price, [100.5 * 1.01, 102.0 * 1.01, 97.5]))
+assert(list(transactions.shares) == [5.0, 5.0, 5.0])
+
+'''Orders placed on a bar fill after the bars with the same time'''
+
+
+class CrossTickerBacktest(BarModeBacktest):
+
+    def on_bar(self, bar):
+        self.bars += 1
+
+        # The MSFT bar of the same time comes after the AAPL bar
+        if bar.ticker == 'AAPL' and self.bars == 1:
+            self.place_order(self.create_market_order('BUY', self.msft, 10))
+
+
+backtest = CrossTickerBacktest()
+backtest.run()
+
+transactions = backtest.get_transaction_log().market_frame()
+assert(list(transactions.ticker) == ['MSFT'])
+assert(list(transactions.price) == [51.0])
+assert(transactions.index[0] == pd.Timestamp('2017-11-13 16:00:00'))
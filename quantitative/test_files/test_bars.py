@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Security, BacktestEngine, DataFrameSource
+from quantitative.bars import TimeBarBuilder, TickBarBuilder, VolumeBarBuilder
+
+market_data = pd.read_csv('../data_files/test_data.csv', parse_dates=True,
+                          index_col=0)
+
+
+def bars(bar_builder):
+    source = DataFrameSource(market_data)
+    events = bar_builder.events(source.events('09:30:00', '16:00:00'))
+    return [event for event in events if event.event_type == 'BarEvent']
+
+
+'''Time bars are emitted at their end, before the next event'''
+result = bars(TimeBarBuilder('1min'))
+assert([(bar.ticker, bar.time) for bar in result] ==
+       [('MSFT', pd.Timestamp('2017-11-10 09:47:00')),
+        ('AAPL', pd.Timestamp('2017-11-10 09:47:00')),
+        ('AAPL', pd.Timestamp('2017-11-11 09:47:00')),
+        ('MSFT', pd.Timestamp('2017-11-11 09:47:00'))])
+
+msft = result[0]
+assert(msft.start_time == pd.Timestamp('2017-11-10 09:46:00'))
+assert(msft.open == msft.close == 84.8)
+assert(msft.volume == 100.0 and msft.trades == 1)
+assert(msft.quotes == 3)
+assert(np.isclose(msft.spread, (0.02 + 0.01 + 0.02) / 3))
+assert((msft.bid, msft.ask) == (83.79, 83.81))
+
+'''Bars without trades have no prices'''
+assert(np.isnan(result[2].open) and np.isnan(result[2].vwap))
+assert(result[2].volume == 0)
+
+'''Tick bars close on the trade that completes them'''
+result = bars(TickBarBuilder(2, tickers=['MSFT']))
+assert(len(result) == 1)
+assert(result[0].time == pd.Timestamp('2017-11-11 09:46:32.278235405'))
+assert((result[0].open, result[0].high, result[0].low, result[0].close) ==
+       (84.8, 85.8, 84.8, 85.8))
+assert(np.isclose(result[0].vwap, (84.8 * 100 + 85.8 * 200) / 300))
+
+'''Incomplete bars are emitted at the end of the data'''
+result = bars(VolumeBarBuilder(1000))
+assert([(bar.ticker, bar.volume) for bar in result] ==
+       [('MSFT', 300.0), ('AAPL', 100.0)])
+
+
+class BarBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+        self.subscribe_bars('1min')
+
+        self.bars = []
+        self.calls = 0
+
+    def on_bar(self, bar):
+        self.bars.append(bar)
+
+    def trade_logic(self):
+        self.calls += 1
+
+
+'''Strategies run on bars instead of ticks'''
+backtest = BarBacktest()
+backtest.run()
+assert(len(backtest.bars) == 4)
+assert(backtest.calls == 4)
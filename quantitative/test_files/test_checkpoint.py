@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import itertools
+import tempfile
+import pandas as pd
+from quantitative import Security, BacktestEngine
+from quantitative.sources import DataFrameSource, CSVSource
+from quantitative.scheduler import EventScheduler
+
+market_data = pd.read_csv('../data_files/test_data.csv', parse_dates=True,
+                          index_col=0)
+
+'''Sources seek to the events after a position'''
+source = DataFrameSource(market_data)
+events = [(event.kind, event.time_ns) for event in
+          source.events('09:30:00', '16:00:00')]
+
+for start in range(len(events) + 1):
+    for source in [DataFrameSource(market_data),
+                   CSVSource('../data_files/test_data.csv', 3)]:
+        assert([(event.kind, event.time_ns) for event in
+                source.events('09:30:00', '16:00:00', start)] ==
+               events[start:])
+
+'''Queued events keep their order when pickled'''
+scheduler = EventScheduler()
+scheduler.put(1, 1, 'first')
+scheduler = pickle.loads(pickle.dumps(scheduler))
+scheduler.put(1, 1, 'second')
+assert([scheduler.get()[1] for _ in range(2)] == ['first', 'second'])
+
+
+class CheckpointBacktest(BacktestEngine):
+
+    def __init__(self, checkpoint_path=None):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+        self.checkpoint_path = checkpoint_path
+        self.counter = 0
+
+    def trade_logic(self):
+        self.counter += 1
+
+        if self.counter in (2, 14):
+            self.place_order(self.create_market_order('BUY', self.msft, 1))
+
+        if self.counter == 10:
+            self.place_order(self.create_limit_order('BUY', self.aapl, 1, 1.))
+
+
+'''A resumed backtest returns the results of the uninterrupted backtest'''
+expected_backtest = CheckpointBacktest()
+expected = expected_backtest.run()
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'backtest.checkpoint')
+
+    backtest = CheckpointBacktest(path)
+    assert(backtest.run().equals(expected))
+    assert(os.listdir(directory) == ['backtest.checkpoint'])
+
+    resumed = CheckpointBacktest.load_checkpoint(path, market_data)
+
+# Saved at the close of the first day
+assert(resumed.get_time() == pd.Timestamp('2017-11-10 16:00:00'))
+assert(resumed.counter == 10)
+assert(resumed.get_shares('MSFT') == 1)
+
+# The limit order placed at the close is still queued
+assert(len(resumed._events_queue) == 1)
+
+result = resumed.run()
+
+pd.testing.assert_frame_equal(result, expected)
+assert(resumed.counter == expected_backtest.counter)
+assert(resumed.get_shares('MSFT') == 2)
+assert(resumed.get_number_of_unfilled_orders() == 1)
+assert(resumed.msft.bid == expected_backtest.msft.bid)
+assert(len(resumed.get_transaction_log().market) ==
+       len(expected_backtest.get_transaction_log().market))
+
+'''Bars are rebuilt up to the checkpoint'''
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'backtest.checkpoint')
+
+    backtest = CheckpointBacktest(path)
+    backtest.subscribe_bars(2, 'tick')
+    bar_result = backtest.run()
+
+    resumed = CheckpointBacktest.load_checkpoint(path, market_data)
+    pd.testing.assert_frame_equal(resumed.run(), bar_result)
+    assert(resumed.counter == backtest.counter)
+
+'''Checkpoints are loaded by the class that saved them'''
+
+
+class OtherBacktest(CheckpointBacktest):
+    pass
+
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'backtest.checkpoint')
+    CheckpointBacktest(path).run()
+
+    try:
+        OtherBacktest.load_checkpoint(path, market_data)
+        assert(False)
+    except TypeError:
+        pass
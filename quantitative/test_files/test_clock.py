@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from quantitative import Security, BacktestEngine
+from quantitative.events import TradeEvent
+from quantitative.portfolio import Portfolio
+
+market_data = pd.read_csv('../data_files/test_data.csv', parse_dates=True,
+                          index_col=0)
+time = pd.Timestamp('2017-11-10 09:46:32.278175650')
+
+'''Events keep nanoseconds and accept timestamps'''
+event = TradeEvent(time, 'MSFT', 84.8, 100.)
+assert(event.time_ns == time.value)
+assert(event.time == time)
+assert(TradeEvent(time.value, 'MSFT', 84.8, 100.).time == time)
+
+'''The portfolio takes nanoseconds or timestamps'''
+portfolio = Portfolio()
+portfolio.modify_cash(time.value, 1000)
+portfolio.update_portfolio_values(time.value)
+assert(portfolio.get_cash(time) == 1000)
+assert(portfolio.get_porfolio_value(time) == 1000)
+
+portfolio.add_transaction(time.value, cash=1000)
+assert(portfolio.get_transaction(time).time == time)
+
+
+class ClockBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+        self.times = []
+
+    def trade_logic(self):
+        self.times.append(self.get_time())
+
+        if len(self.times) == 2:
+            self.place_order(self.create_market_order('BUY', self.msft, 1))
+
+
+'''Times are timestamps at the API'''
+backtest = ClockBacktest()
+result = backtest.run()
+
+assert(all(type(time) == pd.Timestamp for time in backtest.times))
+assert(backtest.simulation_time == backtest.times[-1])
+assert(backtest.msft.last_sale_time == pd.Timestamp(
+    '2017-11-11 09:46:32.278235405'))
+assert(backtest.msft.time == pd.Timestamp('2017-11-11 09:46:32.278229858'))
+
+position = backtest.get_open_positions('MSFT')
+assert(position.purchase_time == pd.Timestamp(
+    '2017-11-10 09:46:32.278115304'))
+assert(backtest.get_open_positions()['MSFT'] == position)
+assert(isinstance(result.index, pd.DatetimeIndex))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Security, BacktestEngine
+
+
+class CoalescedBacktest(BacktestEngine):
+
+    def __init__(self, coalesce_window):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+        self.market_data = pd.read_csv('../data_files/test_data.csv',
+                                       parse_dates=True, index_col=0)
+
+        super().__init__(self.market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+        self.coalesce_window = coalesce_window
+        self.times = []
+
+    def trade_logic(self):
+        self.times.append(self.get_time())
+
+        if len(self.times) == 2:
+            self.place_order(self.create_market_order('BUY', self.aapl, 1))
+
+
+'''Every event, and the order event, runs the strategy without coalescing'''
+backtest = CoalescedBacktest(None)
+backtest.run()
+assert(len(backtest.times) == 14)
+
+'''Events within the window run the strategy once, at the last event'''
+backtest = CoalescedBacktest('1ms')
+result = backtest.run()
+assert(backtest.times == [pd.Timestamp('2017-11-10 09:30:00'),
+                          pd.Timestamp('2017-11-10 09:46:32.278192693'),
+                          pd.Timestamp('2017-11-10 09:46:32.278192693'),
+                          pd.Timestamp('2017-11-10 16:00:00'),
+                          pd.Timestamp('2017-11-11 09:30:00'),
+                          pd.Timestamp('2017-11-11 09:46:32.278235405')])
+
+'''Securities hold the last values of the batch'''
+assert(backtest.msft.bid == 83.72)
+assert(backtest.msft.last_sale_price == 85.8)
+
+'''Orders placed after a batch are filled at its last quotes'''
+transactions = backtest.get_transaction_log().market_frame()
+assert(list(transactions.price) == [103.88])
+assert(np.isclose(result.portfolio_value.iloc[-1], 10000.0))
+
+'''Only events with the same time with a zero window'''
+backtest = CoalescedBacktest(0)
+backtest.run()
+assert(len(backtest.times) == 14)
+
+'''Batches end before queued events within the window'''
+quotes = pd.DataFrame({'BID': 84.0, 'BID_SIZE': 100., 'ASK': 84.1,
+                       'ASK_SIZE': 100., 'SEC': 'MSFT', 'TYPE': 'QUOTE',
+                       'SIZE': np.nan, 'PRICE': np.nan},
+                      index=pd.to_datetime(['2017-11-10 10:00:00.000',
+                                            '2017-11-10 10:00:00.500',
+                                            '2017-11-10 10:00:00.900']))
+
+
+class TimerBacktest(CoalescedBacktest):
+
+    def __init__(self):
+        super().__init__('1s')
+        self._load_data(quotes)
+        self.schedule_at(pd.Timestamp('2017-11-10 10:00:00.200'),
+                         lambda timer: self.times.append(self.get_time()))
+
+    def trade_logic(self):
+        self.times.append(self.get_time())
+
+
+backtest = TimerBacktest()
+result = backtest.run()
+assert(backtest.times == [pd.Timestamp('2017-11-10 09:30:00'),
+                          pd.Timestamp('2017-11-10 10:00:00'),
+                          pd.Timestamp('2017-11-10 10:00:00.200'),
+                          pd.Timestamp('2017-11-10 10:00:00.900')])
+assert(result.index.is_monotonic_increasing)
+
+'''Callbacks run once per ticker of a batch, with its last events'''
+
+
+class SubscribedBacktest(CoalescedBacktest):
+
+    def __init__(self, coalesce_window):
+        super().__init__(coalesce_window)
+        self.quotes = []
+        self.trades = []
+        self.subscribe('quote', self.quotes.append)
+        self.subscribe('trade', self.trades.append)
+
+
+backtest = SubscribedBacktest(None)
+backtest.run()
+assert((len(backtest.quotes), len(backtest.trades)) == (7, 3))
+
+backtest = SubscribedBacktest('1ms')
+backtest.run()
+assert([(quote.ticker, quote.time) for quote in backtest.quotes] ==
+       [('MSFT', pd.Timestamp('2017-11-10 09:46:32.278192693')),
+        ('AAPL', pd.Timestamp('2017-11-10 09:46:32.278142489')),
+        ('AAPL', pd.Timestamp('2017-11-11 09:46:32.278221346')),
+        ('MSFT', pd.Timestamp('2017-11-11 09:46:32.278229858'))])
+assert([(trade.ticker, trade.sale_price) for trade in backtest.trades] ==
+       [('MSFT', 84.8), ('AAPL', 103.8), ('MSFT', 85.8)])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+from quantitative import (Security, BacktestEngine, DataFrameSource,
+                          CSVSource, write_tick_store, TickStoreSource)
+
+market_data = pd.read_csv('../data_files/test_data.csv', parse_dates=True,
+                          index_col=0)
+
+
+def describe(source):
+    return [(event.event_type, event.ticker, event.time)
+            for event in source.market_data()]
+
+
+'''Only the last quote of each ticker in each interval is kept'''
+source = DataFrameSource(market_data).conflate('1s')
+events = describe(source)
+assert(len(events) == 7)
+assert(events[:4] == [
+    ('QuoteEvent', 'AAPL', pd.Timestamp('2017-11-10 09:46:32.278142489')),
+    ('TradeEvent', 'MSFT', pd.Timestamp('2017-11-10 09:46:32.278175650')),
+    ('TradeEvent', 'AAPL', pd.Timestamp('2017-11-10 09:46:32.278187841')),
+    ('QuoteEvent', 'MSFT', pd.Timestamp('2017-11-10 09:46:32.278192693'))])
+
+'''CSV files are conflated the same way'''
+assert(describe(CSVSource('../data_files/test_data.csv').conflate('1s')) ==
+       events)
+
+'''Trades can be summarized'''
+trades = pd.DataFrame(
+    {'SEC': 'MSFT', 'TYPE': 'TRADE', 'PRICE': [84.0, 85.0, 86.0],
+     'SIZE': [100.0, 200.0, 300.0], 'BID': np.nan, 'BID_SIZE': np.nan,
+     'ASK': np.nan, 'ASK_SIZE': np.nan},
+    index=pd.to_datetime(['2017-11-10 09:46:32.1', '2017-11-10 09:46:32.2',
+                          '2017-11-10 09:46:33.1']))
+
+summarized = list(DataFrameSource(trades).conflate(
+    '1s', trades='summarize').market_data())
+assert([(event.sale_price, event.sale_size) for event in summarized] ==
+       [(85.0, 300.0), (86.0, 300.0)])
+assert(len(list(DataFrameSource(trades).conflate('1s').market_data())) == 3)
+
+'''Conflation is kept when a source is pickled'''
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'store')
+    write_tick_store(market_data, path)
+    source = pickle.loads(pickle.dumps(TickStoreSource(path).conflate('1s')))
+    assert(describe(source) == events)
+
+
+class ConflatedBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(DataFrameSource(market_data).conflate('1s'),
+                         [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+
+    def trade_logic(self):
+        pass
+
+
+backtest = ConflatedBacktest()
+result = backtest.run()
+assert(backtest.msft.bid == 83.72)
+assert(len(result) == 10)
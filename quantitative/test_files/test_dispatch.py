@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from quantitative import Security, BacktestEngine
+from quantitative.events import TRADE_EVENT, QUOTE_EVENT
+from quantitative.sources import DataFrameSource
+
+market_data = pd.read_csv('../data_files/test_data.csv', parse_dates=True,
+                          index_col=0)
+
+'''Events are tagged with the ids of their tickers'''
+source = DataFrameSource(market_data)
+source.set_ticker_ids({'MSFT': 0, 'AAPL': 1})
+events = list(source.market_data())
+
+assert([event.kind for event in events[:4]] ==
+       [QUOTE_EVENT, QUOTE_EVENT, QUOTE_EVENT, TRADE_EVENT])
+assert(all(event.ticker_id == {'MSFT': 0, 'AAPL': 1}[event.ticker]
+           for event in events))
+
+'''Tickers outside the universe have no id'''
+source.set_ticker_ids({'MSFT': 0})
+assert(all(event.ticker_id is None for event in source.market_data()
+           if event.ticker == 'AAPL'))
+
+
+class DispatchBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+
+    def trade_logic(self):
+        pass
+
+
+'''Securities are looked up by the ids given at registration'''
+backtest = DispatchBacktest()
+assert(backtest._ticker_ids == {'AAPL': 0, 'MSFT': 1})
+assert(backtest._securities == [backtest.aapl, backtest.msft])
+
+backtest.run()
+assert(backtest.msft.last_sale_price == 85.8)
+assert(backtest.msft.bid == 83.72)
+assert(backtest.aapl.ask == 103.8)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Security, BacktestEngine
+
+
+class HistoryBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT', history_length=2)
+        self.market_data = pd.read_csv('../data_files/test_data.csv',
+                                       parse_dates=True, index_col=0)
+
+        super().__init__(self.market_data, [self.aapl, self.msft],
+                         record_history=True)
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+        self.msft_bids = []
+
+    def trade_logic(self):
+        self.msft_bids.append(list(self.msft.history('bid')))
+
+
+backtest = HistoryBacktest()
+backtest.run()
+
+'''Only the last history_length quotes are kept'''
+assert(list(backtest.msft.history('bid')) == [83.79, 83.72])
+assert(list(backtest.msft.history('bid', 1)) == [83.72])
+assert(list(backtest.msft.history('bid_size', 5)) == [3.0, 1.0])
+assert(list(backtest.msft.history('time')) ==
+       [np.datetime64('2017-11-10 09:46:32.278192693'),
+        np.datetime64('2017-11-11 09:46:32.278229858')])
+
+'''History grows until the buffer is full'''
+assert(backtest.msft_bids[0] == [])
+assert([83.79] in backtest.msft_bids)
+assert(backtest.msft_bids[-1] == [83.79, 83.72])
+
+'''Trades are kept separately from quotes'''
+assert(list(backtest.aapl.history('last_sale_price')) == [103.8])
+assert(list(backtest.aapl.history('ask')) == [103.88, 103.88, 103.8])
+assert(list(backtest.msft.history('last_sale_size')) == [100.0, 200.0])
+
+'''History views are read-only'''
+try:
+    backtest.msft.history('bid')[0] = 0
+    assert(False)
+except ValueError:
+    pass
+
+'''History is only recorded with record_history=True'''
+try:
+    Security('IBM').history('bid')
+    assert(False)
+except RuntimeError:
+    pass
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Security, BacktestEngine
+from quantitative.indicators import (
+    SimpleMovingAverage,
+    ExponentialMovingAverage,
+    RollingVariance,
+    RollingStandardDeviation,
+    VolumeWeightedAveragePrice,
+    RollingMax,
+    RollingMin,
+    BidAskImbalance
+)
+
+np.random.seed(0)
+prices = pd.Series(100 + np.random.randn(500).cumsum())
+sizes = pd.Series(np.random.randint(1, 500, 500).astype(float))
+window = 20
+
+'''Indicators match the pandas rolling computations'''
+indicators = {'sma': SimpleMovingAverage(window),
+              'ema': ExponentialMovingAverage(window),
+              'var': RollingVariance(window),
+              'std': RollingStandardDeviation(window),
+              'max': RollingMax(window),
+              'min': RollingMin(window)}
+
+expected = {'sma': prices.rolling(window).mean(),
+            'ema': prices.ewm(span=window, adjust=False).mean(),
+            'var': prices.rolling(window).var(),
+            'std': prices.rolling(window).std(),
+            'max': prices.rolling(window).max(),
+            'min': prices.rolling(window).min()}
+
+for i, price in enumerate(prices):
+
+    for name, indicator in indicators.items():
+        indicator.update(price)
+
+        if np.isnan(expected[name][i]):
+            assert(not indicator.ready)
+        else:
+            assert(np.isclose(indicator.value, expected[name][i])), name
+
+'''Rolling and cumulative VWAP'''
+vwap = VolumeWeightedAveragePrice(window)
+cumulative_vwap = VolumeWeightedAveragePrice()
+
+for price, size in zip(prices, sizes):
+    vwap.update(price, size)
+    cumulative_vwap.update(price, size)
+
+assert(np.isclose(vwap.value, np.average(prices[-window:],
+                                         weights=sizes[-window:])))
+assert(np.isclose(cumulative_vwap.value, np.average(prices, weights=sizes)))
+
+cumulative_vwap.reset()
+assert(not cumulative_vwap.ready)
+
+'''Unknown fields are rejected'''
+try:
+    SimpleMovingAverage(window, 'price')
+    assert(False)
+except ValueError:
+    pass
+
+
+class IndicatorBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+        self.market_data = pd.read_csv('../data_files/test_data.csv',
+                                       parse_dates=True, index_col=0)
+
+        super().__init__(self.market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+
+        self.msft_trades = self.add_indicator('MSFT', SimpleMovingAverage(2))
+        self.msft_bids = self.add_indicator(self.msft,
+                                            RollingMax(3, field='bid'))
+        self.msft_imbalance = self.add_indicator(self.msft, BidAskImbalance())
+
+    def trade_logic(self):
+        pass
+
+
+'''Indicators are updated by the events of their security and field'''
+backtest = IndicatorBacktest()
+backtest.run()
+
+assert(backtest.msft_trades.value == (84.8 + 85.8) / 2)
+assert(backtest.msft_bids.value == 83.79)
+assert(backtest.msft_imbalance.value == (1.0 - 2.0) / (1.0 + 2.0))
+
+'''Variance does not drift over long runs'''
+values = 1e4 + np.random.RandomState(0).normal(0, 0.02, 200037)
+variance = RollingVariance(100)
+for value in values:
+    variance.update(value)
+assert(np.isclose(variance.value, np.var(values[-100:], ddof=1),
+                  rtol=1e-10, atol=0))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from quantitative import Security, MarketOrder, LimitOrder
+from quantitative.orderbook import UnfilledOrderBook
+
+s = Security('S')
+t = Security('T')
+
+mkt_order = MarketOrder('2018-01-01', 'BUY', s, 10)
+buy_99 = LimitOrder('2018-01-01', 'BUY', s, 99, 10)
+buy_100 = LimitOrder('2018-01-01', 'BUY', s, 100, 10, time_condition='DAY')
+sell_101 = LimitOrder('2018-01-01', 'SELL', s, 101, 10, time_condition='AON')
+sell_102 = LimitOrder('2018-01-01', 'SELL', s, 102, 10)
+other_ticker = LimitOrder('2018-01-01', 'BUY', t, 1000, 10)
+
+book = UnfilledOrderBook()
+for order in [mkt_order, buy_99, buy_100, sell_101, sell_102, other_ticker]:
+    book.add(order)
+
+assert(len(book) == 6)
+assert(len(book['GTC']) == 4)
+assert(book['DAY'] == (buy_100,))
+
+# Read-only, orders are added and removed through the book
+try:
+    book['GTC'].append(buy_100)
+    assert(False)
+except AttributeError:
+    pass
+
+'''Only orders crossed by the quote, best price first'''
+assert(book.crossed('S', 98, 103) == [mkt_order])
+assert(book.crossed('S', 98, 99) == [mkt_order, buy_100, buy_99])
+assert(book.crossed('S', 102, 103) == [mkt_order, sell_101, sell_102])
+assert(book.crossed('S', np.nan, np.nan) == [mkt_order])
+assert(book.crossed('U', 1, 2) == [])
+
+'''Remove and clear'''
+book.remove(buy_100)
+assert(book.crossed('S', 98, 99) == [mkt_order, buy_99])
+
+try:
+    book.remove(buy_100)
+    raise AssertionError
+except ValueError:
+    pass
+
+try:
+    book.add(LimitOrder('2018-01-01', 'BUY', s, 99, 10, time_condition='FOK'))
+    raise AssertionError
+except KeyError:
+    pass
+
+book.clear('AON')
+assert(book.crossed('S', 102, 103) == [mkt_order, sell_102])
+
+book.clear()
+assert(len(book) == 0)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Portfolio
+
+time = [pd.Timestamp('2017-01-01 09:30:00'),
+        pd.Timestamp('2017-01-01 09:31:00'),
+        pd.Timestamp('2017-01-01 09:32:00')]
+
+
+def ledger_total(portfolio):
+    return sum(ledger.market_price * ledger.shares
+               for ledger in portfolio.open_positions.values())
+
+
+''' Investment total and holdings '''
+
+portfolio = Portfolio()
+portfolio.add_position(time[0], 'AAA', 100.00, 10)
+portfolio.add_position(time[0], 'BBB', 20.00, 50)
+assert(portfolio.calculate_investment_total(time[0]) == 2000)
+assert(portfolio.holdings == {'AAA': 0.5, 'BBB': 0.5})
+
+# Price and share changes update the total and holdings
+portfolio.modify_position('AAA', market_price=200.00)
+portfolio.modify_position('BBB', shares=25)
+assert(portfolio.calculate_investment_total(time[1]) == 2500)
+assert(portfolio.holdings == {'AAA': 0.8, 'BBB': 0.2})
+
+portfolio.remove_position('AAA')
+assert(portfolio.calculate_investment_total(time[1]) == 500)
+assert(portfolio.holdings == {'BBB': 1.0})
+
+portfolio.remove_position('BBB')
+assert(portfolio.calculate_investment_total(time[2]) == 0)
+assert(portfolio.holdings == {})
+
+''' The total follows the ledgers while a position stays open '''
+
+portfolio = Portfolio()
+portfolio.add_position(time[0], 'AAA', 100.1, 7)
+random = np.random.RandomState(0)
+
+for price, shares in zip(random.uniform(1, 1000, 10000),
+                         random.randint(1, 1000, 10000)):
+    portfolio.add_position(time[1], 'BBB', price * 0.1, shares)
+    portfolio.modify_position('AAA', market_price=price)
+    portfolio.modify_position('BBB', market_price=price * 0.3,
+                              shares=shares + 1)
+    portfolio.remove_position('BBB')
+
+assert(np.isclose(portfolio.calculate_investment_total(time[2]),
+                  ledger_total(portfolio), rtol=1e-9))
+
+# Recomputed from the ledgers, e.g. at each market close
+portfolio.reconcile_investment_total()
+assert(portfolio.calculate_investment_total(time[2]) ==
+       ledger_total(portfolio))
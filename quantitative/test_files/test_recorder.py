@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Security, BacktestEngine, Portfolio
+from quantitative.recorder import AccountValueRecorder
+
+times = [pd.Timestamp('2017-11-10 09:30:00') + pd.Timedelta(seconds=20 * i)
+         for i in range(6)]
+values = [1, 1, 2, 2, 2, 3]
+
+
+def record(frequency):
+    recorder = AccountValueRecorder(capacity=2, frequency=frequency)
+
+    for time, value in zip(times, values):
+        recorder.record(time, value, 0, value)
+
+        # Latest values are always available
+        assert(recorder[time].cash == value)
+        assert(recorder.last().portfolio_value == value)
+
+    return recorder.to_frame()
+
+
+'''Every event'''
+result = record('event')
+assert(list(result.index) == times)
+assert(list(result.cash) == values)
+
+'''Same time overwrites the last row'''
+recorder = AccountValueRecorder()
+recorder.record(times[0], 1, 0, 1)
+recorder.record(times[0], 2, 0, 2)
+assert(len(recorder) == 1)
+assert(recorder[times[0]].cash == 2)
+
+'''On change'''
+result = record('change')
+assert(list(result.index) == [times[0], times[2], times[5]])
+assert(list(result.cash) == [1, 2, 3])
+
+'''Every N events'''
+result = record(2)
+assert(list(result.index) == [times[1], times[3], times[5]])
+
+'''Last values in each interval'''
+result = record('1min')
+assert(list(result.index) == [times[2], times[5]])
+
+'''Committed rows only'''
+recorder = AccountValueRecorder(frequency='close')
+for i, (time, value) in enumerate(zip(times, values)):
+    recorder.record(time, value, 0, value)
+    if i == 3:
+        recorder.commit()
+assert(list(recorder.to_frame().index) == [times[3], times[5]])
+
+'''Frames are copies of the recorded values'''
+recorder = AccountValueRecorder()
+recorder.record(times[0], 1, 0, 1)
+frame = recorder.to_frame()
+frame.iloc[0] = 5
+assert(recorder[times[0]].cash == 1)
+assert(recorder.to_frame().cash.iloc[0] == 1)
+
+# Views share the recorder arrays
+view = recorder.to_frame(copy=False)
+assert(np.shares_memory(view.values, recorder._values))
+assert(view.cash.iloc[0] == 1)
+
+'''Values between snapshots are not kept'''
+portfolio = Portfolio()
+portfolio.portfolio_value.set_frequency('change')
+for time in times[:3]:
+    portfolio.modify_cash(time, 100)
+    portfolio.update_portfolio_values(time)
+
+assert(portfolio.get_cash(times[0]) == 100)
+try:
+    portfolio.get_cash(times[1])
+    assert(False)
+except KeyError as error:
+    assert('\'change\'' in str(error))
+
+
+class SnapshotAtClose(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+        self.market_data = pd.read_csv('../data_files/test_data.csv',
+                                       parse_dates=True, index_col=0)
+
+        super().__init__(self.market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+        self.snapshot_frequency = 'close'
+
+    def trade_logic(self):
+        pass
+
+
+result = SnapshotAtClose().run()
+assert(list(result.index) == [pd.Timestamp('2017-11-10 16:00:00'),
+                              pd.Timestamp('2017-11-11 09:46:32.278235405')])
+assert((result.portfolio_value == 10000.0).all())
@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from quantitative.scheduler import EventScheduler
+from quantitative.events import MarketStatusEvent
+import pandas as pd
+
+time = pd.Timestamp('2017-11-10 09:30:00')
+events = [MarketStatusEvent(time, market_status=str(i)) for i in range(5)]
+
+scheduler = EventScheduler()
+
+'''Events with the same time and priority come out in insertion order'''
+for event in events:
+    scheduler.put(time.value, 3, event)
+
+assert([scheduler.get()[1] for _ in range(5)] == events)
+assert(scheduler.empty())
+
+'''Earlier time first, then lower priority, then insertion order'''
+scheduler.put(time.value + 1, 1, events[0])
+scheduler.put(time.value, 3, events[1])
+scheduler.put(time.value, 2, events[2])
+
+assert(scheduler.peek_key() == (time.value, 2))
+assert(scheduler.get() == (2, events[2]))
+assert(scheduler.get() == (3, events[1]))
+assert(scheduler.get() == (1, events[0]))
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from quantitative import (Security, BacktestEngine, TickData, SharedTickData,
+                          SharedMemorySource)
+
+market_data = pd.read_csv('../data_files/test_data.csv',
+                          parse_dates=True, index_col=0)
+
+
+class BuyAndHold(BacktestEngine):
+
+    def __init__(self, data):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        self.counter = 0
+
+        super().__init__(data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+
+    def trade_logic(self):
+
+        if self.counter == 1:
+            mkt_order = self.create_market_order('BUY', self.msft, 2, 'GTC')
+            self.place_order(mkt_order)
+
+        self.counter += 1
+
+
+def run_backtest(source):
+    return BuyAndHold(source).run().copy()
+
+
+tick_data = TickData.from_dataframe(market_data)
+expected = BuyAndHold(market_data).run()
+
+with SharedTickData(market_data) as shared:
+
+    source = SharedMemorySource(shared.handle)
+
+    '''Columns are read-only views of the shared memory'''
+    for name, column in tick_data.columns().items():
+        np.testing.assert_array_equal(getattr(source.tick_data, name), column)
+
+    assert(not source.tick_data.time.flags.writeable)
+    assert(source.tick_data.tickers == tick_data.tickers)
+
+    '''Only the handle is pickled'''
+    assert(len(pickle.dumps(source)) < 1000)
+
+    '''Workers attach to the same data'''
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(run_backtest, [source] * 2))
+
+    for result in results:
+        pd.testing.assert_frame_equal(result, expected)
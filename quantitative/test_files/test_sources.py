@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import pandas as pd
+from quantitative import Security, BacktestEngine, DataFrameSource, CSVSource
+
+market_data = pd.read_csv('../data_files/test_data.csv',
+                          parse_dates=True, index_col=0)
+starting_cash = 10000.0
+
+
+class TestBuyAndHold(BacktestEngine):
+
+    def __init__(self, data):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        self.counter = 0
+
+        super().__init__(data, [self.aapl, self.msft])
+
+        self.inital_cash = starting_cash
+        self.include_commission = False
+        self.verbose = False
+
+    def trade_logic(self):
+
+        if self.counter == 1:
+            mkt_order = self.create_market_order('BUY', self.msft, 2, 'GTC')
+            self.place_order(mkt_order)
+
+        self.counter += 1
+
+
+'''Events are the same regardless of source'''
+df_events = list(DataFrameSource(market_data).events(
+    '09:30:00.000000000', '16:00:00.000000000'))
+csv_events = list(CSVSource('../data_files/test_data.csv', chunksize=3).events(
+    '09:30:00.000000000', '16:00:00.000000000'))
+
+assert(len(df_events) == len(csv_events) == 13)
+for df_event, csv_event in zip(df_events, csv_events):
+    assert(df_event.event_type == csv_event.event_type)
+    assert(df_event.time == csv_event.time)
+
+'''Events only hold their fields, without an instance dict'''
+for event in df_events:
+    assert(not hasattr(event, '__dict__'))
+    assert(event.event_index == event.time.value)
+
+assert(df_events[1].event_type == 'QuoteEvent')
+assert((df_events[1].bid, df_events[1].ask, df_events[1].bid_size,
+        df_events[1].ask_size) == (83.79, 83.81, 1.0, 2.0))
+assert((df_events[4].sale_price, df_events[4].sale_size) == (84.8, 100.0))
+
+'''Backtest results are the same regardless of source'''
+result = TestBuyAndHold(market_data).run()
+df_source_result = TestBuyAndHold(DataFrameSource(market_data)).run()
+csv_source_result = TestBuyAndHold(
+    CSVSource('../data_files/test_data.csv', chunksize=3)).run()
+
+pd.testing.assert_frame_equal(result, df_source_result)
+pd.testing.assert_frame_equal(result, csv_source_result)
+
+'''Pre-market ticks come before the open, on every day'''
+pre_market_data = market_data.iloc[[0, 1, 7, 8]].copy()
+pre_market_data.index = pd.to_datetime(['2017-11-10 08:00:00',
+                                        '2017-11-10 10:00:00',
+                                        '2017-11-11 08:00:00',
+                                        '2017-11-11 10:00:00'])
+pre_market_data.index.name = market_data.index.name
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'pre_market.csv')
+    pre_market_data.to_csv(path)
+
+    for source in [DataFrameSource(pre_market_data), CSVSource(path, 3)]:
+        events = list(source.events('09:30:00.000000000',
+                                    '16:00:00.000000000'))
+        times = [event.time_ns for event in events]
+
+        assert(times == sorted(times))
+        assert([getattr(event, 'market_status', None) for event in events] ==
+               [None, 'OPEN', None, 'CLOSE', None, 'OPEN', None])
+
+backtest = TestBuyAndHold(pre_market_data)
+assert(backtest.run().index.is_monotonic_increasing)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from quantitative import Security, BacktestEngine
+
+
+class SubscribedBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+        self.market_data = pd.read_csv('../data_files/test_data.csv',
+                                       parse_dates=True, index_col=0)
+
+        super().__init__(self.market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+
+        self.calls = []
+        self.trade_logic_calls = 0
+
+        self.subscribe('quote', self.msft_quote, 'MSFT')
+        self.subscribe('trade', self.trade, ['AAPL', 'MSFT'])
+        self.subscribe('fill', self.fill)
+        self.subscribe('market_open', self.market_status)
+        self.subscribe('market_close', self.market_status)
+
+    def msft_quote(self, quote):
+        assert(quote.ticker == 'MSFT')
+        self.calls.append('quote')
+
+        if len(self.calls) == 2:
+            self.place_order(self.create_market_order('BUY', self.msft, 1))
+
+    def trade(self, trade):
+        self.calls.append(trade.ticker)
+
+    def fill(self, transaction):
+        self.calls.append((transaction.direction, transaction.ticker,
+                           transaction.price, transaction.shares))
+
+    def market_status(self, event):
+        self.calls.append(event.market_status)
+
+    def trade_logic(self):
+        self.trade_logic_calls += 1
+
+
+'''Only the subscribed callbacks run'''
+backtest = SubscribedBacktest()
+backtest.run()
+
+assert(backtest.trade_logic_calls == 0)
+assert(backtest.calls == ['OPEN', 'quote', ('BUY', 'MSFT', 83.81, 1.0),
+                          'MSFT', 'quote', 'AAPL', 'quote', 'CLOSE', 'OPEN',
+                          'quote', 'MSFT'])
+
+'''Unsubscribed callbacks are no longer called'''
+backtest = SubscribedBacktest()
+backtest.unsubscribe('trade', backtest.trade, ['AAPL', 'MSFT'])
+backtest.unsubscribe('quote', backtest.msft_quote, 'MSFT')
+backtest.run()
+assert(backtest.calls == ['OPEN', 'CLOSE', 'OPEN'])
+
+try:
+    backtest.unsubscribe('quote', backtest.msft_quote)
+    assert(False)
+except ValueError:
+    pass
+
+try:
+    backtest.subscribe('tick', backtest.trade)
+    assert(False)
+except ValueError:
+    pass
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from quantitative import Security, BacktestEngine, run_sweep, parameter_grid
+
+market_data = pd.read_csv('../data_files/test_data.csv',
+                          parse_dates=True, index_col=0)
+starting_cash = 10000.0
+
+
+class BuyAtTick(BacktestEngine):
+
+    def __init__(self, data, buy_at=1, shares=1):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        self.buy_at = buy_at
+        self.shares = shares
+        self.counter = 0
+
+        super().__init__(data, [self.aapl, self.msft])
+
+        self.inital_cash = starting_cash
+        self.include_commission = False
+        self.verbose = False
+
+    def trade_logic(self):
+
+        if self.counter == self.buy_at:
+            mkt_order = self.create_market_order('BUY', self.msft,
+                                                 self.shares, 'GTC')
+            self.place_order(mkt_order)
+
+        self.counter += 1
+
+
+assert(parameter_grid({'a': [1, 2], 'b': [3]}) ==
+       [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}])
+
+grid = {'buy_at': [1, 5], 'shares': [1, 2]}
+
+metrics, equity_curves = run_sweep(BuyAtTick, grid, market_data, processes=2)
+serial_metrics, serial_equity_curves = run_sweep(BuyAtTick, grid,
+                                                 market_data, processes=1)
+
+pd.testing.assert_frame_equal(metrics, serial_metrics)
+pd.testing.assert_frame_equal(equity_curves, serial_equity_curves)
+
+assert(list(metrics.index.names) == ['buy_at', 'shares'])
+assert(len(metrics) == 4)
+assert((metrics.transactions == 1).all())
+
+'''Same result as running the backtest directly'''
+result = BuyAtTick(market_data, buy_at=5, shares=2).run()
+pd.testing.assert_frame_equal(equity_curves.loc[(5, 2)], result,
+                              check_names=False)
+assert(metrics.loc[(5, 2)].portfolio_value == result.iloc[-1].portfolio_value)
+
+'''Grids without parameters are rejected'''
+for empty_grid in [[], {}, [{}]]:
+    try:
+        run_sweep(BuyAtTick, empty_grid, market_data, processes=1)
+        assert(False)
+    except ValueError:
+        pass
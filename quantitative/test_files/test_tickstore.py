@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import tempfile
+import numpy as np
+import pandas as pd
+from quantitative import (Security, BacktestEngine, TickData,
+                          csv_to_tick_store, write_tick_store,
+                          read_tick_store, TickStoreSource)
+
+market_data = pd.read_csv('../data_files/test_data.csv',
+                          parse_dates=True, index_col=0)
+starting_cash = 10000.0
+
+
+class TestBuyAndSell(BacktestEngine):
+
+    def __init__(self, data):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        self.counter = 0
+
+        super().__init__(data, [self.aapl, self.msft])
+
+        self.inital_cash = starting_cash
+        self.include_commission = False
+        self.verbose = False
+
+    def trade_logic(self):
+
+        if self.counter == 1:
+            lmt_order = self.create_limit_order(
+                'BUY', self.msft, 1, 83.81, 'GTC')
+            self.place_order(lmt_order)
+
+        if self.counter == 6:
+            lmt_order = self.create_limit_order(
+                'SELL', self.msft, 1, 83.78, 'GTC')
+            self.place_order(lmt_order)
+
+        self.counter += 1
+
+
+tick_data = TickData.from_dataframe(market_data)
+
+with tempfile.TemporaryDirectory() as directory:
+
+    '''CSV converted in chunks is the same as the DataFrame'''
+    csv_to_tick_store('../data_files/test_data.csv', directory, chunksize=4)
+    stored = read_tick_store(directory)
+
+    assert(isinstance(stored.time, np.memmap))
+    assert(stored.tickers == tick_data.tickers)
+
+    for name, column in tick_data.columns().items():
+        np.testing.assert_array_equal(getattr(stored, name), column)
+
+    '''Backtest over the tick store'''
+    result = TestBuyAndSell(market_data).run()
+    stored_result = TestBuyAndSell(TickStoreSource(directory)).run()
+
+    pd.testing.assert_frame_equal(result, stored_result)
+
+    '''Writing a DataFrame overwrites the store'''
+    write_tick_store(market_data.iloc[:3], directory)
+    assert(len(read_tick_store(directory)) == 3)
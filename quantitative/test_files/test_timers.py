@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from quantitative import Security, BacktestEngine
+
+
+class TimerBacktest(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+        self.market_data = pd.read_csv('../data_files/test_data.csv',
+                                       parse_dates=True, index_col=0)
+
+        super().__init__(self.market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.verbose = False
+
+        self.every = []
+        self.at = []
+        self.trade_logic_times = []
+
+        self.schedule_every('5min', self.every_five_minutes)
+        self.schedule_at('15:55:00', self.before_close)
+        self.schedule_at(pd.Timestamp('2017-11-10 12:00:00'), self.before_close)
+
+    def every_five_minutes(self, timer):
+        self.every.append(timer.time)
+
+        # Timers run after the market data of their time
+        assert(self.get_time() == timer.time)
+
+    def before_close(self, timer):
+        self.at.append(timer.time)
+
+    def trade_logic(self):
+        self.trade_logic_times.append(self.get_time())
+
+
+backtest = TimerBacktest()
+backtest.run()
+
+'''Repeating timers run every interval of each session'''
+first_day = pd.date_range('2017-11-10 09:30', '2017-11-10 15:55', freq='5min')
+second_day = pd.date_range('2017-11-11 09:30', '2017-11-11 09:50', freq='5min')
+assert(backtest.every == list(first_day) + list(second_day))
+
+'''Timers at a time, and at a time of day in each session'''
+assert(backtest.at == [pd.Timestamp('2017-11-10 12:00:00'),
+                       pd.Timestamp('2017-11-10 15:55:00'),
+                       pd.Timestamp('2017-11-11 15:55:00')])
+
+'''Timers do not run the strategy'''
+assert(len(backtest.trade_logic_times) == 13)
+
+'''Times before the backtest time cannot be scheduled'''
+try:
+    backtest.schedule_at(pd.Timestamp('2017-11-10 09:00:00'), print)
+    assert(False)
+except ValueError:
+    pass
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+from quantitative import Portfolio
+
+time = [pd.Timestamp('2017-01-01 09:30:00'),
+        pd.Timestamp('2017-01-01 09:31:00'),
+        pd.Timestamp('2017-01-01 09:32:00')]
+
+''' Transaction log tables '''
+
+portfolio = Portfolio()
+portfolio.add_transaction(time[0], cash=1000)
+portfolio.add_transaction(time[1], ticker='AAA', price=10., shares=5,
+                          direction='BUY', commission=1.)
+portfolio.add_transaction(time[1], cash=-51)
+
+assert([type(t).__name__ for t in portfolio.transaction_log[time[1]]] ==
+       ['market_transaction', 'cash_transaction'])
+assert(portfolio.get_transaction(time[0]).cash == 1000)
+
+cash = portfolio.transaction_log.cash_frame()
+market = portfolio.transaction_log.market_frame()
+assert(list(cash.index) == [time[0], time[1]])
+assert(list(cash.cash) == [1000, -51])
+assert(list(market.ticker) == ['AAA'])
+assert(list(market.direction) == ['BUY'])
+assert(market.iloc[0].price * market.iloc[0].shares == 50)
+
+'''Tables are copies of the log'''
+market.loc[:, 'price'] = 0.
+cash.iloc[0] = 0
+assert(portfolio.transaction_log.cash_frame().cash.iloc[0] == 1000)
+assert(portfolio.transaction_log.market_frame().price.iloc[0] == 10.)
+assert(portfolio.get_transaction(time[0]).cash == 1000)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import pandas as pd
+from quantitative import Security, BacktestEngine, MarketOrder
+from quantitative.log import BacktestLog
+
+market_data = pd.read_csv('../data_files/test_data.csv', parse_dates=True,
+                          index_col=0)
+time = pd.Timestamp('2017-11-10 09:46:32')
+
+'''Orders check their arguments unless validate is False'''
+for arguments in [('HOLD', Security('A'), 1), ('BUY', 'A', 1),
+                  ('BUY', Security('A'), '1')]:
+    try:
+        MarketOrder(time, *arguments)
+        assert(False)
+    except (TypeError, ValueError):
+        pass
+
+assert(MarketOrder(time, 'BUY', 'A', 1, validate=False).security == 'A')
+
+'''Messages are formatted when flushed'''
+stream = io.StringIO()
+log = BacktestLog(stream, capacity=3)
+
+with log.buffered():
+    log.log(time.value, 'Filled {} at {time}.', 'AAPL')
+    log.log(None, 'Started')
+    assert(stream.getvalue() == '' and len(log) == 2)
+
+    log.log(None, 'Done in {}', 2)
+    assert(len(log) == 0)
+
+assert(stream.getvalue().splitlines() ==
+       ['Filled AAPL at 2017-11-10 09:46:32.', 'Started', 'Done in 2'])
+
+# Unbuffered messages are written at once
+log.log(None, 'Now')
+assert(stream.getvalue().endswith('Now\n'))
+
+
+class ValidationBacktest(BacktestEngine):
+
+    def __init__(self, validation):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.validation = validation
+        self._log.stream = io.StringIO()
+        self.counter = 0
+
+    def trade_logic(self):
+        self.counter += 1
+
+        if self.counter == 2:
+            self.place_order(self.create_market_order('BUY', self.msft, 1))
+
+        if self.counter == 3:
+            self.create_market_order('BUY', self.msft, '1')
+
+
+'''Strict backtests check order arguments, fast backtests do not'''
+try:
+    ValidationBacktest('strict').run()
+    assert(False)
+except TypeError:
+    pass
+
+fast = ValidationBacktest('fast')
+result = fast.run()
+assert(result.iloc[-1].cash < 10000.0)
+
+'''Verbose messages are written when the run ends'''
+messages = fast._log.stream.getvalue().splitlines()
+assert(messages[0] == 'Backtest started...')
+assert(messages[-1].startswith('Backtest completed.'))
+assert('placed on 2017-11-10 09:46:32.278115304' in messages[1])
+
+'''Unknown validation levels are rejected'''
+try:
+    ValidationBacktest('none').run()
+    assert(False)
+except ValueError:
+    pass
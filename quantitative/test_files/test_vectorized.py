@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from quantitative import Security, BacktestEngine, VectorizedBacktest
+
+market_data = pd.read_csv('../data_files/test_data.csv', parse_dates=True,
+                          index_col=0)
+
+buy_time = pd.Timestamp('2017-11-10 09:46:32.278175650')
+sell_time = pd.Timestamp('2017-11-11 09:46:32.278229858')
+
+
+class EventDriven(BacktestEngine):
+
+    def __init__(self):
+        self.aapl = Security('AAPL')
+        self.msft = Security('MSFT')
+
+        super().__init__(market_data, [self.aapl, self.msft])
+
+        self.inital_cash = 10000.0
+        self.include_commission = True
+        self.verbose = False
+        self.placed = set()
+
+    def trade_logic(self):
+        time = self.get_time()
+
+        if time in (buy_time, sell_time) and time not in self.placed:
+            self.placed.add(time)
+            direction = 'BUY' if time == buy_time else 'SELL'
+            self.place_order(self.create_market_order(direction, self.msft,
+                                                      1))
+
+
+positions = pd.DataFrame({'MSFT': [1, np.nan, 0]},
+                         index=[buy_time, pd.Timestamp('2017-11-10 12:00'),
+                                sell_time])
+
+vectorized = VectorizedBacktest(market_data, positions)
+vectorized.inital_cash = 10000.0
+vectorized.include_commission = True
+result = vectorized.run()
+
+expected = EventDriven().run()
+
+'''Same fills and account values as the event driven backtest'''
+transactions = vectorized.transactions
+assert(list(transactions.price) == [83.81, 83.72])
+assert(list(transactions.direction) == ['BUY', 'SELL'])
+assert(list(result.columns) == list(expected.columns))
+
+common = result.index.intersection(expected.index)
+assert(len(common) > 0)
+assert(np.allclose(result.loc[common].values, expected.loc[common].values))
+assert(np.allclose(result.iloc[-1].values, expected.iloc[-1].values))
+
+'''Targets before the first quote wait for it'''
+positions = pd.DataFrame({'AAPL': [5]}, index=[pd.Timestamp('2017-11-10')])
+vectorized = VectorizedBacktest(market_data, positions)
+vectorized.run()
+assert(vectorized.transactions.index[0] ==
+       pd.Timestamp('2017-11-10 09:46:32.278133425'))
+assert(list(vectorized.transactions.price) == [103.88])
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# Event type codes
+TRADE = 0
+QUOTE = 1
+
+EVENT_TYPES = ['TRADE', 'QUOTE']
+
+NANOSECONDS_PER_DAY = 24 * 60 * 60 * 10 ** 9
+
+
+class TickData(object):
+    '''
+    Columnar container for tick data.
+
+    Each column is a NumPy array with one element per tick. Tickers and
+    event types are stored as integer codes.
+
+    Parameters:
+    ----------
+    time: np.ndarray (int64)
+        Time of each tick in nanoseconds since epoch.
+
+    event_type: np.ndarray (int8)
+        TRADE or QUOTE code of each tick.
+
+    ticker: np.ndarray (int32)
+        Index of the ticker of each tick in tickers.
+
+    bid, bid_size, ask, ask_size, price, size: np.ndarray (float64)
+        Quote and trade columns, NaN where not applicable.
+
+    tickers: list
+        Ticker of each ticker code.
+    '''
+
+    __slots__ = ['time', 'event_type', 'ticker', 'bid', 'bid_size', 'ask',
+                 'ask_size', 'price', 'size', 'tickers']
+
+    COLUMNS = ['time', 'event_type', 'ticker', 'bid', 'bid_size', 'ask',
+               'ask_size', 'price', 'size']
+
+    DTYPES = {'time': np.int64, 'event_type': np.int8, 'ticker': np.int32,
+              'bid': np.float64, 'bid_size': np.float64, 'ask': np.float64,
+              'ask_size': np.float64, 'price': np.float64,
+              'size': np.float64}
+
+    def __init__(self, time, event_type, ticker, bid, bid_size, ask,
+                 ask_size, price, size, tickers):
+
+        self.time = time
+        self.event_type = event_type
+        self.ticker = ticker
+        self.bid = bid
+        self.bid_size = bid_size
+        self.ask = ask
+        self.ask_size = ask_size
+        self.price = price
+        self.size = size
+        self.tickers = list(tickers)
+
+    def __len__(self):
+        return len(self.time)
+
+    @classmethod
+    def from_dataframe(cls, data):
+        '''
+        Convert tick data in the DATE_TIME,BID,BID_SIZE,ASK,ASK_SIZE,SEC,
+        TYPE,SIZE,PRICE format into columns.
+
+        Parameters:
+        ----------
+        data: pandas.DataFrame
+            The tick data, indexed by time.
+
+        Returns:
+        -------
+        tick_data: TickData
+        '''
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index(kind='stable')
+
+        # Rows that are neither trades nor quotes are dropped
+        data = data[data['TYPE'].isin(EVENT_TYPES)]
+
+        time = np.asarray(data.index.values,
+                          dtype='datetime64[ns]').view(np.int64)
+
+        event_type = pd.Categorical(
+            data['TYPE'], categories=EVENT_TYPES).codes.astype(np.int8)
+
+        ticker, tickers = pd.factorize(data['SEC'])
+
+        def column(name):
+            return data[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        return cls(time, event_type, ticker.astype(np.int32),
+                   column('BID'), column('BID_SIZE'), column('ASK'),
+                   column('ASK_SIZE'), column('PRICE'), column('SIZE'),
+                   tickers)
+
+    def columns(self):
+        '''
+        Returns a dict of column name to array.
+        '''
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+
+def time_of_day(time):
+    '''
+    Nanoseconds since midnight of a time of day string.
+    e.g. '09:30:00.000000000'
+    '''
+    return pd.Timedelta(time).value
+
+
+def to_nanoseconds(time):
+    '''
+    Epoch nanoseconds of a time, the clock the engine keeps internally.
+    Integers are returned as they are, anything else is converted with
+    pd.Timestamp, e.g. a pd.Timestamp or '2017-11-10 09:30:00'.
+    '''
+    if type(time) is int:
+        return time
+
+    if isinstance(time, np.integer):
+        return int(time)
+
+    return pd.Timestamp(time).value
+
+
+def session_boundaries(time, market_open_time, market_close_time):
+    '''
+    Positions of the market open and close events in the tick data.
+
+    A session is opened before the first tick of a day after the market
+    open time, ticks before it are outside of the sessions. A session is
+    closed before the first tick after its market close time.
+
+    Parameters:
+    ----------
+    time: np.ndarray (int64)
+        Sorted time of each tick in nanoseconds since epoch.
+
+    market_open_time: str
+        Time of day the market opens. e.g. '09:30:00.000000000'
+
+    market_close_time: str
+        Time of day the market closes. e.g. '16:00:00.000000000'
+
+    Returns:
+    -------
+    position: np.ndarray (int64)
+        Index of the tick each boundary is placed before.
+
+    boundary_time: np.ndarray (int64)
+        Time of each boundary in nanoseconds since epoch.
+
+    is_open: np.ndarray (bool)
+        True for market open, False for market close.
+    '''
+    number_of_ticks = len(time)
+
+    if number_of_ticks == 0:
+        return (np.empty(0, np.int64), np.empty(0, np.int64),
+                np.empty(0, bool))
+
+    days = np.unique(time - time % NANOSECONDS_PER_DAY)
+    open_times = days + time_of_day(market_open_time)
+    close_times = days + time_of_day(market_close_time)
+
+    open_positions = np.searchsorted(time, open_times, side='right')
+    close_positions = np.searchsorted(time, close_times, side='right')
+
+    # A session opens only if its day has a tick after the open
+    first_tick_after_open = time[np.minimum(open_positions,
+                                            number_of_ticks - 1)]
+    opened = ((open_positions < number_of_ticks) &
+              (first_tick_after_open < days + NANOSECONDS_PER_DAY))
+
+    closed = opened & (close_positions < number_of_ticks)
+
+    position = np.concatenate([open_positions[opened],
+                               close_positions[closed]])
+    boundary_time = np.concatenate([open_times[opened], close_times[closed]])
+    is_open = np.concatenate([np.ones(opened.sum(), bool),
+                              np.zeros(closed.sum(), bool)])
+
+    order = np.argsort(boundary_time, kind='stable')
+
+    return position[order], boundary_time[order], is_open[order]
+
+
+def conflate_ticks(tick_data, interval, trades='keep'):
+    '''
+    Keep only the last quote of each ticker in each interval of time.
+    Intervals are aligned to midnight, and kept quotes keep their time.
+
+    Parameters:
+    ----------
+    tick_data: TickData
+        The tick data, sorted by time.
+
+    interval: str or pd.Timedelta
+        Length of the conflation intervals, e.g. '1s'.
+
+    trades: str
+        options: 'keep' (all trades are kept), 'summarize' (the last trade
+        of each ticker in each interval is kept, with the total size of
+        the trades in the interval)
+
+    Returns:
+    -------
+    tick_data: TickData
+        The conflated ticks, a copy.
+    '''
+    interval = conflation_interval(interval, trades)
+
+    bucket = tick_data.time // interval
+    keep = np.zeros(len(tick_data), dtype=bool)
+    size = np.array(tick_data.size, dtype=np.float64)
+
+    conflated_types = [QUOTE] if trades == 'keep' else [QUOTE, TRADE]
+
+    for event_type in (QUOTE, TRADE):
+        rows = np.flatnonzero(tick_data.event_type == event_type)
+
+        if event_type not in conflated_types:
+            keep[rows] = True
+            continue
+
+        if len(rows) == 0:
+            continue
+
+        # Group rows by ticker and interval, in time order within a group
+        rows = rows[np.lexsort((rows, tick_data.ticker[rows]))]
+
+        tickers = tick_data.ticker[rows]
+        buckets = bucket[rows]
+
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = ((tickers[1:] != tickers[:-1]) |
+                     (buckets[1:] != buckets[:-1]))
+
+        keep[rows[last]] = True
+
+        if event_type == TRADE:
+            first = np.flatnonzero(np.concatenate([[True], last[:-1]]))
+            size[rows[last]] = np.add.reduceat(size[rows], first)
+
+    columns = {name: np.ascontiguousarray(column[keep])
+               for name, column in tick_data.columns().items()}
+    columns['size'] = size[keep]
+
+    return TickData(tickers=tick_data.tickers, **columns)
+
+
+def conflation_interval(interval, trades):
+    '''
+    Check conflation settings, see conflate_ticks. Returns the interval in
+    nanoseconds.
+    '''
+    if trades not in ('keep', 'summarize'):
+        raise ValueError('Unknown trade conflation \'{}\'.'.format(trades))
+
+    interval = pd.Timedelta(interval).value
+
+    if interval <= 0:
+        raise ValueError('Conflation interval must be positive.')
+
+    return interval
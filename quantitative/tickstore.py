@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from .ticks import TickData
+from .sources import ColumnarSource
+
+META_FILE = 'meta.json'
+COLUMN_FILE = '{}.bin'
+
+
+def write_tick_store(data, path):
+    '''
+    Write tick data to a tick store directory. A tick store is one raw
+    binary file per column of ticks.TickData and a meta.json file with the
+    number of ticks, column dtypes and tickers.
+
+    Parameters:
+    ----------
+    data: pandas.DataFrame or ticks.TickData
+        The tick data. See sources.DataFrameSource for the DataFrame format.
+
+    path: str
+        Directory of the tick store, created if it does not exist.
+    '''
+    if isinstance(data, pd.DataFrame):
+        data = TickData.from_dataframe(data)
+
+    writer = _TickStoreWriter(path)
+    writer.append(data)
+    writer.close()
+
+
+def csv_to_tick_store(csv_path, path, chunksize=1000000):
+    '''
+    Convert a tick data CSV file into a tick store, reading the file in
+    chunks. The file must be sorted by time.
+
+    Parameters:
+    ----------
+    csv_path: str
+        Path to the CSV file, in the format described in
+        sources.DataFrameSource.
+
+    path: str
+        Directory of the tick store, created if it does not exist.
+
+    chunksize: int
+        Number of rows read from the file at a time.
+    '''
+    reader = pd.read_csv(csv_path, parse_dates=True, index_col=0,
+                         chunksize=chunksize)
+
+    writer = _TickStoreWriter(path)
+
+    for chunk in reader:
+        writer.append(TickData.from_dataframe(chunk))
+
+    writer.close()
+
+
+def read_tick_store(path):
+    '''
+    Memory-map a tick store. Columns are read-only np.memmap arrays, so
+    pages are loaded on demand and shared between processes reading the
+    same store.
+
+    Parameters:
+    ----------
+    path: str
+        Directory of the tick store.
+
+    Returns:
+    -------
+    tick_data: ticks.TickData
+    '''
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+
+    length = meta['length']
+    columns = {}
+
+    for name, dtype in meta['columns'].items():
+        column_path = os.path.join(path, COLUMN_FILE.format(name))
+
+        if length == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(column_path, dtype=dtype, mode='r',
+                                      shape=(length,))
+
+    return TickData(tickers=meta['tickers'], **columns)
+
+
+class TickStoreSource(ColumnarSource):
+    '''
+    Event source over a memory-mapped tick store. Pickling the source only
+    pickles the path of the store.
+
+    Parameters:
+    ----------
+    path: str
+        Directory of the tick store, see write_tick_store.
+
+    chunksize: int
+        Number of ticks converted into events at a time.
+    '''
+
+    def __init__(self, path, chunksize=65536):
+        self.path = path
+        super().__init__(read_tick_store(path), chunksize)
+
+    def __getstate__(self):
+        # Pickle the path instead of the mapped data, conflation is
+        # applied again when unpickled
+        return {'path': self.path, 'chunksize': self.chunksize,
+                'conflation': self.conflation}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['chunksize'])
+
+        if state['conflation'] is not None:
+            self.conflate(*state['conflation'])
+
+
+class _TickStoreWriter(object):
+    '''
+    Appends TickData to the column files of a tick store, keeping ticker
+    codes consistent across appends.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.length = 0
+        self.tickers = []
+        self._ticker_codes = {}
+
+        os.makedirs(path, exist_ok=True)
+
+        self._files = {name: open(os.path.join(path, COLUMN_FILE.format(name)),
+                                  'wb')
+                       for name in TickData.COLUMNS}
+
+    def append(self, tick_data):
+
+        # Map the ticker codes of this chunk onto the codes of the store
+        codes = np.empty(len(tick_data.tickers), dtype=np.int32)
+
+        for code, ticker in enumerate(tick_data.tickers):
+            if ticker not in self._ticker_codes:
+                self._ticker_codes[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+
+            codes[code] = self._ticker_codes[ticker]
+
+        for name, column in tick_data.columns().items():
+
+            if name == 'ticker':
+                column = codes[column]
+
+            column = np.ascontiguousarray(column,
+                                          dtype=TickData.DTYPES[name])
+            self._files[name].write(column.tobytes())
+
+        self.length += len(tick_data)
+
+    def close(self):
+
+        for f in self._files.values():
+            f.close()
+
+        meta = {'length': self.length,
+                'tickers': self.tickers,
+                'columns': {name: np.dtype(dtype).str
+                            for name, dtype in TickData.DTYPES.items()}}
+
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from .ticks import to_nanoseconds
+
+market_transaction = namedtuple('market_transaction',
+                                ['time', 'ticker', 'price', 'shares',
+                                 'direction', 'commission', 'sequence'])
+
+cash_transaction = namedtuple('cash_transaction', ['time', 'cash'])
+
+DIRECTIONS = ['BUY', 'SELL']
+
+
+class TransactionLog(object):
+    '''
+    Append-only log of the cash and market transactions of the backtest,
+    stored in separate tables of typed NumPy columns. Tickers and
+    directions are stored as integer codes. Transactions must be added in
+    time order, times are epoch nanoseconds or anything
+    ticks.to_nanoseconds() accepts.
+
+    Transactions at a time can be read like the dict the log replaces,
+    e.g. transaction_log[time] returns a list of cash_transaction and
+    market_transaction namedtuples in the order they were added.
+    '''
+
+    def __init__(self):
+        self.cash = _ColumnTable([('time', np.int64), ('entry', np.int64),
+                                  ('cash', np.float64)])
+
+        self.market = _ColumnTable([('time', np.int64), ('entry', np.int64),
+                                    ('ticker', np.int32),
+                                    ('price', np.float64),
+                                    ('shares', np.float64),
+                                    ('direction', np.int8),
+                                    ('commission', np.float64),
+                                    ('sequence', np.int64)])
+
+        self.tickers = []
+        self._ticker_codes = {}
+
+        # Number of transactions added, orders cash and market entries
+        self._entries = 0
+
+    def __len__(self):
+        return self._entries
+
+    def __contains__(self, time):
+        return len(self[time]) != 0
+
+    def __getitem__(self, time):
+        time = to_nanoseconds(time)
+
+        transactions = []
+
+        for table, to_transaction in ((self.cash, self._cash_transaction),
+                                      (self.market, self._market_transaction)):
+            times = table.column('time')
+            start = np.searchsorted(times, time, side='left')
+            stop = np.searchsorted(times, time, side='right')
+
+            transactions.extend((table.column('entry')[row],
+                                 to_transaction(row))
+                                for row in range(start, stop))
+
+        transactions.sort(key=lambda entry: entry[0])
+
+        return [transaction for _, transaction in transactions]
+
+    def add_cash(self, time, cash):
+        '''
+        Log a cash transaction.
+        '''
+        self.cash.append(to_nanoseconds(time), self._entries, cash)
+        self._entries += 1
+
+    def add_market(self, time, ticker, price, shares, direction, commission,
+                   sequence):
+        '''
+        Log a market transaction.
+        '''
+        ticker_code = self._ticker_codes.get(ticker)
+
+        if ticker_code is None:
+            ticker_code = self._ticker_codes[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+
+        self.market.append(to_nanoseconds(time), self._entries, ticker_code,
+                           price, shares, DIRECTIONS.index(direction),
+                           commission, sequence)
+        self._entries += 1
+
+    def last_market(self):
+        '''
+        Returns the last market transaction added.
+        '''
+        if len(self.market) == 0:
+            raise IndexError('No market transactions.')
+
+        return self._market_transaction(len(self.market) - 1)
+
+    def cash_frame(self):
+        '''
+        Returns the cash transactions as a DataFrame indexed by time. The
+        DataFrame is a copy, changing it does not change the log.
+        '''
+        return pd.DataFrame({'cash': self.cash.column('cash')},
+                            index=self._time_index(self.cash), copy=True)
+
+    def market_frame(self):
+        '''
+        Returns the market transactions as a DataFrame indexed by time.
+        Tickers and directions are categorical columns over the stored
+        codes. The DataFrame is a copy, changing it does not change the log.
+        '''
+        market = self.market
+
+        columns = {
+            'ticker': pd.Categorical.from_codes(market.column('ticker'),
+                                                categories=self.tickers),
+            'price': market.column('price'),
+            'shares': market.column('shares'),
+            'direction': pd.Categorical.from_codes(market.column('direction'),
+                                                   categories=DIRECTIONS),
+            'commission': market.column('commission'),
+            'sequence': market.column('sequence')}
+
+        return pd.DataFrame(columns, index=self._time_index(market),
+                            copy=True)
+
+    def _time_index(self, table):
+        return pd.DatetimeIndex(table.column('time').view('datetime64[ns]'),
+                                name='time', copy=True)
+
+    def _cash_transaction(self, row):
+        return cash_transaction(
+            pd.Timestamp(int(self.cash.column('time')[row])),
+            float(self.cash.column('cash')[row]))
+
+    def _market_transaction(self, row):
+        market = self.market
+
+        return market_transaction(
+            pd.Timestamp(int(market.column('time')[row])),
+            self.tickers[market.column('ticker')[row]],
+            float(market.column('price')[row]),
+            float(market.column('shares')[row]),
+            DIRECTIONS[market.column('direction')[row]],
+            float(market.column('commission')[row]),
+            int(market.column('sequence')[row]))
+
+
+class _ColumnTable(object):
+    '''
+    Growable table of typed NumPy columns. The arrays double in size
+    when full.
+    '''
+
+    __slots__ = ['names', '_columns', '_length']
+
+    def __init__(self, columns, capacity=1024):
+        self.names = [name for name, _ in columns]
+        self._columns = [np.empty(capacity, dtype=dtype)
+                         for _, dtype in columns]
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def append(self, *values):
+        index = self._length
+
+        if index == len(self._columns[0]):
+            self._grow()
+
+        for column, value in zip(self._columns, values):
+            column[index] = value
+
+        self._length += 1
+
+    def column(self, name):
+        '''
+        Returns a view of the filled part of a column.
+        '''
+        return self._columns[self.names.index(name)][:self._length]
+
+    def _grow(self):
+        capacity = 2 * len(self._columns[0])
+
+        for i, column in enumerate(self._columns):
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._length] = column[:self._length]
+            self._columns[i] = grown
@@ -13,27 +13,18 @@ def parse_transaction_log(transaction_log):
     Parses the transaction log generated by the backtest into something
     more readable.
 
+    Parameters:
+    ----------
+    transaction_log: transactions.TransactionLog
+        The transaction log, see BacktestEngine.get_transaction_log().
+
+    Returns:
+    -------
+    cash_transactions, market_transactions: pd.DataFrame
+        The cash and market transactions indexed by time.
     '''
 
-    cash_transactions = []
-    market_transactions = []
-
-    for key, lists in transaction_log.items():
-        for item in lists:
-
-            if type(item).__name__ == 'cash_transaction':
-                cash_transactions.append(item)
-
-            if type(item).__name__ == 'market_transaction':
-                market_transactions.append(item)
-
-    cash_transactions = pd.DataFrame.from_dict(
-        cash_transactions).set_index('time')
-
-    market_transactions = pd.DataFrame.from_dict(
-        market_transactions).set_index('time')
-
-    return cash_transactions, market_transactions
+    return transaction_log.cash_frame(), transaction_log.market_frame()
 
 
 def trade_details(transaction_log, sequence_id, return_as_tuple=False):
@@ -93,7 +84,7 @@ def trade_details(transaction_log, sequence_id, return_as_tuple=False):
     avg_buy_price = np.mean(buys['price'])
     avg_sell_price = np.mean(sells['price'])
 
-    details = trade_summary(ticker=trades_with_sequence['ticker'][0],
+    details = trade_summary(ticker=trades_with_sequence['ticker'].iloc[0],
                             enter_time=enter_time, exit_time=exit_time,
                             enter_price=enter_price, exit_price=exit_price,
                             shares_purchased=total_shares_bought,
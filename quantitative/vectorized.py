@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from .ticks import TickData, TRADE, QUOTE
+from .commissions import calculate_commission
+from .transactions import DIRECTIONS
+
+
+class VectorizedBacktest(object):
+    '''
+    Backtest of a strategy expressed as target positions, computed with
+    array operations instead of the event loop of BacktestEngine. Meant to
+    screen many strategies quickly before running them event by event.
+
+    Changes in the target positions are filled in full at the prevailing
+    ask (buys) or bid (sells) of the ticker, the last quote at or before
+    the change. Changes before the first quote of a ticker are filled at
+    its first quote. Cash and quote sizes are not checked.
+
+    Positions are valued at the last trade or fill price, like
+    BacktestEngine.
+
+    Parameters:
+    ----------
+    data: pandas.DataFrame or ticks.TickData
+        The tick data. See sources.DataFrameSource for the DataFrame format.
+
+    positions: pandas.DataFrame
+        Target number of shares, indexed by time with a column per ticker.
+        NaN keeps the previous target, targets start at 0.
+    '''
+
+    def __init__(self, data, positions):
+        '''User Settings'''
+        self.inital_cash = 0
+        self.include_commission = False
+        self.broker = 'ib'
+
+        if isinstance(data, pd.DataFrame):
+            data = TickData.from_dataframe(data)
+
+        self.tick_data = data
+        self.positions = positions.sort_index(kind='mergesort')
+
+        # Fills of the last run, see run()
+        self.transactions = None
+
+    def calculate_commission(self, broker, price, shares):
+        '''
+        Commission of each fill, see BacktestEngine.calculate_commission.
+        '''
+        if self.include_commission:
+            return calculate_commission(broker, price, shares)
+        else:
+            return np.zeros(len(price))
+
+    def run(self):
+        '''
+        Run the backtest.
+
+        Returns:
+        -------
+        result_account_values: pd.DataFrame
+            Pandas DataFrame of portfolio value, cash value and investment
+            value at each tick and fill, in the format returned by
+            BacktestEngine.run(). The fills are stored in transactions.
+        '''
+        fills = self._fills()
+
+        tick_data = self.tick_data
+        times = np.union1d(tick_data.time, fills['time'])
+
+        if len(self.positions):
+            times = times[times >= self.positions.index[0].value]
+
+        # Cash after the fills at or before each time
+        cash_flows = (-fills['shares'] * fills['price'] -
+                      fills['commission'])
+        cash = np.concatenate([[0.], np.cumsum(cash_flows)])
+        cash = self.inital_cash + cash[
+            np.searchsorted(fills['time'], times, side='right')]
+
+        trades = tick_data.event_type == TRADE
+        investment_value = np.zeros(len(times))
+
+        for code, ticker in enumerate(tick_data.tickers):
+            ticker_fills = fills['ticker'] == ticker
+
+            if not ticker_fills.any():
+                continue
+
+            fill_times = fills['time'][ticker_fills]
+            shares = np.cumsum(fills['shares'][ticker_fills])
+            held = np.searchsorted(fill_times, times, side='right') - 1
+            shares = np.where(held >= 0, shares[np.maximum(held, 0)], 0.)
+
+            # Last trade or fill price, fills after trades at the same time
+            ticker_trades = trades & (tick_data.ticker == code)
+            price_times = np.concatenate([tick_data.time[ticker_trades],
+                                          fill_times])
+            prices = np.concatenate([tick_data.price[ticker_trades],
+                                     fills['price'][ticker_fills]])
+
+            order = np.argsort(price_times, kind='mergesort')
+            price_times = price_times[order]
+            prices = prices[order]
+
+            priced = np.searchsorted(price_times, times, side='right') - 1
+            market_price = prices[np.maximum(priced, 0)]
+
+            investment_value += np.where(shares != 0, shares * market_price,
+                                         0.)
+
+        self.transactions = self._transaction_frame(fills)
+
+        return pd.DataFrame(
+            {'cash': cash, 'investment_value': investment_value,
+             'portfolio_value': cash + investment_value},
+            index=pd.DatetimeIndex(times.view('datetime64[ns]')))
+
+    def _fills(self):
+        '''
+        Fill the changes in target positions against the quotes with an
+        as-of join by ticker.
+        '''
+        tick_data = self.tick_data
+
+        targets = self.positions.ffill().fillna(0.)
+        changes = targets.diff()
+        changes.iloc[:1] = targets.iloc[:1]
+
+        orders = changes.stack()
+        orders = orders[orders != 0].rename('shares').reset_index()
+        orders.columns = ['time', 'ticker', 'shares']
+        orders['time'] = orders['time'].astype('datetime64[ns]')
+        orders = orders.sort_values('time', kind='mergesort',
+                                    ignore_index=True)
+
+        unknown = set(orders['ticker']) - set(tick_data.tickers)
+
+        if unknown:
+            raise KeyError('No quotes for {}.'.format(sorted(unknown)))
+
+        quote_rows = tick_data.event_type == QUOTE
+        quotes = pd.DataFrame({
+            'quote_time': tick_data.time[quote_rows].view('datetime64[ns]'),
+            'ticker': np.asarray(tick_data.tickers, dtype=object)[
+                tick_data.ticker[quote_rows]],
+            'bid': tick_data.bid[quote_rows],
+            'ask': tick_data.ask[quote_rows]})
+        quotes['time'] = quotes['quote_time']
+
+        prevailing = pd.merge_asof(orders, quotes, on='time', by='ticker',
+                                   direction='backward')
+        first = pd.merge_asof(orders, quotes, on='time', by='ticker',
+                              direction='forward')
+
+        # Orders before the first quote wait for it
+        waiting = prevailing['quote_time'].isna().to_numpy()
+        prevailing.loc[waiting, ['quote_time', 'bid', 'ask']] = first.loc[
+            waiting, ['quote_time', 'bid', 'ask']].to_numpy()
+        prevailing['time'] = prevailing['time'].where(
+            ~waiting, prevailing['quote_time'])
+
+        # Tickers without quotes are never filled
+        prevailing = prevailing[prevailing['quote_time'].notna()]
+        times = prevailing['time'].to_numpy(dtype='datetime64[ns]')
+
+        shares = prevailing['shares'].to_numpy(dtype=np.float64)
+        price = np.where(shares > 0, prevailing['ask'], prevailing['bid'])
+
+        order = np.argsort(times, kind='mergesort')
+        shares = shares[order]
+        price = price[order].astype(np.float64)
+
+        return {'time': times[order].view(np.int64),
+                'ticker': prevailing['ticker'].to_numpy(dtype=object)[order],
+                'shares': shares,
+                'price': price,
+                'commission': np.asarray(self.calculate_commission(
+                    self.broker, price, np.abs(shares)), dtype=np.float64)}
+
+    def _transaction_frame(self, fills):
+        shares = fills['shares']
+
+        return pd.DataFrame(
+            {'ticker': pd.Categorical(fills['ticker'],
+                                      categories=self.tick_data.tickers),
+             'price': fills['price'],
+             'shares': np.abs(shares),
+             'direction': pd.Categorical.from_codes(
+                 (shares < 0).astype(np.int8), categories=DIRECTIONS),
+             'commission': fills['commission']},
+            index=pd.DatetimeIndex(fills['time'].view('datetime64[ns]'),
+                                   name='time'))